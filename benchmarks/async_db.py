@@ -0,0 +1,168 @@
+"""
+Load test: blocking sync sessions vs async sessions inside async endpoints
+
+Fills a temporary SQLite database (or --database-url) with synthetic
+opportunities, then serves the same keyword search twice with a uvicorn
+worker process: once the old way (a sync Session queried directly in an
+``async def`` endpoint) and once through an AsyncSession (aiosqlite /
+asyncpg). Concurrent clients hit /search while a probe times /health, which
+does no I/O: with sync sessions the probe waits behind every running query.
+
+Usage: python -m benchmarks.async_db [--rows 50000] [--concurrency 32] [--requests 2000] [--database-url URL]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.fulltext_search import QUERIES, fill
+from startup_opps_api.database import search
+from startup_opps_api.database.database import async_database_url, make_async_engine, make_engine
+from startup_opps_api.database.models import Base
+
+
+def _engine():
+    """Engine of the filled database, with the full-text index marked as available"""
+    engine = make_engine(os.environ["BENCHMARK_DATABASE_URL"])
+    search.ensure_search_index(engine)
+    return engine
+
+
+def sync_app() -> FastAPI:
+    session_factory = sessionmaker(bind=_engine())
+    app = FastAPI()
+
+    @app.get("/search")
+    async def search_endpoint(keyword: str):
+        db = session_factory()
+        try:
+            return len(search.search_opportunities(db, keyword))
+        finally:
+            db.close()
+
+    @app.get("/health")
+    async def health():
+        return "ok"
+
+    return app
+
+
+def async_app() -> FastAPI:
+    _engine()
+    session_factory = async_sessionmaker(make_async_engine(async_database_url(os.environ["BENCHMARK_DATABASE_URL"])))
+    app = FastAPI()
+
+    @app.get("/search")
+    async def search_endpoint(keyword: str):
+        async with session_factory() as db:
+            return len(await db.run_sync(search.search_opportunities, keyword))
+
+    @app.get("/health")
+    async def health():
+        return "ok"
+
+    return app
+
+
+def _serve(factory: str, database_url: str) -> subprocess.Popen:
+    """Start a uvicorn worker for one of the app factories on a free port"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", f"benchmarks.async_db:{factory}", "--factory",
+         "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, "BENCHMARK_DATABASE_URL": database_url},
+    )
+    server.port = port
+    for _ in range(200):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/health")
+            return server
+        except httpx.TransportError:
+            time.sleep(0.05)
+    server.kill()
+    raise RuntimeError(f"{factory} did not start")
+
+
+def _percentile(values: List[float], share: float) -> float:
+    return statistics.quantiles(values, n=100)[int(share * 100) - 1] if len(values) > 1 else values[0]
+
+
+async def _load(base_url: str, concurrency: int, requests: int):
+    latencies: List[float] = []
+    probes: List[float] = []
+    remaining = iter(range(requests))
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(base_url=base_url, limits=httpx.Limits(max_connections=concurrency + 1), timeout=None) as client:
+        async def worker():
+            for i in remaining:
+                started = time.perf_counter()
+                response = await client.get("/search", params={"keyword": QUERIES[i % len(QUERIES)]})
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        async def probe():
+            while not done.is_set():
+                started = time.perf_counter()
+                (await client.get("/health")).raise_for_status()
+                probes.append(time.perf_counter() - started)
+                await asyncio.sleep(0.01)
+
+        await client.get("/health")  # Connect before timing
+        prober = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await prober
+    return requests / elapsed, latencies, probes
+
+
+def run(rows: int, concurrency: int, requests: int, database_url: str):
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+    fill(engine, rows)
+    print(f"Inserted {rows} rows in {time.perf_counter() - started:.1f}s")
+    print(f"{requests} searches, {concurrency} concurrent clients")
+
+    for name, factory in (("sync session", "sync_app"), ("async session", "async_app")):
+        server = _serve(factory, database_url)
+        try:
+            throughput, latencies, probes = asyncio.run(
+                _load(f"http://127.0.0.1:{server.port}", concurrency, requests)
+            )
+        finally:
+            server.terminate()
+            server.wait()
+        print(f"  {name:>13}: {throughput:7.0f} req/s   search p50 {_percentile(latencies, 0.5) * 1000:6.1f} ms  "
+              f"p95 {_percentile(latencies, 0.95) * 1000:6.1f} ms   /health p95 {_percentile(probes, 0.95) * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--rows", type=int, default=50_000)
+    arg_parser.add_argument("--concurrency", type=int, default=32)
+    arg_parser.add_argument("--requests", type=int, default=2000)
+    arg_parser.add_argument("--database-url", help="Empty database to fill (default: a temporary SQLite file)")
+    args = arg_parser.parse_args()
+    if args.database_url:
+        run(args.rows, args.concurrency, args.requests, args.database_url)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            run(args.rows, args.concurrency, args.requests, f"sqlite:///{os.path.join(tmp, 'load.db')}")
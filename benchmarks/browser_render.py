@@ -0,0 +1,57 @@
+"""
+Render local HTML fixtures through the browser pool, cold and then warm
+
+Writes corpus pages to a temporary directory and loads them over file:// so
+no network is involved. Requires Playwright and its Chromium build.
+
+Usage: python -m benchmarks.browser_render [--pages 8] [--contexts 4]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.corpus import PAGE_STYLES, build_page
+from startup_opps_api.scraper.html_backends import get_backend
+from startup_opps_api.scraper.source_registry import source_registry
+from startup_opps_api.services.browser_pool import BrowserPool
+
+
+def write_fixtures(directory: Path, pages: int):
+    """Return (fixture url, source search url) pairs"""
+    fixtures = []
+    for i in range(pages):
+        path = directory / f"listing-{i}.html"
+        path.write_text(build_page(i, seed=i), encoding="utf-8")
+        fixtures.append((path.as_uri(), PAGE_STYLES[i % len(PAGE_STYLES)][0]))
+    return fixtures
+
+
+def run(pages: int, contexts: int):
+    backend = get_backend()
+    pool = BrowserPool(max_contexts=contexts)
+    with tempfile.TemporaryDirectory() as tmp:
+        fixtures = write_fixtures(Path(tmp), pages)
+        try:
+            for label in ("cold", "warm"):
+                started = time.perf_counter()
+                rendered = pool.submit((url, "article") for url, _ in fixtures).result()
+                elapsed = time.perf_counter() - started
+                items = sum(
+                    len(source_registry.plan_for_url(search_url).extract_markup(backend, page.html, search_url))
+                    for (_, search_url), page in zip(fixtures, rendered)
+                    if not page.error
+                )
+                errors = sum(1 for page in rendered if page.error)
+                print(f"{label:>5}: {len(fixtures)} pages in {elapsed:.2f}s  ({items} items, {errors} errors)")
+        finally:
+            pool.stop()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--pages", type=int, default=8)
+    arg_parser.add_argument("--contexts", type=int, default=4)
+    args = arg_parser.parse_args()
+    run(args.pages, args.contexts)
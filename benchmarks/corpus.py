@@ -0,0 +1,57 @@
+"""
+Deterministic HTML corpus shaped like the listing pages we scrape
+"""
+
+import random
+
+# (url, card class, title class, fields) per source style
+PAGE_STYLES = [
+    ("https://www.wemakescholars.com/scholarship", "scholarship-card", "scholarship-title",
+     [("university", "University of {n}"), ("amount", "USD {n},000"), ("deadline", "Dec {d}, 2025"), ("summary", "Fully funded scholarship for {w} students")]),
+    ("https://partiuintercambio.org/bolsas-de-estudo/", "bolsa-item", "title",
+     [("instituicao", "Universidade {n}"), ("valor", "R$ {n}.000"), ("prazo", "{d} de março")]),
+    ("https://www.profellow.com/open-calls/", "fellowship-item", "fellowship-title",
+     [("provider", "Foundation {n}"), ("location", "{w}"), ("deadline", "Rolling")]),
+    ("https://opportunitydesk.org/category/fellowships/", "opportunity-card", "entry-title",
+     [("organization", "Org {n}"), ("date", "{d} January 2026")]),
+    ("https://www.f6s.com/programs", "program-card", "program-title",
+     [("company", "Accelerator {n}"), ("region", "{w}"), ("deadline", "Nov {d}, 2025")]),
+    ("https://www.example-startup-hub.org/programs", "post", "post-title",
+     [("meta", "Eligibility: early-stage founders from {w}")]),
+]
+
+WORDS = ["climate", "health", "fintech", "education", "Brazil", "Europe", "Africa", "AI", "energy", "women"]
+
+
+def _boilerplate(rng: random.Random) -> str:
+    nav = "".join(f'<li class="menu-item"><a href="/section/{i}">Section {i}</a></li>' for i in range(40))
+    script = "<script>" + "var x=1;" * rng.randint(200, 400) + "</script>"
+    return f'<header class="site-header"><nav><ul class="menu">{nav}</ul></nav></header>{script}'
+
+
+def build_page(style_index: int, seed: int, cards: int = 30) -> str:
+    url, card_class, title_class, fields = PAGE_STYLES[style_index % len(PAGE_STYLES)]
+    rng = random.Random(seed)
+    body = [_boilerplate(rng), '<main class="content">']
+    for i in range(cards):
+        n = rng.randint(1, 999)
+        d = rng.randint(1, 28)
+        w = rng.choice(WORDS)
+        field_html = "".join(
+            f'<span class="{cls}">{template.format(n=n, d=d, w=w)}</span>' for cls, template in fields
+        )
+        body.append(
+            f'<article class="{card_class}"><h3 class="{title_class}">'
+            f'<a href="/p/{seed}-{i}">{w.title()} Opportunity {n}</a></h3>{field_html}'
+            f'<p>Requirements: applicants must hold a degree in {w}.</p></article>'
+        )
+    body.append('</main><footer class="site-footer">' + "<p>Footer text</p>" * 50 + "</footer>")
+    return f"<html><head><title>Listing</title></head><body>{''.join(body)}</body></html>"
+
+
+def build_corpus(pages: int = 60, cards: int = 30):
+    """Return a list of (url, html bytes) pairs"""
+    return [
+        (PAGE_STYLES[i % len(PAGE_STYLES)][0], build_page(i, seed=i, cards=cards).encode("utf-8"))
+        for i in range(pages)
+    ]
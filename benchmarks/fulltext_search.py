@@ -0,0 +1,109 @@
+"""
+Keyword search latency over stored opportunities: ILIKE scan vs full-text index
+
+Fills a temporary SQLite database (or the one given by --database-url) with
+synthetic opportunities, then times search_opportunities for a set of
+queries with the full-text index disabled and enabled.
+
+Usage: python -m benchmarks.fulltext_search [--rows 100000] [--rounds 5] [--database-url URL]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from startup_opps_api.database import search
+from startup_opps_api.database.models import Base, Opportunity
+
+WORDS = (
+    "climate health fintech education energy water agriculture women founders "
+    "startup research innovation ai robotics biotech social impact seed grant "
+    "accelerator fellowship scholarship latin america brazil africa europe "
+    "graduate undergraduate engineering design data science mobility cities"
+).split()
+# Filler vocabulary so topic words are as selective as in real listings
+FILLER = ["".join(random.Random(i).choices("abcdefghijklmnopqrstuvwxyz", k=7)) for i in range(5000)]
+TYPES = ("scholarship", "fellowship", "accelerator", "grant", "competition")
+QUERIES = ("climate", "women founders", "biotech research", "fintech brazil", "robot")
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) if rng.random() < 0.02 else rng.choice(FILLER) for _ in range(words))
+
+
+def fill(engine, rows: int, batch: int = 5000):
+    rng = random.Random(42)
+    with engine.begin() as conn:
+        for start in range(0, rows, batch):
+            conn.execute(insert(Opportunity), [
+                {
+                    "title": _sentence(rng, 5).title(),
+                    "organization": f"Org {rng.randrange(2000)}",
+                    "type": rng.choice(TYPES),
+                    "description": _sentence(rng, 40),
+                    "eligibility": _sentence(rng, 10),
+                    "url": f"https://example.org/opportunity/{i}",
+                    "source": "benchmark",
+                    "region": rng.choice(("Global", "Brazil", "Europe", "Africa")),
+                    "is_active": True,
+                }
+                for i in range(start, min(start + batch, rows))
+            ])
+
+
+def _time(session_factory, rounds: int):
+    timings = {}
+    for keyword in QUERIES:
+        best = float("inf")
+        count = 0
+        for _ in range(rounds):
+            db = session_factory()
+            try:
+                started = time.perf_counter()
+                count = len(search.search_opportunities(db, keyword=keyword))
+                best = min(best, time.perf_counter() - started)
+            finally:
+                db.close()
+        timings[keyword] = (best, count)
+    return timings
+
+
+def run(rows: int, rounds: int, database_url: str):
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+    fill(engine, rows)
+    print(f"Inserted {rows} rows in {time.perf_counter() - started:.1f}s")
+
+    session_factory = sessionmaker(bind=engine)
+    scan = _time(session_factory, rounds)
+
+    started = time.perf_counter()
+    if not search.ensure_search_index(engine):
+        print(f"No full-text index available on {engine.dialect.name}")
+        return
+    print(f"Built full-text index in {time.perf_counter() - started:.1f}s")
+    indexed = _time(session_factory, rounds)
+
+    for keyword in QUERIES:
+        (scan_s, scan_n), (index_s, index_n) = scan[keyword], indexed[keyword]
+        print(f"{keyword!r:>20}: ilike {scan_s * 1000:8.1f} ms ({scan_n} rows)   "
+              f"fulltext {index_s * 1000:7.1f} ms ({index_n} rows)   x{scan_s / index_s:.0f}")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--rows", type=int, default=100_000)
+    arg_parser.add_argument("--rounds", type=int, default=5)
+    arg_parser.add_argument("--database-url", help="Empty database to fill (default: a temporary SQLite file)")
+    args = arg_parser.parse_args()
+    if args.database_url:
+        run(args.rows, args.rounds, args.database_url)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            run(args.rows, args.rounds, f"sqlite:///{os.path.join(tmp, 'search.db')}")
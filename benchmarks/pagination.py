@@ -0,0 +1,107 @@
+"""
+Page-N latency of /api/opportunities: OFFSET paging vs keyset (cursor) paging
+
+Fills a temporary SQLite database (or --database-url) with synthetic active
+opportunities, then times fetching one page at increasing depths both ways.
+Keyset pages should cost the same at any depth; OFFSET pages grow with it.
+
+Usage: python -m benchmarks.pagination [--rows 1000000] [--page-size 20] [--database-url URL]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from startup_opps_api.database.models import Base, Opportunity
+from startup_opps_api.database.pagination import _cursor_for, paginate_opportunities
+
+TYPES = ("scholarship", "fellowship", "accelerator", "grant")
+DEPTHS = (1, 100, 1_000, 10_000, 40_000)
+
+
+def fill(engine, rows: int, batch: int = 20_000):
+    rng = random.Random(1)
+    start = datetime(2026, 1, 1)
+    with engine.begin() as conn:
+        for first in range(0, rows, batch):
+            conn.execute(insert(Opportunity), [
+                {
+                    "title": f"Opportunity {i}",
+                    "organization": f"Org {i % 5000}",
+                    "type": TYPES[i % len(TYPES)],
+                    "url": f"https://example.org/{i}",
+                    "source": "benchmark",
+                    "deadline": start + timedelta(days=rng.randrange(365)) if rng.random() < 0.8 else None,
+                    "is_active": rng.random() < 0.95,
+                }
+                for i in range(first, min(first + batch, rows))
+            ])
+
+
+def _best(fn, rounds: int = 3) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(rows: int, page_size: int, database_url: str):
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+    fill(engine, rows)
+    print(f"Inserted {rows} rows in {time.perf_counter() - started:.0f}s")
+    db = sessionmaker(bind=engine)()
+
+    for sort, type in (("id", None), ("id", "grant"), ("deadline", None)):
+        total = db.query(Opportunity).filter(Opportunity.is_active == True)
+        total = (total.filter(Opportunity.type == type) if type else total).count()
+        print(f"sort={sort} type={type or '-'} ({total} rows)")
+        for page in (depth for depth in DEPTHS if depth * page_size <= total):
+            skip = (page - 1) * page_size
+
+            def offset_page():
+                query = db.query(Opportunity).filter(Opportunity.is_active == True)
+                if type:
+                    query = query.filter(Opportunity.type == type)
+                if sort == "deadline":
+                    query = query.order_by(Opportunity.deadline.is_(None), Opportunity.deadline, Opportunity.id)
+                else:
+                    query = query.order_by(Opportunity.id)
+                return query.offset(skip).limit(page_size).all()
+
+            previous = offset_page() if page == 1 else None
+            # Cursor pointing just before the page, taken from the row that ends the previous page
+            cursor = None
+            if page > 1:
+                skip -= 1
+                before = offset_page()[0]
+                skip += 1
+                cursor = _cursor_for(before, sort, type)
+            offset_s = _best(offset_page)
+            keyset_s = _best(lambda: paginate_opportunities(db, page_size, cursor, type, sort))
+            if previous is not None:
+                assert [opp.id for opp in previous] == [opp.id for opp in paginate_opportunities(db, page_size, None, type, sort)[0]]
+            print(f"  page {page:>6}: offset {offset_s * 1000:8.2f} ms   keyset {keyset_s * 1000:6.2f} ms")
+    db.close()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--rows", type=int, default=1_000_000)
+    arg_parser.add_argument("--page-size", type=int, default=20)
+    arg_parser.add_argument("--database-url", help="Empty database to fill (default: a temporary SQLite file)")
+    args = arg_parser.parse_args()
+    if args.database_url:
+        run(args.rows, args.page_size, args.database_url)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            run(args.rows, args.page_size, f"sqlite:///{os.path.join(tmp, 'pagination.db')}")
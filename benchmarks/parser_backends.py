@@ -0,0 +1,54 @@
+"""
+Pages parsed per second for each HTML parser backend on a fixed corpus
+
+"full" builds the whole DOM before extracting; "partial" is the production
+path that only materializes the container subtrees and stops at the item cap.
+
+Usage: python -m benchmarks.parser_backends [--pages 60] [--rounds 3] [--cards 30]
+"""
+
+import argparse
+import time
+
+from benchmarks.corpus import build_corpus
+from startup_opps_api.scraper.enhanced_parser import EnhancedOpportunityParser
+from startup_opps_api.scraper.html_backends import BACKENDS
+from startup_opps_api.scraper.source_registry import source_registry
+
+
+def _time(parse_page, corpus, rounds: int):
+    best = float("inf")
+    items = 0
+    for _ in range(rounds):
+        started = time.perf_counter()
+        items = sum(len(parse_page(url, html)) for url, html in corpus)
+        best = min(best, time.perf_counter() - started)
+    return best, items
+
+
+def run(pages: int, rounds: int, cards: int):
+    corpus = build_corpus(pages, cards)
+    total_kb = sum(len(html) for _, html in corpus) / 1024
+    print(f"Corpus: {len(corpus)} pages, {total_kb:.0f} KiB")
+
+    for name, backend_cls in BACKENDS.items():
+        if not backend_cls.available():
+            print(f"{name:>12}: not installed")
+            continue
+        backend = backend_cls()
+        parser = EnhancedOpportunityParser(backend=backend)
+        full, items = _time(lambda url, html: source_registry.plan_for_url(url).extract(backend.parse(html), url), corpus, rounds)
+        partial, _ = _time(parser.parse_html, corpus, rounds)
+        print(
+            f"{name:>12}: full {len(corpus) / full:8.1f} pages/s, "
+            f"partial {len(corpus) / partial:8.1f} pages/s  ({items} items)"
+        )
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--pages", type=int, default=60)
+    arg_parser.add_argument("--rounds", type=int, default=3)
+    arg_parser.add_argument("--cards", type=int, default=30, help="opportunity cards per page")
+    args = arg_parser.parse_args()
+    run(args.pages, args.rounds, args.cards)
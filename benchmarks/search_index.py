@@ -0,0 +1,82 @@
+"""
+Query latency of the in-memory search index against the old substring filter
+
+Builds a synthetic catalog, indexes it incrementally and times keyword
+queries through SearchIndex.search and through a linear substring scan like
+the one filter_by_criteria used to run.
+
+Usage: python -m benchmarks.search_index [--docs 30000] [--rounds 200]
+"""
+
+import argparse
+import random
+import time
+
+from startup_opps_api.services.search_index import SearchIndex
+
+TOPICS = (
+    "climate tech health fintech educação energy water agriculture women founders "
+    "research innovation robotics biotech impact seed graduate engineering design "
+    "mobility cities oceans space"
+).split()
+FILLER = ["".join(random.Random(i).choices("abcdefghijklmnopqrstuvwxyz", k=7)) for i in range(5000)]
+QUERIES = ("climate", "climate tech", "women founders", "educacao", "robot", "biotech research seed")
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(TOPICS) if rng.random() < 0.03 else rng.choice(FILLER) for _ in range(words))
+
+
+def build_catalog(docs: int):
+    rng = random.Random(7)
+    return [
+        {
+            "title": _text(rng, 6).title(),
+            "organization": f"Org {rng.randrange(3000)}",
+            "description": _text(rng, 60),
+            "eligibility": _text(rng, 12),
+            "type": "scholarship",
+            "url": f"https://example.org/{i}",
+        }
+        for i in range(docs)
+    ]
+
+
+def substring_scan(catalog, keyword):
+    keyword_lower = keyword.lower()
+    return [opp for opp in catalog if
+            keyword_lower in (opp.get("title") or "").lower() or
+            keyword_lower in (opp.get("description") or "").lower() or
+            keyword_lower in (opp.get("eligibility") or "").lower()]
+
+
+def _best(fn, rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(docs: int, rounds: int):
+    catalog = build_catalog(docs)
+    index = SearchIndex()
+    started = time.perf_counter()
+    index.extend(catalog)
+    print(f"Indexed {docs} documents in {time.perf_counter() - started:.2f}s")
+
+    for keyword in QUERIES:
+        index.search(keyword)  # Compute the term scores once, as repeated queries would
+        indexed = _best(lambda: index.search(keyword, k=20), rounds)
+        scanned = _best(lambda: substring_scan(catalog, keyword), max(1, rounds // 50))
+        print(f"{keyword!r:>24}: index {indexed * 1000:6.3f} ms ({len(index.search(keyword, k=None))} matches)   "
+              f"substring scan {scanned * 1000:7.1f} ms ({len(substring_scan(catalog, keyword))} matches)")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--docs", type=int, default=30_000)
+    arg_parser.add_argument("--rounds", type=int, default=200)
+    args = arg_parser.parse_args()
+    run(args.docs, args.rounds)
@@ -8,7 +8,9 @@ CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 CREATE EXTENSION IF NOT EXISTS "pg_trgm";
 
 -- Create indexes for better performance
--- (These will be created by SQLAlchemy migrations, but we can add custom ones here)
+-- (The opportunities table doesn't exist yet when this runs; the full-text GIN
+-- and trigram indexes are created by the app in create_tables, see
+-- startup_opps_api/database/search.py)
 
 -- Set up logging
 ALTER SYSTEM SET log_statement = 'all';
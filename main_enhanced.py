@@ -1,11 +1,15 @@
-from fastapi import FastAPI, Query, Depends, HTTPException, BackgroundTasks
+from fastapi import FastAPI, Query, Depends, Header, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import sys
 import os
 import asyncio
+import json
+import secrets
 from typing import List, Optional
 import logging
 from dotenv import load_dotenv
@@ -17,10 +21,24 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'startup_opps_api'))
 
 from startup_opps_api.models.opportunity import Opportunity
 from startup_opps_api.services.run_scraper import scrape_opportunities
-from startup_opps_api.services.enhanced_scraper import scrape_detailed_opportunities
-from startup_opps_api.services.ai_chat import AIChatService
-from startup_opps_api.database.database import get_db, create_tables
+from startup_opps_api.services.enhanced_scraper import astream_detailed_opportunities
+from startup_opps_api.scraper.fetcher import close_fetcher
+from startup_opps_api.services.ai_chat import AIChatService, rank_for_profile
+from startup_opps_api.services.crawler_runtime import get_crawler_runtime, shutdown_crawler_runtime
+from startup_opps_api.services.browser_pool import get_browser_pool, shutdown_browser_pool, BROWSER_PREWARM
+from startup_opps_api.database.database import get_async_read_db, create_tables, AsyncReadSessionLocal, dispose_engines
 from startup_opps_api.database.models import Opportunity as DBOpportunity, User, ChatSession
+from startup_opps_api.database.search import search_opportunities as search_stored_opportunities, has_opportunities, closing_soon
+from startup_opps_api.database.pagination import paginate_opportunities
+from startup_opps_api.scraper.opportunity_sources import normalize_type
+from startup_opps_api.services.ingestion import ingestion_scheduler, INGESTION_ENABLED
+from startup_opps_api.services.result_cache import result_cache, make_key, cacheable
+from startup_opps_api.services.single_flight import search_flights
+from startup_opps_api.services.telemetry import telemetry, source_stats
+from startup_opps_api.services.circuit_breaker import circuit_breakers
+from startup_opps_api.services.listing_cache import listing_cache
+from startup_opps_api.scraper.http_cache import get_http_cache
+from startup_opps_api.services.metrics import MetricsMiddleware, registry, run_in_thread, stage, cache_collector, stats_collector
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -40,8 +58,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Outermost, so latency covers CORS handling and the whole response body
+app.add_middleware(MetricsMiddleware)
+
+registry.add_collector(cache_collector({
+    "result": result_cache.stats,
+    "listing": listing_cache.stats,
+    "http": lambda: get_http_cache().stats(),
+}))
+registry.add_collector(stats_collector(
+    "aipply_component_stat", "Counters of in-process components since startup", "component",
+    {"single_flight": search_flights.stats, "telemetry": telemetry.stats, "circuit_breakers": circuit_breakers.stats},
+))
+
 # Mount static files (your existing frontend)
 app.mount("/static", StaticFiles(directory="frontend"), name="static")
 
@@ -59,11 +91,136 @@ try:
 except Exception as e:
     logger.warning(f"OpenAI service not available: {e}")
 
+# Bearer token for the admin endpoints; while it is unset they are disabled
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+def require_admin(authorization: Optional[str] = Header(None)):
+    """Allow only requests carrying ``Authorization: Bearer <ADMIN_TOKEN>``"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Admin token required", headers={"WWW-Authenticate": "Bearer"})
+
 # Create database tables on startup
 @app.on_event("startup")
 async def startup_event():
     create_tables()
     logger.info("Database tables created")
+    # Boot the reactor once so searches don't pay Scrapy startup cost
+    await asyncio.to_thread(get_crawler_runtime().start)
+    if BROWSER_PREWARM and get_browser_pool().available():
+        try:
+            await asyncio.to_thread(get_browser_pool().start, True)
+        except Exception as e:
+            logger.warning(f"Could not prewarm browser pool: {e}")
+    if INGESTION_ENABLED:
+        ingestion_scheduler.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await ingestion_scheduler.stop()
+    await close_fetcher()
+    await asyncio.to_thread(shutdown_crawler_runtime)
+    await asyncio.to_thread(shutdown_browser_pool)
+    await result_cache.close()
+    await asyncio.to_thread(telemetry.stop)
+    await asyncio.to_thread(circuit_breakers.stop)
+    await dispose_engines()
+
+def _to_api_opportunity(opp: DBOpportunity) -> Opportunity:
+    """Convert a stored opportunity to the API model"""
+    return Opportunity(
+        title=opp.title,
+        organization=opp.organization,
+        type=opp.type,
+        eligibility=opp.eligibility,
+        deadline=opp.deadline.date().isoformat() if opp.deadline else opp.deadline_text,
+        url=opp.url,
+        amount=opp.amount,
+        location=opp.region,
+        description=opp.description,
+        source=opp.source
+    )
+
+def _opportunity_from_dict(opp: dict) -> Opportunity:
+    """Convert a scraped or cached opportunity dict to the API model"""
+    return Opportunity(
+        title=opp.get('title', ''),
+        organization=opp.get('organization', ''),
+        type=opp.get('type', 'opportunity'),
+        eligibility=opp.get('eligibility', ''),
+        deadline=opp.get('deadline', ''),
+        url=opp.get('url', ''),
+        amount=opp.get('amount', ''),
+        location=opp.get('location', ''),
+        description=opp.get('description', ''),
+        source=opp.get('source', '')
+    )
+
+def _search_stored(db: Session, keyword: str, region: Optional[str], type: Optional[str]) -> Optional[List[dict]]:
+    """Stored opportunities matching a search, or None while nothing has been ingested"""
+    if not has_opportunities(db):
+        return None
+    stored = search_stored_opportunities(db, keyword, normalize_type(type), region)
+    return [_to_api_opportunity(opp).model_dump() for opp in stored]
+
+async def _load_opportunities(keyword: str, region: Optional[str], type: Optional[str], refresh: bool = False) -> List[dict]:
+    """Read opportunities from the ingested store, or run a live crawl when asked to refresh.
+
+    Opens its own session because cached results are refreshed in the background,
+    after the request that triggered the refresh has finished.
+    """
+    if not refresh:
+        with stage("search", "stored"):
+            async with AsyncReadSessionLocal() as db:
+                stored = await db.run_sync(_search_stored, keyword, region, type)
+        if stored is not None:
+            return stored
+
+    # Run scraping in a worker thread to avoid Twisted/asyncio conflicts
+    return await run_in_thread("search", scrape_opportunities, keyword, region, type)
+
+async def _find_opportunities(keyword: str, region: Optional[str], type: Optional[str], refresh: bool = False) -> List[Opportunity]:
+    """Cached search shared by /api/search and /api/chat; ``refresh`` bypasses the cache and repopulates it.
+
+    Concurrent identical searches (after normalization) share one in-flight load.
+    """
+    key = make_key("search", keyword, type, region)
+    if refresh:
+        results = await search_flights.do(
+            f"refresh:{key}", lambda: _load_opportunities(keyword, region, type, refresh=True)
+        )
+        if cacheable(results):
+            await result_cache.set(key, results)
+    else:
+        results = await result_cache.get_or_compute(
+            key, lambda: search_flights.do(key, lambda: _load_opportunities(keyword, region, type))
+        )
+    with stage("search", "serialize"):
+        return [_opportunity_from_dict(opp) for opp in results]
+
+def _detailed_events(keyword: str, type: str, region: str):
+    """Events of a live detailed search, shared by identical concurrent searches and streams.
+
+    The summary is cached once per crawl, whoever is listening.
+    """
+    key = make_key("search-detailed", keyword, type, region)
+    
+    async def crawl():
+        async for event in astream_detailed_opportunities(keyword, type, region):
+            if event["event"] == "summary" and cacheable(event["opportunities"]):
+                await result_cache.set(key, event["opportunities"])
+            yield event
+    
+    return search_flights.stream(key, crawl)
+
+async def _detailed_summary(keyword: str, type: str, region: str) -> List[dict]:
+    """Ranked results of a (shared) detailed search"""
+    async for event in _detailed_events(keyword, type, region):
+        if event["event"] == "summary":
+            return event["opportunities"]
+    return []
 
 @app.get("/")
 async def serve_frontend():
@@ -93,16 +250,13 @@ def read_root():
 async def search_opportunities(
     keyword: str = Query(..., description="Search term, e.g. 'climate tech'"),
     region: str = Query(None, description="Geographic region"),
-    type: str = Query(None, description="Type: scholarship, fellowship, or accelerator")
+    type: str = Query(None, description="Type: scholarship, fellowship, or accelerator"),
+    refresh: bool = Query(False, description="Run a live crawl instead of reading stored opportunities")
 ):
     """Search for opportunities with enhanced error handling"""
     try:
-        logger.info(f"Searching for: {keyword}, type: {type}, region: {region}")
-        
-        # Run scraping in a worker thread to avoid Twisted/asyncio conflicts
-        opportunities = await asyncio.to_thread(
-            scrape_opportunities, keyword, region, type
-        )
+        logger.info(f"Searching for: {keyword}, type: {type}, region: {region}, refresh: {refresh}")
+        opportunities = await _find_opportunities(keyword, region, type, refresh)
     except Exception as e:
         import traceback
         logger.error("Search error: %s\n%s", repr(e), traceback.format_exc())
@@ -130,36 +284,59 @@ async def search_detailed_opportunities(
     try:
         logger.info(f"Detailed search request: keyword='{keyword}', type='{type}', region='{region}'")
         
-        # Use enhanced scraper for detailed results
-        opportunities = await asyncio.to_thread(
-            scrape_detailed_opportunities, keyword, type, region
-        )
+        # Fan out to all sources concurrently on the shared connection pool; hot queries come from the cache
+        key = make_key("search-detailed", keyword, type, region)
+        opportunities = await result_cache.get_or_compute(key, lambda: _detailed_summary(keyword, type, region))
         
         # Convert to Opportunity objects
-        opportunity_objects = []
-        for opp in opportunities:
-            opportunity_objects.append(Opportunity(
-                title=opp.get('title', ''),
-                organization=opp.get('organization', ''),
-                type=opp.get('type', 'opportunity'),
-                eligibility=opp.get('eligibility', ''),
-                deadline=opp.get('deadline', ''),
-                url=opp.get('url', ''),
-                amount=opp.get('amount', ''),
-                location=opp.get('location', ''),
-                description=opp.get('description', ''),
-                source=opp.get('source', '')
-            ))
-        
-        return opportunity_objects
+        with stage("detailed", "serialize"):
+            return [_opportunity_from_dict(opp) for opp in opportunities]
         
     except Exception as e:
         import traceback
         logger.error("Detailed search error: %s\n%s", repr(e), traceback.format_exc())
         return []
 
+@app.get("/api/search-detailed/stream")
+async def stream_detailed_opportunities(
+    keyword: str = Query("", description="Search keyword"),
+    region: str = Query("", description="Geographic region filter"),
+    type: str = Query("", description="Opportunity type (scholarship, fellowship, accelerator)")
+):
+    """Streaming /api/search-detailed: one NDJSON line per finished source, then a ranked "summary" line.
+    
+    Lines are {"event": "source", "source", "opportunities"}, {"event": "error", "source", "error"}
+    and finally {"event": "summary", "opportunities", ...}. A fresh cached result is sent as the summary right away;
+    identical concurrent searches share one crawl, and a client joining late first gets the lines sent so far.
+    """
+    key = make_key("search-detailed", keyword, type, region)
+    
+    def line(event: dict) -> str:
+        if "opportunities" in event:
+            event = {**event, "opportunities": [_opportunity_from_dict(opp).model_dump() for opp in event["opportunities"]]}
+        return json.dumps(event) + "\n"
+    
+    async def events():
+        cached = await result_cache.get(key)
+        if cached is not None and cached.fresh:
+            yield line({"event": "summary", "opportunities": cached.value, "cached": True})
+            return
+        try:
+            async for event in _detailed_events(keyword, type, region):
+                yield line(event)
+        except Exception as e:
+            logger.error(f"Streaming detailed search error: {e!r}")
+            yield line({"event": "error", "source": None, "error": "Search failed"})
+    
+    # X-Accel-Buffering stops nginx from holding lines back until the stream ends
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @app.post("/api/chat")
-async def chat_with_ai(request: dict, db: Session = Depends(get_db)):
+async def chat_with_ai(request: dict):
     """Chat endpoint with AI integration"""
     try:
         message = request.get("message", "")
@@ -178,12 +355,13 @@ async def chat_with_ai(request: dict, db: Session = Depends(get_db)):
         # Search for opportunities
         opportunities = []
         if search_params.get("keyword"):
-            opportunities = await asyncio.to_thread(
-                scrape_opportunities,
+            opportunities = await _find_opportunities(
                 search_params["keyword"],
                 search_params.get("region"),
                 search_params.get("type")
             )
+        if request.get("profile"):
+            opportunities = rank_for_profile(request["profile"], opportunities)
         
         # Generate AI response
         ai_response = await ai_service.process_user_message(message, opportunities)
@@ -201,32 +379,89 @@ async def chat_with_ai(request: dict, db: Session = Depends(get_db)):
             "opportunities": []
         }
 
+@app.post("/api/recommendations", response_model=List[Opportunity])
+async def recommend_opportunities(request: dict):
+    """Search results ordered by how well they match the user's profile answers.
+
+    Body: {"keyword", "type", "region", "profile": {"background", "interests", "field", "education_level", "region"}}
+    """
+    keyword = request.get("keyword", "")
+    if not keyword:
+        raise HTTPException(status_code=400, detail="Keyword is required")
+    opportunities = await _find_opportunities(keyword, request.get("region"), request.get("type"))
+    with stage("search", "rank"):
+        return rank_for_profile(request.get("profile") or {}, opportunities)
+
 @app.get("/api/opportunities", response_model=List[Opportunity])
 async def get_opportunities(
-    skip: int = Query(0, ge=0),
+    response: Response,
+    skip: int = Query(0, ge=0, description="Deprecated offset paging; use cursor"),
     limit: int = Query(10, ge=1, le=100),
     type: str = Query(None),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    sort: str = Query("id", pattern="^(id|deadline)$"),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    """Get opportunities from database"""
-    query = db.query(DBOpportunity).filter(DBOpportunity.is_active == True)
+    """Get opportunities from database, one page at a time; the next page's cursor is in X-Next-Cursor"""
+    if skip and not cursor:
+        query = select(DBOpportunity).where(DBOpportunity.is_active == True)
+        if type:
+            query = query.where(DBOpportunity.type == type)
+        opportunities = await db.scalars(query.order_by(DBOpportunity.id).offset(skip).limit(limit))
+        return [_to_api_opportunity(opp) for opp in opportunities]
     
-    if type:
-        query = query.filter(DBOpportunity.type == type)
-    
-    opportunities = query.offset(skip).limit(limit).all()
-    
-    return [
-        Opportunity(
-            title=opp.title,
-            organization=opp.organization,
-            type=opp.type,
-            eligibility=opp.eligibility,
-            deadline=opp.deadline.isoformat() if opp.deadline else None,
-            url=opp.url
+    try:
+        opportunities, next_cursor = await db.run_sync(
+            paginate_opportunities, limit=limit, cursor=cursor, type=type, sort=sort
         )
-        for opp in opportunities
-    ]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    return [_to_api_opportunity(opp) for opp in opportunities]
+
+@app.get("/api/opportunities/closing-soon", response_model=List[Opportunity])
+async def get_closing_soon(
+    days: int = Query(30, ge=0, le=366, description="Deadline within this many days from today"),
+    type: str = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Active opportunities closing soon, earliest deadline first"""
+    opportunities = await db.run_sync(closing_soon, days, type, limit)
+    return [_to_api_opportunity(opp) for opp in opportunities]
+
+@app.post("/api/ingestion/run", dependencies=[Depends(require_admin)])
+async def trigger_ingestion(background_tasks: BackgroundTasks):
+    """Start an ingestion cycle in the background (admin only); 409 while one is running"""
+    if ingestion_scheduler.running:
+        raise HTTPException(status_code=409, detail="Ingestion is already running")
+    background_tasks.add_task(ingestion_scheduler.run_once)
+    return {"status": "scheduled", "last_run": ingestion_scheduler.last_run, "last_stats": ingestion_scheduler.last_stats}
+
+@app.get("/api/admin/sources", dependencies=[Depends(require_admin)])
+async def admin_sources(
+    hours: float = Query(24, gt=0, le=24 * 30, description="Window of crawl records to roll up"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Per-source crawl health: request count, success rate and p50/p95 fetch + parse latency, plus circuit breakers"""
+    return {
+        "window_hours": hours,
+        "sources": await db.run_sync(source_stats, hours),
+        "writer": telemetry.stats(),
+        "circuits": circuit_breakers.snapshot(),
+    }
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """Hit/miss counters for the search result cache and in-flight search coalescing"""
+    return {**result_cache.stats(), "single_flight": search_flights.stats()}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics: per-route latency, pipeline stage timings, cache hit ratios, queue depths"""
+    return Response(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 @app.get("/api/health")
 async def health_check():
@@ -2,32 +2,155 @@
 Database configuration and session management
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
+from typing import Any, Dict, Optional
 import os
 from startup_opps_api.database.models import Base
+from startup_opps_api.database.persistence import backfill_url_hashes
+from startup_opps_api.database.search import ensure_search_index, share_search_index
+
+def _normalize_url(url: Optional[str]) -> Optional[str]:
+    # Fix for Heroku PostgreSQL URL format
+    if url and url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql://", 1)
+    return url
 
 # Database URL - can be overridden with environment variable
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./aipply.db")
+DATABASE_URL = _normalize_url(os.getenv("DATABASE_URL", "sqlite:///./aipply.db"))
+# Optional read replica for the read-only endpoints
+DATABASE_READ_URL = _normalize_url(os.getenv("DATABASE_READ_URL"))
 
-# Fix for Heroku PostgreSQL URL format
-if DATABASE_URL.startswith("postgres://"):
-    DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
+# Connection pool (per engine)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # Seconds; below typical server/proxy idle timeouts
 
-# Create engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
-    poolclass=StaticPool if "sqlite" in DATABASE_URL else None,
-)
+# SQLite allows a single writer, so a few connections cover concurrent readers
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "5"))
+SQLITE_MAX_OVERFLOW = int(os.getenv("SQLITE_MAX_OVERFLOW", "5"))
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",  # Readers don't block the writer, nor the writer readers
+    "synchronous": "NORMAL",  # Safe with WAL; only the last commits can be lost on power failure
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "10000")),
+    "cache_size": -int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536")),  # Negative: KiB rather than pages
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "temp_store": "MEMORY",
+}
+
+def _is_memory_sqlite(url: str) -> bool:
+    database = make_url(url).database
+    return not database or database == ":memory:" or database.startswith("file::memory:")
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """Pool and driver options for create_engine / create_async_engine"""
+    backend = make_url(url).get_backend_name()
+    if backend == "sqlite":
+        if _is_memory_sqlite(url):
+            # Every connection to :memory: is a new, empty database, so share one
+            return {"connect_args": {"check_same_thread": False}, "poolclass": StaticPool}
+        return {
+            "connect_args": {"check_same_thread": False},
+            "pool_size": SQLITE_POOL_SIZE,
+            "max_overflow": SQLITE_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT,
+        }
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": True,  # Replace connections the server or a failover dropped, instead of failing a request
+    }
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+def make_engine(url: str) -> Engine:
+    """Engine for ``url`` with a bounded pool (and the pragmas above on SQLite)"""
+    new_engine = create_engine(url, **engine_options(url))
+    if new_engine.dialect.name == "sqlite" and not _is_memory_sqlite(url):
+        event.listen(new_engine, "connect", _set_sqlite_pragmas)
+    return new_engine
+
+# Async drivers for the request path, so queries don't block the event loop
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+def async_database_url(url: str) -> str:
+    """The same database as ``url``, addressed through its async driver"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+def make_async_engine(url: str) -> AsyncEngine:
+    """Async counterpart of make_engine"""
+    new_engine = create_async_engine(url, **engine_options(url))
+    if new_engine.dialect.name == "sqlite" and not _is_memory_sqlite(url):
+        event.listen(new_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return new_engine
+
+# Create engines; without a replica, reads go to the primary
+engine = make_engine(DATABASE_URL)
+read_engine = make_engine(DATABASE_READ_URL) if DATABASE_READ_URL else engine
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_database_url(DATABASE_URL)
+ASYNC_DATABASE_READ_URL = os.getenv("ASYNC_DATABASE_READ_URL") or (
+    async_database_url(DATABASE_READ_URL) if DATABASE_READ_URL else None
+)
+
+async_engine = make_async_engine(ASYNC_DATABASE_URL)
+async_read_engine = make_async_engine(ASYNC_DATABASE_READ_URL) if ASYNC_DATABASE_READ_URL else async_engine
+
+# expire_on_commit=False: attributes of loaded rows stay readable without another (implicit, sync) query
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+async def dispose_engines():
+    """Close every pooled connection (on shutdown)"""
+    for pooled in {async_engine, async_read_engine}:
+        await pooled.dispose()
+    for pooled in {engine, read_engine}:
+        pooled.dispose()
+
+def add_missing_columns():
+    """Add model columns missing from tables created by an older version (as nullable columns)"""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+
 def create_tables():
-    """Create all database tables"""
+    """Create all database tables, bring older ones up to date and create the indexes"""
     Base.metadata.create_all(bind=engine)
+    add_missing_columns()
+    # Keys must be filled in before the unique index on them is created
+    backfill_url_hashes(engine)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    ensure_search_index(engine)
+    if read_engine is not engine:
+        share_search_index(engine, read_engine)
 
 def get_db():
     """Dependency to get database session"""
@@ -36,3 +159,13 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    """Dependency to get an async database session, for async endpoints"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db():
+    """Like get_async_db, on the read replica when one is configured; for read-only endpoints"""
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -2,7 +2,7 @@
 Database models for AIpply API
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, Float, String, DateTime, Text, Boolean, ForeignKey, Index, JSON
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -18,8 +18,11 @@ class Opportunity(Base):
     type = Column(String(50), nullable=False, index=True)  # scholarship, fellowship, accelerator
     description = Column(Text)
     eligibility = Column(Text)
-    deadline = Column(DateTime)
+    deadline = Column(DateTime)  # Parsed from deadline_text at ingest, for range queries
+    deadline_text = Column(String(200))  # As the source wrote it ("15 de março", "Rolling", ...)
     url = Column(String(1000), nullable=False)
+    url_hash = Column(String(64), unique=True, index=True)  # SHA-256 of the canonical URL, the upsert key
+    content_hash = Column(String(64))  # Changes only when the stored content does
     source = Column(String(100), nullable=False)
     region = Column(String(100))
     amount = Column(String(100))  # For scholarships/fellowships
@@ -31,6 +34,13 @@ class Opportunity(Base):
     
     # Relationships
     user_searches = relationship("UserSearch", back_populates="opportunity")
+    
+    # Keyset pagination walks these in order (see database/pagination.py); the deadline one also serves closing-soon ranges
+    __table_args__ = (
+        Index("ix_opportunities_active_id", "is_active", "id"),
+        Index("ix_opportunities_active_type_id", "is_active", "type", "id"),
+        Index("ix_opportunities_active_deadline_id", "is_active", "deadline", "id"),
+    )
 
 class User(Base):
     __tablename__ = "users"
@@ -92,3 +102,13 @@ class ScrapingLog(Base):
     error_message = Column(Text)
     scraped_at = Column(DateTime, default=datetime.utcnow)
     duration_seconds = Column(Integer)
+    # Per fetch + parse telemetry (see services/telemetry.py)
+    crawl_path = Column(String(20))  # async, requests, scrapy
+    http_status = Column(Integer)
+    response_bytes = Column(Integer)
+    latency_ms = Column(Float)
+    error_class = Column(String(100))
+    
+    __table_args__ = (
+        Index("ix_scraping_logs_scraped_at_source", "scraped_at", "source"),
+    )
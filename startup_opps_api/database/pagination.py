@@ -0,0 +1,98 @@
+"""
+Keyset (cursor) pagination over stored opportunities
+
+Each page continues after the last row of the previous one instead of
+skipping rows with OFFSET, so page 10,000 costs the same index range scan as
+page 1. The position is handed to clients as an opaque cursor: url-safe
+base64 of a small JSON object that also pins the sort and type filter it was
+issued for.
+
+Sorts:
+- "id": insertion order, walking ix_opportunities_active_id
+  (ix_opportunities_active_type_id with a type filter)
+- "deadline": earliest deadline first, walking ix_opportunities_active_deadline_id;
+  opportunities without a deadline come after all dated ones, by id
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+
+from startup_opps_api.database.models import Opportunity
+
+SORTS = ("id", "deadline")
+
+
+def encode_cursor(data: Dict[str, Any]) -> str:
+    raw = json.dumps(data, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Raise ValueError for cursors this module didn't produce"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Malformed cursor") from e
+    if not isinstance(data, dict) or not isinstance(data.get("id"), int):
+        raise ValueError("Malformed cursor")
+    return data
+
+
+def _cursor_for(opp: Opportunity, sort: str, type: Optional[str]) -> str:
+    data = {"s": sort, "t": type or "", "id": opp.id}
+    if sort == "deadline":
+        data["d"] = opp.deadline.isoformat() if opp.deadline else None
+    return encode_cursor(data)
+
+
+def paginate_opportunities(
+    db: Session,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    type: Optional[str] = None,
+    sort: str = "id",
+) -> Tuple[List[Opportunity], Optional[str]]:
+    """One page of active opportunities and the cursor of the next page (None on the last page)"""
+    if sort not in SORTS:
+        raise ValueError(f"Unknown sort '{sort}', expected one of {', '.join(SORTS)}")
+    after = decode_cursor(cursor) if cursor else None
+    if after is not None and (after.get("s") != sort or after.get("t") != (type or "")):
+        raise ValueError("Cursor was issued for a different sort or type")
+
+    base = db.query(Opportunity).filter(Opportunity.is_active == True)
+    if type:
+        base = base.filter(Opportunity.type == type)
+
+    if sort == "id":
+        query = base if after is None else base.filter(Opportunity.id > after["id"])
+        rows = query.order_by(Opportunity.id).limit(limit + 1).all()
+    else:
+        rows = []
+        undated_after = None
+        if after is None or after.get("d") is not None:
+            dated = base.filter(Opportunity.deadline.is_not(None))
+            if after is not None:
+                deadline = datetime.fromisoformat(str(after["d"]))
+                # Row-value comparison, so the database seeks straight to the position in the index
+                dated = dated.filter(tuple_(Opportunity.deadline, Opportunity.id) > tuple_(deadline, after["id"]))
+            rows = dated.order_by(Opportunity.deadline, Opportunity.id).limit(limit + 1).all()
+        else:
+            undated_after = after["id"]
+        if len(rows) <= limit:
+            # Dated rows are exhausted, continue with the undated ones
+            undated = base.filter(Opportunity.deadline.is_(None))
+            if undated_after is not None:
+                undated = undated.filter(Opportunity.id > undated_after)
+            rows += undated.order_by(Opportunity.id).limit(limit + 1 - len(rows)).all()
+
+    if len(rows) > limit:
+        page = rows[:limit]
+        return page, _cursor_for(page[-1], sort, type)
+    return rows, None
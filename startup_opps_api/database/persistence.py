@@ -0,0 +1,143 @@
+"""
+Bulk persistence of scraped opportunities
+
+Rows are written in batches with one multi-row INSERT ... ON CONFLICT per
+batch (PostgreSQL and SQLite), keyed by url_hash, the SHA-256 of the
+canonical URL. A conflicting row is only rewritten when its content_hash
+differs (or it was deactivated), so updated_at reflects real changes.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, List
+
+from sqlalchemy import bindparam, or_, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from startup_opps_api.database.models import Opportunity
+from startup_opps_api.services.dedup import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+PERSIST_BATCH_SIZE = int(os.getenv("PERSIST_BATCH_SIZE", "500"))
+
+# Fields whose change counts as an update
+CONTENT_FIELDS = ("title", "organization", "type", "description", "eligibility", "source", "region", "amount",
+                  "deadline", "deadline_text")
+UPDATE_FIELDS = (*CONTENT_FIELDS, "url", "content_hash", "updated_at", "is_active")
+
+
+def url_hash(url: str) -> str:
+    return hashlib.sha256(canonicalize_url(url).encode("utf-8")).hexdigest()
+
+
+def content_hash(row: Dict[str, Any]) -> str:
+    content = json.dumps([row.get(field) for field in CONTENT_FIELDS], ensure_ascii=False, default=str)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _insert(dialect: str):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f"Bulk upsert is not supported on {dialect}")
+    return insert
+
+
+def upsert_batch(db: Session, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Upsert one batch of opportunity rows (column -> value, including url) with a single statement.
+
+    Returns how many rows were inserted, updated and left unchanged. The
+    caller commits.
+    """
+    now = datetime.utcnow()
+    by_hash: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        key = url_hash(row["url"])
+        # One row per key: PostgreSQL refuses to update the same row twice in a statement
+        by_hash[key] = {
+            **row,
+            "url_hash": key,
+            "content_hash": content_hash(row),
+            "created_at": now,
+            "updated_at": now,
+            "is_active": True,
+        }
+    if not by_hash:
+        return {"inserted": 0, "updated": 0, "unchanged": 0}
+
+    statement = _insert(db.get_bind().dialect.name)(Opportunity).values(list(by_hash.values()))
+    excluded = statement.excluded
+    statement = statement.on_conflict_do_update(
+        index_elements=[Opportunity.url_hash],
+        set_={field: excluded[field] for field in UPDATE_FIELDS},
+        where=or_(
+            Opportunity.content_hash.is_distinct_from(excluded.content_hash),
+            Opportunity.is_active == False,
+        ),
+    ).returning(Opportunity.created_at)
+
+    # Rows skipped by the WHERE clause return nothing; inserted rows carry this batch's timestamp
+    written = db.execute(statement).scalars().all()
+    inserted = sum(1 for created_at in written if created_at == now)
+    return {
+        "inserted": inserted,
+        "updated": len(written) - inserted,
+        "unchanged": len(by_hash) - len(written),
+    }
+
+
+def persist_opportunities(db: Session, rows: Iterable[Dict[str, Any]], batch_size: int = PERSIST_BATCH_SIZE) -> Dict[str, int]:
+    """Upsert rows in batches, committing each one; returns the totals"""
+    totals = {"inserted": 0, "updated": 0, "unchanged": 0, "batches": 0}
+    batch: List[Dict[str, Any]] = []
+
+    def flush():
+        stats = upsert_batch(db, batch)
+        db.commit()
+        logger.debug(f"Persisted batch of {len(batch)}: {stats}")
+        for key, value in stats.items():
+            totals[key] += value
+        totals["batches"] += 1
+        batch.clear()
+
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return totals
+
+
+def backfill_url_hashes(engine: Engine) -> int:
+    """Fill url_hash for rows stored before the column existed; returns how many were filled.
+
+    When several old rows share a canonical URL only the first gets the hash,
+    the others stay unkeyed so the unique index can still be created.
+    """
+    table = Opportunity.__table__
+    with engine.begin() as conn:
+        missing = conn.execute(select(table.c.id, table.c.url).where(table.c.url_hash.is_(None)).order_by(table.c.id)).all()
+        if not missing:
+            return 0
+        taken = set(conn.execute(select(table.c.url_hash).where(table.c.url_hash.is_not(None))).scalars())
+        updates = []
+        for row_id, url in missing:
+            key = url_hash(url)
+            if key not in taken:
+                taken.add(key)
+                updates.append({"row_id": row_id, "key": key})
+        if updates:
+            conn.execute(
+                update(table).where(table.c.id == bindparam("row_id")).values(url_hash=bindparam("key")),
+                updates,
+            )
+    logger.info(f"Backfilled url_hash for {len(updates)} of {len(missing)} stored opportunities")
+    return len(updates)
@@ -0,0 +1,209 @@
+"""
+Query helpers for searching stored opportunities
+
+Keyword search runs on a full-text index over title, description, eligibility
+and organization: an FTS5 table kept in sync by triggers on SQLite, and GIN
+tsvector + pg_trgm indexes on PostgreSQL. Other databases, or SQLite builds
+without FTS5, fall back to ILIKE scans. ``ensure_search_index`` (called from
+create_tables) sets the indexes up.
+
+The helpers take a sync Session; async endpoints call them through
+``AsyncSession.run_sync``.
+"""
+
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import func, literal_column, or_, select, text
+from sqlalchemy.engine import URL, Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from startup_opps_api.database.models import Opportunity
+
+logger = logging.getLogger(__name__)
+
+SEARCH_COLUMNS = ("title", "description", "eligibility", "organization")
+FTS_TABLE = "opportunities_fts"
+
+# Must match the indexed expression exactly for PostgreSQL to use the GIN index
+POSTGRES_DOCUMENT = "to_tsvector('simple', {})".format(
+    " || ' ' || ".join(f"coalesce({column}, '')" for column in SEARCH_COLUMNS)
+)
+
+_SQLITE_FTS_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        {", ".join(SEARCH_COLUMNS)},
+        content='opportunities', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS opportunities_fts_insert AFTER INSERT ON opportunities BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {", ".join(SEARCH_COLUMNS)})
+        VALUES (new.id, {", ".join(f"new.{c}" for c in SEARCH_COLUMNS)});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS opportunities_fts_delete AFTER DELETE ON opportunities BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {", ".join(SEARCH_COLUMNS)})
+        VALUES ('delete', old.id, {", ".join(f"old.{c}" for c in SEARCH_COLUMNS)});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS opportunities_fts_update AFTER UPDATE OF {", ".join(SEARCH_COLUMNS)} ON opportunities BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {", ".join(SEARCH_COLUMNS)})
+        VALUES ('delete', old.id, {", ".join(f"old.{c}" for c in SEARCH_COLUMNS)});
+        INSERT INTO {FTS_TABLE}(rowid, {", ".join(SEARCH_COLUMNS)})
+        VALUES (new.id, {", ".join(f"new.{c}" for c in SEARCH_COLUMNS)});
+    END
+    """,
+]
+
+_POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX IF NOT EXISTS ix_opportunities_document ON opportunities USING GIN (({POSTGRES_DOCUMENT}))",
+    "CREATE INDEX IF NOT EXISTS ix_opportunities_title_trgm ON opportunities USING GIN (title gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_opportunities_organization_trgm ON opportunities USING GIN (organization gin_trgm_ops)",
+]
+
+# Databases whose full-text index is in place, by URL without the driver (shared by sync and async engines)
+_fulltext_ready = set()
+
+
+def _database_key(url: URL) -> str:
+    return url.set(drivername=url.get_backend_name()).render_as_string()
+
+
+def ensure_search_index(engine: Engine) -> bool:
+    """Create the full-text index for the engine's dialect; returns False when only ILIKE search is available"""
+    dialect = engine.dialect.name
+    try:
+        if dialect == "sqlite":
+            with engine.begin() as conn:
+                existed = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+                ).first() is not None
+                for statement in _SQLITE_FTS_DDL:
+                    conn.exec_driver_sql(statement)
+                if not existed:
+                    # Index rows stored before the FTS table existed
+                    conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        elif dialect == "postgresql":
+            with engine.begin() as conn:
+                for statement in _POSTGRES_DDL:
+                    conn.exec_driver_sql(statement)
+        else:
+            return False
+    except DBAPIError as e:
+        logger.warning(f"Full-text search unavailable on {dialect}, falling back to ILIKE: {e}")
+        return False
+
+    _fulltext_ready.add(_database_key(engine.url))
+    return True
+
+
+def share_search_index(primary: Engine, replica: Engine):
+    """Let searches on a read replica use the primary's full-text index, which replicates with the data"""
+    if _database_key(primary.url) in _fulltext_ready:
+        _fulltext_ready.add(_database_key(replica.url))
+
+
+def keyword_tokens(keyword: str) -> List[str]:
+    """Words of a search keyword, lowercased"""
+    return re.findall(r"\w+", (keyword or "").lower())
+
+
+def _sqlite_match(tokens: List[str]) -> str:
+    """FTS5 query requiring every token as a word prefix, e.g. '"climat"* "tech"*'"""
+    return " ".join('"{}"*'.format(token.replace('"', '""')) for token in tokens)
+
+
+def _postgres_tsquery(tokens: List[str]) -> str:
+    return " & ".join(f"{token}:*" for token in tokens)
+
+
+def _ilike_filter(query, keyword: str):
+    pattern = f"%{keyword}%"
+    return query.filter(or_(
+        Opportunity.title.ilike(pattern),
+        Opportunity.description.ilike(pattern),
+        Opportunity.eligibility.ilike(pattern),
+        Opportunity.organization.ilike(pattern),
+    ))
+
+
+def search_opportunities(
+    db: Session,
+    keyword: str = "",
+    type: Optional[str] = None,
+    region: Optional[str] = None,
+    limit: int = 50,
+) -> List[Opportunity]:
+    """Search active stored opportunities by keyword, type and region, best matches first"""
+    query = db.query(Opportunity).filter(Opportunity.is_active == True)
+    order_by = [Opportunity.updated_at.desc()]
+
+    if type:
+        query = query.filter(Opportunity.type == type)
+
+    if region:
+        pattern = f"%{region}%"
+        query = query.filter(or_(
+            Opportunity.region.ilike(pattern),
+            Opportunity.organization.ilike(pattern),
+        ))
+
+    tokens = keyword_tokens(keyword)
+    if tokens:
+        bind = db.get_bind()
+        fulltext = _database_key(bind.url) in _fulltext_ready
+        if fulltext and bind.dialect.name == "sqlite":
+            matches = (
+                select(literal_column("rowid").label("id"), literal_column("rank").label("rank"))
+                .select_from(text(FTS_TABLE))
+                .where(text(f"{FTS_TABLE} MATCH :match"))
+                .subquery()
+            )
+            query = query.join(matches, matches.c.id == Opportunity.id).params(match=_sqlite_match(tokens))
+            order_by.insert(0, matches.c.rank)  # bm25: lower is better
+        elif fulltext and bind.dialect.name == "postgresql":
+            tsquery = text("to_tsquery('simple', :tsquery)").bindparams(tsquery=_postgres_tsquery(tokens))
+            document = literal_column(POSTGRES_DOCUMENT)
+            # The trigram index also serves substring matches inside words, like the old ILIKE search
+            query = query.filter(or_(document.op("@@")(tsquery), Opportunity.title.ilike(f"%{keyword}%")))
+            order_by.insert(0, func.ts_rank(document, tsquery).desc())
+        else:
+            query = _ilike_filter(query, keyword)
+
+    return query.order_by(*order_by).limit(limit).all()
+
+
+def closing_soon(
+    db: Session,
+    days: int = 30,
+    type: Optional[str] = None,
+    limit: int = 50,
+    now: Optional[datetime] = None,
+) -> List[Opportunity]:
+    """Active opportunities whose deadline is today or within the next ``days`` days, soonest first.
+
+    A range scan of ix_opportunities_active_deadline_id; deadlines are parsed once at ingest.
+    """
+    today = (now or datetime.utcnow()).replace(hour=0, minute=0, second=0, microsecond=0)
+    query = db.query(Opportunity).filter(
+        Opportunity.is_active == True,
+        Opportunity.deadline >= today,
+        Opportunity.deadline < today + timedelta(days=days + 1),
+    )
+    if type:
+        query = query.filter(Opportunity.type == type)
+    return query.order_by(Opportunity.deadline, Opportunity.id).limit(limit).all()
+
+
+def has_opportunities(db: Session) -> bool:
+    """Return True once ingestion has stored at least one opportunity"""
+    return db.query(Opportunity.id).first() is not None
@@ -0,0 +1,193 @@
+"""
+Parsing of free-text deadlines ("15 de março", "Dec 1, 2025", "31/10/2025") into dates
+
+Listings write deadlines in English or Portuguese, with or without a year,
+and often with surrounding words ("Deadline: ...", "Inscrições até ...").
+``parse_deadline`` returns the closing date: the last date introduced by a
+closing word ("até", "to", "-", "closes", "deadline", ...), or else the last
+date in the text. It returns None for rolling deadlines and text without a
+date. Results are memoized per text, so re-crawling the same listings is cheap.
+
+A date without a year takes the year of the next explicit date in the same
+text ("1 de julho a 31 de agosto de 2026"), or of the previous one. With no
+explicit year anywhere, it is the next occurrence of that day, unless it passed
+less than YEARLESS_GRACE_DAYS ago (a recently closed call, not next year's).
+Ambiguous numeric dates (03/04/2025) are read day first, as on the Brazilian
+sources; the English sources spell their months out. Month abbreviations that
+are also common words ("out", "set", "may", ...) only count with a year, a
+trailing dot or a deadline word just before them, so "10 out of 12" is no date.
+"""
+
+import calendar
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import List, NamedTuple, Optional
+
+from startup_opps_api.services.search_index import fold
+
+YEARLESS_GRACE_DAYS = 30
+
+MONTHS = {
+    # English
+    "january": 1, "february": 2, "march": 3, "april": 4, "may": 5, "june": 6,
+    "july": 7, "august": 8, "september": 9, "october": 10, "november": 11, "december": 12,
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "jun": 6, "jul": 7, "aug": 8,
+    "sep": 9, "sept": 9, "oct": 10, "nov": 11, "dec": 12,
+    # Portuguese, accent-folded ("março" -> "marco")
+    "janeiro": 1, "fevereiro": 2, "marco": 3, "abril": 4, "maio": 5, "junho": 6,
+    "julho": 7, "agosto": 8, "setembro": 9, "outubro": 10, "novembro": 11, "dezembro": 12,
+    "fev": 2, "abr": 4, "mai": 5, "ago": 8, "set": 9, "out": 10, "dez": 12,
+}
+
+ROLLING = re.compile(
+    r"\b(rolling|ongoing|open until filled|no deadline|year[- ]round|"
+    r"fluxo continuo|sem prazo|ano todo|a definir|to be announced|tba|tbd)\b"
+)
+
+# Abbreviations that are also everyday words in English or Portuguese
+AMBIGUOUS_MONTHS = {"out", "set", "may", "mar", "ago", "dez"}
+
+# Words introducing a deadline, checked just before an ambiguous month abbreviation
+DEADLINE_CONTEXT = re.compile(
+    r"\b(deadline|due|clos\w*|until|till|through|by|apply|applications?|opens?|"
+    r"ate|prazo|encerra\w*|inscri\w*|limite|data)\b\W*$"
+)
+# Words or dashes introducing the closing date of a range, right before a date
+CLOSING_CUE = re.compile(
+    r"(\b(deadline|due|clos\w*|until|till|through|by|to|ate|a|prazo|encerra\w*|termina\w*)\b\W*|[-\u2013\u2014]\s*)$"
+)
+CONTEXT_CHARS = 30
+
+_MONTH = r"(?P<month>{})\.?".format("|".join(sorted(MONTHS, key=len, reverse=True)))
+_DAY = r"(?P<day>\d{1,2})(?:st|nd|rd|th|º|o)?"
+_YEAR = r"(?P<year>\d{4})"
+
+PATTERNS = [
+    re.compile(r"\b(?P<year>\d{4})[-/.](?P<month>\d{1,2})[-/.](?P<day>\d{1,2})\b"),
+    re.compile(r"\b(?P<first>\d{1,2})[/.-](?P<second>\d{1,2})[/.-](?P<year>\d{4}|\d{2})\b"),
+    # 15 March 2026, 15 de março de 2026, 15 mar
+    re.compile(rf"\b{_DAY}\s+(?:de\s+)?{_MONTH}(?:,?\s+(?:de\s+)?{_YEAR})?\b"),
+    # March 15, 2026; Dec 1st
+    re.compile(rf"\b{_MONTH}\s+{_DAY}(?:,?\s+{_YEAR})?\b"),
+    # March 2026 (taken as the end of the month)
+    re.compile(rf"\b{_MONTH}\s+(?:de\s+)?{_YEAR}\b"),
+]
+
+
+def _make_date(year: int, month: int, day: int) -> Optional[date]:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _yearless(month: int, day: int, reference: date) -> Optional[date]:
+    candidate = _make_date(reference.year, month, day)
+    if candidate is None and month == 2 and day == 29:
+        candidate = _make_date(reference.year + (4 - reference.year % 4) % 4, month, day)
+    if candidate is not None and candidate < reference - timedelta(days=YEARLESS_GRACE_DAYS):
+        candidate = _make_date(candidate.year + 1, month, day)
+    return candidate
+
+
+class _Found(NamedTuple):
+    start: int
+    year: Optional[int]
+    month: int
+    day: Optional[int]  # None for "March 2026", read as the end of the month
+    closing: bool  # Introduced by a closing word or dash
+
+
+def _on(found: _Found, year: int) -> Optional[date]:
+    if found.day is None:
+        return date(year, found.month, calendar.monthrange(year, found.month)[1])
+    return _make_date(year, found.month, found.day)
+
+
+def _month_in_context(text: str, match: re.Match) -> bool:
+    """Whether an ambiguous month abbreviation is used as a month here"""
+    if match.group("year") or text[match.end("month"):match.end("month") + 1] == ".":
+        return True
+    if re.search(r"\bde\s", match.group(0)):
+        return True
+    return bool(DEADLINE_CONTEXT.search(text[max(0, match.start() - CONTEXT_CHARS):match.start()]))
+
+
+def _found(text: str, dayfirst: bool) -> List[_Found]:
+    """Every date mentioned in the text, in reading order"""
+    taken = []  # Spans already read by a more specific pattern ("outubro de 2026" in "10 de outubro de 2026")
+    found = []
+    for pattern in PATTERNS:
+        for match in pattern.finditer(text):
+            start, end = match.span()
+            if any(start < taken_end and taken_start < end for taken_start, taken_end in taken):
+                continue
+            groups = match.groupdict()
+            year = groups.get("year")
+            year = int(year) + (2000 if len(year) == 2 else 0) if year else None
+            if "first" in groups:
+                first, second = int(groups["first"]), int(groups["second"])
+                if first > 12 or (dayfirst and second <= 12):
+                    day, month = first, second
+                else:
+                    day, month = second, first
+            else:
+                month = groups["month"]
+                if month in AMBIGUOUS_MONTHS and not _month_in_context(text, match):
+                    continue
+                month = int(month) if month.isdigit() else MONTHS[month]
+                day = int(groups["day"]) if groups.get("day") else None
+            if not 1 <= month <= 12:
+                continue
+            taken.append((start, end))
+            closing = bool(CLOSING_CUE.search(text[max(0, start - CONTEXT_CHARS):start]))
+            found.append(_Found(start, year, month, day, closing))
+    return sorted(found)
+
+
+def _resolve(found: List[_Found], index: int, reference: date) -> Optional[date]:
+    """Date of found[index], borrowing the year of a neighbouring explicit date when it has none"""
+    target = found[index]
+    if target.year is not None:
+        return _on(target, target.year)
+    later = [other for other in found[index + 1:] if other.year is not None]
+    if later:
+        anchor = _on(later[0], later[0].year)
+        resolved = _on(target, later[0].year)
+        # "1 de dezembro a 31 de janeiro de 2027" starts the year before
+        if resolved is not None and anchor is not None and resolved > anchor:
+            resolved = _on(target, later[0].year - 1)
+        return resolved
+    earlier = [other for other in found[:index] if other.year is not None]
+    if earlier:
+        anchor = _on(earlier[-1], earlier[-1].year)
+        resolved = _on(target, earlier[-1].year)
+        if resolved is not None and anchor is not None and resolved < anchor:
+            resolved = _on(target, earlier[-1].year + 1)
+        return resolved
+    if target.day is None:
+        return None
+    return _yearless(target.month, target.day, reference)
+
+
+@lru_cache(maxsize=8192)
+def _parse(text: str, reference: date, dayfirst: bool) -> Optional[datetime]:
+    if ROLLING.search(text):
+        return None
+    found = _found(text, dayfirst)
+    # Closing-cued dates first, then the rest, each from last to first
+    order = sorted(range(len(found)), key=lambda i: (found[i].closing, i), reverse=True)
+    for index in order:
+        closing = _resolve(found, index, reference)
+        if closing is not None:
+            return datetime(closing.year, closing.month, closing.day)
+    return None
+
+
+def parse_deadline(text: Optional[str], reference: Optional[date] = None, dayfirst: bool = True) -> Optional[datetime]:
+    """Deadline date in a free-text deadline (midnight of that day), or None"""
+    if not text:
+        return None
+    normalized = " ".join(fold(text).split())
+    return _parse(normalized, reference or date.today(), dayfirst)
@@ -0,0 +1,215 @@
+"""
+Data-driven extraction of opportunities from listing pages
+
+Each source's ``selectors`` dict is compiled once into an ExtractionPlan. Fields
+are read with the source's own selectors first, falling back to shared
+heuristics (the class-name patterns the old per-site parsers used), so adding
+a source only needs an entry in opportunity_sources.py. Items are located with
+the source's container selector alone: the heuristic containers also match
+navigation menus and footers, so they are used only for unknown sites, sources
+without a container, or sources that opt in with ``heuristic_containers``.
+
+``extract_markup`` parses only the elements matching the first container
+selector and stops as soon as the item cap is reached; the full DOM is built
+only when that selector finds nothing and the heuristics have to run.
+"""
+
+import logging
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urljoin, urlparse
+
+from startup_opps_api.scraper.html_backends import HTMLBackend, Markup, Node
+
+logger = logging.getLogger(__name__)
+
+MAX_ITEMS = 10  # Items returned per listing page
+
+
+def class_match(tags: Sequence[str], words: Sequence[str]) -> str:
+    """CSS equivalent of find_all(tags, class_=re.compile('word|word'))"""
+    return ", ".join(f'{tag}[class*="{word}"]' for tag in tags for word in words)
+
+
+CARDS = ('div', 'article')
+FIELDS = ('span', 'div')
+
+# Container heuristics for unknown sites (and opted-in sources), most specific first
+FALLBACK_CONTAINERS = (
+    class_match(CARDS, ('item', 'card', 'entry', 'post')),
+    class_match(CARDS, ('opportunity', 'scholarship', 'fellowship', 'program', 'bolsa')),
+    class_match(('li',), ('item', 'entry')),
+    class_match(('div',), ('listing', 'result')),
+)
+
+FALLBACK_FIELDS = {
+    'title': (class_match(('h1', 'h2', 'h3', 'h4'), ('title', 'name')), "h1, h2, h3, h4", "h5", "a"),
+    'organization': (class_match(FIELDS, ('organization', 'provider', 'company', 'university', 'instituicao')),),
+    'amount': (class_match(FIELDS, ('amount', 'value', 'money', 'valor')),),
+    'deadline': (class_match(FIELDS, ('deadline', 'date', 'due', 'prazo')),),
+    'location': (class_match(FIELDS, ('location', 'region')),),
+    'description': (class_match(('p', 'div'), ('description', 'summary', 'details')),),
+    'url': ("a[href]",),
+}
+
+DETAIL_FIELDS = ('organization', 'amount', 'deadline', 'location', 'description')
+
+ELIGIBILITY_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in [
+        r'eligibility|eligible|requirements?|criteria',
+        r'age|years? old',
+        r'degree|education|university|college',
+        r'citizen|nationality|country',
+        r'experience|work|professional'
+    ]
+]
+
+
+def is_literal(value: str) -> bool:
+    """Selector values that start with a capital letter or digit are fixed values, e.g. "organization": "Fulbright" """
+    return bool(value) and (value[0].isupper() or value[0].isdigit())
+
+
+def extract_eligibility(item: Node) -> Optional[str]:
+    """Text of the innermost element whose own text mentions eligibility-like terms"""
+    try:
+        # Own text of the item and each descendant, in document order
+        texts = [(node, node.own_text()) for node in [item, *item.descendants()]]
+
+        for pattern in ELIGIBILITY_PATTERNS:
+            for node, own_text in texts:
+                if own_text and pattern.search(own_text):
+                    return node.text()[:200]  # Limit length
+
+        return None
+    except Exception:
+        return None
+
+
+class ExtractionPlan:
+    """Compiled container and field selectors for one source"""
+
+    def __init__(
+        self,
+        source_name: Optional[str],
+        type: Optional[str],
+        containers: Tuple[str, ...],
+        fields: Dict[str, Tuple[str, ...]],
+        literals: Dict[str, str],
+    ):
+        self.source_name = source_name
+        self.type = type
+        self.containers = containers
+        self.fields = fields
+        self.literals = literals
+
+    @classmethod
+    def compile(cls, source: Dict[str, Any], type: Optional[str] = None) -> "ExtractionPlan":
+        selectors = source.get('selectors', {})
+        containers = tuple(filter(None, [selectors.get('container')]))
+        if not containers or source.get('heuristic_containers'):
+            containers += FALLBACK_CONTAINERS
+        fields = {}
+        literals = {}
+        for field, fallbacks in FALLBACK_FIELDS.items():
+            configured = selectors.get(field)
+            if configured and is_literal(configured):
+                literals[field] = configured
+                fields[field] = ()
+            elif configured:
+                fields[field] = (configured,) + fallbacks
+            else:
+                fields[field] = fallbacks
+        return cls(source.get('name'), type, containers, fields, literals)
+
+    def find_containers(self, root: Node, selectors: Optional[Sequence[str]] = None) -> List[Node]:
+        for selector in self.containers if selectors is None else selectors:
+            items = root.select(selector)
+            if items:
+                return items
+        return []
+
+    def extract(self, root: Node, page_url: str, keyword: str = "", type: str = "", limit: Optional[int] = MAX_ITEMS) -> List[Dict[str, Any]]:
+        """Run the plan over a parsed page, stopping after ``limit`` items (None for all)"""
+        return self.extract_items(self.find_containers(root), page_url, keyword, type, limit)
+
+    def extract_markup(self, backend: HTMLBackend, markup: Markup, page_url: str, keyword: str = "", type: str = "", limit: Optional[int] = MAX_ITEMS) -> List[Dict[str, Any]]:
+        """Run the plan over raw markup, materializing only the container subtrees.
+
+        Same results as ``extract(backend.parse(markup), ...)``.
+        """
+        primary, fallbacks = self.containers[0], self.containers[1:]
+        matched = False
+
+        def containers() -> Iterator[Node]:
+            nonlocal matched
+            for node in backend.iter_containers(markup, primary):
+                matched = True
+                yield node
+
+        opportunities = self.extract_items(containers(), page_url, keyword, type, limit)
+        if matched or not fallbacks:
+            return opportunities
+
+        root = backend.parse(markup)
+        return self.extract_items(self.find_containers(root, fallbacks), page_url, keyword, type, limit)
+
+    def extract_items(self, items: Iterable[Node], page_url: str, keyword: str = "", type: str = "", limit: Optional[int] = MAX_ITEMS) -> List[Dict[str, Any]]:
+        """Run the plan over already located containers, consuming ``items`` only as far as needed"""
+        opportunities = []
+        host = urlparse(page_url).netloc
+        source_name = self.source_name or host
+        keyword_lower = keyword.lower() if keyword else ""
+
+        for item in items:
+            try:
+                title = self._text(item, 'title')
+
+                # Filter by keyword
+                if keyword_lower and title and keyword_lower not in title.lower():
+                    continue
+
+                url = self._href(item)
+                if not title or not url:
+                    continue
+
+                opportunity = {'title': title}
+                opportunity.update((field, self._text(item, field)) for field in DETAIL_FIELDS)
+                opportunity.update({
+                    'organization': opportunity['organization'] or source_name,
+                    'type': self.type or type or 'opportunity',
+                    'url': urljoin(page_url, url),
+                    'source': source_name,
+                    'eligibility': extract_eligibility(item),
+                })
+                opportunities.append(opportunity)
+                if limit and len(opportunities) >= limit:
+                    break
+
+            except Exception as e:
+                logger.error(f"Error parsing {source_name} item: {e}")
+                continue
+
+        return opportunities
+
+    def _text(self, item: Node, field: str) -> Optional[str]:
+        if field in self.literals:
+            return self.literals[field]
+        for selector in self.fields[field]:
+            elem = item.select_one(selector)
+            if elem is not None:
+                text = elem.text()
+                if text:
+                    return text
+        return None
+
+    def _href(self, item: Node) -> Optional[str]:
+        for selector in self.fields['url']:
+            for elem in item.select(selector):
+                href = elem.attr('href')
+                if href:
+                    return href
+        return None
+
+
+GENERIC_PLAN = ExtractionPlan.compile({})
@@ -0,0 +1,149 @@
+"""
+Process-wide async HTTP fetcher with a shared connection pool
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from startup_opps_api.scraper.http_cache import HTTPCache, get_http_cache
+from startup_opps_api.services.circuit_breaker import circuit_breakers
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 negotiation in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+
+@dataclass
+class FetchResult:
+    """Response data handed to the parsers"""
+    url: str
+    status: int
+    content: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+class AsyncFetcher:
+    """Shared httpx client with keep-alive, optional HTTP/2 and per-host concurrency limits"""
+
+    def __init__(
+        self,
+        max_connections: int = int(os.getenv("FETCH_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections: int = int(os.getenv("FETCH_MAX_KEEPALIVE", "20")),
+        per_host_limit: int = int(os.getenv("FETCH_PER_HOST_LIMIT", "4")),
+        timeout: float = 10,
+        cache: Optional[HTTPCache] = None,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=60,
+        )
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.cache = cache
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                limits=self.limits,
+                timeout=self.timeout,
+                follow_redirects=True,
+                headers={'User-Agent': USER_AGENT},
+            )
+        return self._client
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc.lower()
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        return semaphore
+
+    async def fetch(self, url: str, timeout: Optional[float] = None) -> FetchResult:
+        """GET a URL, raising httpx.HTTPStatusError for error responses.
+
+        Raises CircuitOpenError without a request while the host's circuit is
+        open; otherwise the timeout defaults to the host's adaptive one. When a
+        cache is configured the request is conditional and a 304 is answered
+        from the cached body (or, if the entry was evicted meanwhile, the page is
+        requested again unconditionally); cache reads and writes (SQLite) run
+        in a worker thread so they don't block the event loop.
+        """
+        circuit_breakers.check(url)
+        headers = await asyncio.to_thread(self.cache.conditional_headers, url) if self.cache else {}
+        response = await self._get(url, headers, timeout)
+
+        if response.status_code == 304 and self.cache:
+            cached = await asyncio.to_thread(self.cache.revalidated, url)
+            if cached is not None:
+                return FetchResult(
+                    url=url,
+                    status=200,
+                    content=cached.body,
+                    headers={'content-type': cached.content_type or ''},
+                )
+            logger.info(f"Cached copy of {url} was evicted before its 304 arrived, fetching it again")
+            response = await self._get(url, {}, timeout)
+
+        response.raise_for_status()
+        if self.cache and response.status_code == 200:
+            await asyncio.to_thread(self.cache.store, url, response.content, response.headers)
+        return FetchResult(
+            url=str(response.url),
+            status=response.status_code,
+            content=response.content,
+            headers=dict(response.headers),
+        )
+
+    async def _get(self, url: str, headers: Dict[str, str], timeout: Optional[float]) -> httpx.Response:
+        """One GET within the host's concurrency limit, recorded with its circuit breaker"""
+        client = self._get_client()
+        async with self._host_semaphore(url):
+            started = time.perf_counter()
+            try:
+                response = await client.get(
+                    url, headers=headers, timeout=timeout or circuit_breakers.timeout_for(url, self.timeout)
+                )
+            except httpx.TransportError as e:  # Timeouts and connection errors
+                circuit_breakers.record_failure(url, type(e).__name__)
+                raise
+        circuit_breakers.record_response(url, response.status_code, time.perf_counter() - started)
+        return response
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_fetcher: Optional[AsyncFetcher] = None
+
+
+def get_fetcher() -> AsyncFetcher:
+    """Return the process-wide fetcher"""
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = AsyncFetcher(cache=get_http_cache())
+    return _fetcher
+
+
+async def close_fetcher():
+    """Close the shared connection pool"""
+    if _fetcher is not None:
+        await _fetcher.aclose()
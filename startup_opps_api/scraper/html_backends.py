@@ -0,0 +1,445 @@
+"""
+Pluggable HTML parser backends exposing one small node API to the parsers
+
+Backends, fastest first: selectolax (lexbor), lxml with compiled CSS selectors,
+and BeautifulSoup as the always-available fallback. Pick one explicitly with
+the HTML_PARSER_BACKEND environment variable.
+
+Backends can also parse only the elements matching a container selector
+(``iter_containers``) so boilerplate around the cards is never materialized.
+"""
+
+import logging
+import os
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Type, Union
+
+logger = logging.getLogger(__name__)
+
+Markup = Union[bytes, str]
+
+# One compound selector: (tag or None, ((attribute, operator, value), ...))
+Compound = Tuple[Optional[str], Tuple[Tuple[str, str, Optional[str]], ...]]
+
+STREAM_CHUNK_SIZE = 16 * 1024  # Characters fed to the lxml pull parser at a time
+
+
+class Node:
+    """Element wrapper shared by all backends"""
+
+    def select(self, css: str) -> List["Node"]:
+        """Descendants matching a CSS selector, in document order"""
+        raise NotImplementedError
+
+    def select_one(self, css: str) -> Optional["Node"]:
+        matches = self.select(css)
+        return matches[0] if matches else None
+
+    def text(self) -> str:
+        """All descendant text, each piece stripped and joined (like get_text(strip=True))"""
+        raise NotImplementedError
+
+    def own_text(self) -> str:
+        """Text directly inside this element, excluding child elements"""
+        raise NotImplementedError
+
+    def attr(self, name: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def descendants(self) -> Iterator["Node"]:
+        """Descendant elements in document order"""
+        raise NotImplementedError
+
+
+class HTMLBackend:
+    """Parses markup into a root Node"""
+
+    name = ""
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    def parse(self, markup: Markup) -> Node:
+        raise NotImplementedError
+
+    def iter_containers(self, markup: Markup, css: str) -> Iterator[Node]:
+        """Elements matching ``css`` in document order, built as lazily as the backend allows.
+
+        Callers should stop iterating once they have enough items; nodes are
+        only guaranteed to be usable until the next one is requested.
+        """
+        yield from self.parse(markup).select(css)
+
+
+# --- Simple selector matching ------------------------------------------------
+
+@lru_cache(maxsize=512)
+def compound_selectors(css: str) -> Optional[Tuple[Compound, ...]]:
+    """Split a selector group into compound selectors that only test an element's own tag and attributes.
+
+    Returns None when any part uses combinators or pseudo-classes, since
+    those need the rest of the document to match.
+    """
+    try:
+        from cssselect import SelectorError, parse
+        from cssselect.parser import Attrib, Class, Element, Hash
+    except ImportError:
+        return None
+
+    try:
+        selectors = parse(css)
+    except SelectorError:
+        return None
+
+    compounds = []
+    for selector in selectors:
+        if selector.pseudo_element:
+            return None
+        tree = selector.parsed_tree
+        conditions = []
+        while not isinstance(tree, Element):
+            if isinstance(tree, Class):
+                conditions.append(('class', '~=', tree.class_name))
+            elif isinstance(tree, Hash):
+                conditions.append(('id', '=', tree.id))
+            elif isinstance(tree, Attrib) and tree.namespace is None:
+                value = getattr(tree.value, 'value', tree.value)
+                conditions.append((tree.attrib.lower(), tree.operator, value))
+            else:
+                return None
+            tree = tree.selector
+        tag = tree.element.lower() if tree.element and tree.element != '*' else None
+        compounds.append((tag, tuple(reversed(conditions))))
+    return tuple(compounds)
+
+
+_ATTRIBUTE_TESTS: Dict[str, Callable[[str, Optional[str]], bool]] = {
+    'exists': lambda actual, expected: True,
+    '=': lambda actual, expected: actual == expected,
+    '~=': lambda actual, expected: expected in actual.split(),
+    '|=': lambda actual, expected: actual == expected or actual.startswith(f"{expected}-"),
+    '^=': lambda actual, expected: bool(expected) and actual.startswith(expected),
+    '$=': lambda actual, expected: bool(expected) and actual.endswith(expected),
+    '*=': lambda actual, expected: bool(expected) and expected in actual,
+}
+
+
+def _matches_compound(compound: Compound, tag: str, get: Callable[[str], Optional[str]]) -> bool:
+    name, conditions = compound
+    if name is not None and name != tag:
+        return False
+    for attribute, operator, expected in conditions:
+        actual = get(attribute)
+        if actual is None or not _ATTRIBUTE_TESTS[operator](actual, expected):
+            return False
+    return True
+
+
+@lru_cache(maxsize=512)
+def element_matcher(css: str) -> Optional[Callable[[str, Callable[[str], Optional[str]]], bool]]:
+    """Compile a simple selector group into ``match(tag, get_attribute)``, or None if it isn't simple"""
+    compounds = compound_selectors(css)
+    if compounds is None:
+        return None
+
+    # Cheap rejections first: most elements fail on tag name or a missing attribute
+    tags = {name for name, _ in compounds}
+    tags = None if None in tags else frozenset(tags)
+    first_attributes = {conditions[0][0] if conditions else None for _, conditions in compounds}
+    required = first_attributes.pop() if len(first_attributes) == 1 else None
+
+    def match(tag: str, get: Callable[[str], Optional[str]]) -> bool:
+        if tags is not None and tag not in tags:
+            return False
+        if required is not None and get(required) is None:
+            return False
+        return any(_matches_compound(compound, tag, get) for compound in compounds)
+
+    return match
+
+
+def _decode_markup(markup: Markup) -> Markup:
+    """Without a <meta charset> libxml2 assumes latin-1; prefer UTF-8 when it decodes"""
+    if isinstance(markup, bytes):
+        try:
+            return markup.decode("utf-8")
+        except UnicodeDecodeError:
+            pass
+    return markup
+
+
+# --- BeautifulSoup -----------------------------------------------------------
+
+class SoupNode(Node):
+    def __init__(self, element):
+        self.element = element
+
+    def select(self, css: str) -> List[Node]:
+        return [SoupNode(el) for el in _soup_selector(css).select(self.element)]
+
+    def select_one(self, css: str) -> Optional[Node]:
+        el = _soup_selector(css).select_one(self.element)
+        return SoupNode(el) if el is not None else None
+
+    def text(self) -> str:
+        return self.element.get_text(strip=True)
+
+    def own_text(self) -> str:
+        return "".join(self.element.find_all(string=True, recursive=False))
+
+    def attr(self, name: str) -> Optional[str]:
+        value = self.element.get(name)
+        if isinstance(value, list):
+            return " ".join(value)
+        return value
+
+    def descendants(self) -> Iterator[Node]:
+        for el in self.element.find_all(True):
+            yield SoupNode(el)
+
+
+@lru_cache(maxsize=512)
+def _soup_selector(css: str):
+    import soupsieve
+    return soupsieve.compile(css)
+
+
+class BeautifulSoupBackend(HTMLBackend):
+    name = "bs4"
+
+    def __init__(self, features: Optional[str] = None):
+        # lxml's tree builder is much faster than html.parser when installed
+        self.features = features or ("lxml" if LxmlBackend.available() else "html.parser")
+
+    def parse(self, markup: Markup) -> Node:
+        from bs4 import BeautifulSoup
+        return SoupNode(BeautifulSoup(markup, self.features))
+
+    def iter_containers(self, markup: Markup, css: str) -> Iterator[Node]:
+        strainer = _soup_strainer(css)
+        if strainer is None:
+            yield from super().iter_containers(markup, css)
+            return
+        from bs4 import BeautifulSoup
+        # The strainer keeps a superset of the containers (and their subtrees);
+        # the exact selector then runs over that much smaller document
+        yield from SoupNode(BeautifulSoup(markup, self.features, parse_only=strainer)).select(css)
+
+
+def _soup_strainer(css: str):
+    """SoupStrainer keeping candidate containers by tag and class, or None if the selector can't be prefiltered"""
+    compounds = compound_selectors(css)
+    if not compounds:
+        return None
+    class_tests = []
+    for _, conditions in compounds:
+        tests = [(operator, expected) for attribute, operator, expected in conditions if attribute == 'class']
+        if not tests:
+            return None
+        class_tests.append(tests)
+
+    def class_matches(value) -> bool:
+        if value is None:
+            return False
+        if isinstance(value, list):
+            value = " ".join(value)
+        return any(
+            all(_ATTRIBUTE_TESTS[operator](value, expected) for operator, expected in tests)
+            for tests in class_tests
+        )
+
+    from bs4 import SoupStrainer
+    tags = {tag for tag, _ in compounds}
+    if None in tags:
+        return SoupStrainer(attrs={'class': class_matches})
+    return SoupStrainer(sorted(tags), attrs={'class': class_matches})
+
+
+# --- lxml --------------------------------------------------------------------
+
+class LxmlNode(Node):
+    def __init__(self, element):
+        self.element = element
+
+    def select(self, css: str) -> List[Node]:
+        return [LxmlNode(el) for el in _lxml_selector(css)(self.element)]
+
+    def text(self) -> str:
+        return "".join(piece.strip() for piece in self.element.itertext())
+
+    def own_text(self) -> str:
+        pieces = [self.element.text or ""]
+        pieces.extend(child.tail or "" for child in self.element)
+        return "".join(pieces)
+
+    def attr(self, name: str) -> Optional[str]:
+        return self.element.get(name)
+
+    def descendants(self) -> Iterator[Node]:
+        for el in self.element.iterdescendants():
+            if isinstance(el.tag, str):  # skip comments and processing instructions
+                yield LxmlNode(el)
+
+
+@lru_cache(maxsize=512)
+def _lxml_selector(css: str):
+    """Compile a CSS selector to an XPath over descendants only (bs4 semantics)"""
+    from cssselect import HTMLTranslator
+    from lxml import etree
+    return etree.XPath(HTMLTranslator().css_to_xpath(css, prefix="descendant::"))
+
+
+class LxmlBackend(HTMLBackend):
+    name = "lxml"
+
+    @classmethod
+    def available(cls) -> bool:
+        try:
+            import lxml.html  # noqa: F401
+            import cssselect  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def parse(self, markup: Markup) -> Node:
+        import lxml.html
+        if not markup or not markup.strip():
+            markup = "<html></html>"
+        return LxmlNode(lxml.html.document_fromstring(_decode_markup(markup)))
+
+    def iter_containers(self, markup: Markup, css: str) -> Iterator[Node]:
+        """Stream the page through a pull parser, yielding each container once it is complete.
+
+        Elements outside any container are cleared as soon as they end, and
+        parsing stops as soon as the caller stops iterating.
+        """
+        match = element_matcher(css)
+        if match is None:
+            yield from super().iter_containers(markup, css)
+            return
+        if not markup or not markup.strip():
+            return
+
+        from lxml import etree
+        text = _decode_markup(markup)
+        parser = etree.HTMLPullParser(events=("start", "end"))
+        open_matches = []  # Matched elements that have started but not ended
+        batch = []  # Matches inside the outermost open match, in document order
+
+        def handle(events):
+            for event, el in events:
+                if event == "start":
+                    if isinstance(el.tag, str) and match(el.tag, el.get):
+                        open_matches.append(el)
+                        batch.append(el)
+                elif open_matches:
+                    if el is open_matches[-1]:
+                        open_matches.pop()
+                        if not open_matches:
+                            # Nested matches end before their ancestor; emit the group in document order
+                            for matched in batch:
+                                yield LxmlNode(matched)
+                            batch.clear()
+                            el.clear(keep_tail=False)
+                else:
+                    el.clear(keep_tail=False)  # Boilerplate outside any container
+
+        for offset in range(0, len(text), STREAM_CHUNK_SIZE):
+            parser.feed(text[offset:offset + STREAM_CHUNK_SIZE])
+            yield from handle(parser.read_events())
+        parser.close()
+        yield from handle(parser.read_events())
+
+
+# --- selectolax --------------------------------------------------------------
+
+class SelectolaxNode(Node):
+    def __init__(self, node):
+        self.node = node
+
+    def select(self, css: str) -> List[Node]:
+        # lexbor includes the context node itself and repeats nodes matched by
+        # several selectors of a group, so filter both
+        seen = {self.node.mem_id}
+        matches = []
+        for n in self.node.css(css):
+            if n.mem_id not in seen:
+                seen.add(n.mem_id)
+                matches.append(SelectolaxNode(n))
+        return matches
+
+    def select_one(self, css: str) -> Optional[Node]:
+        first = self.node.css_first(css)
+        if first is None:
+            return None
+        if first.mem_id != self.node.mem_id:
+            return SelectolaxNode(first)
+        return super().select_one(css)
+
+    def text(self) -> str:
+        return self.node.text(deep=True, separator="", strip=True)
+
+    def own_text(self) -> str:
+        return self.node.text(deep=False)
+
+    def attr(self, name: str) -> Optional[str]:
+        return self.node.attributes.get(name)
+
+    def descendants(self) -> Iterator[Node]:
+        nodes = self.node.traverse(include_text=False)
+        next(nodes, None)  # traverse starts with the node itself
+        for n in nodes:
+            if not n.tag.startswith("-"):  # skip comments
+                yield SelectolaxNode(n)
+
+
+class SelectolaxBackend(HTMLBackend):
+    name = "selectolax"
+
+    @classmethod
+    def available(cls) -> bool:
+        try:
+            from selectolax.lexbor import LexborHTMLParser  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def parse(self, markup: Markup) -> Node:
+        from selectolax.lexbor import LexborHTMLParser
+        tree = LexborHTMLParser(markup)
+        return SelectolaxNode(tree.root)
+
+    def iter_containers(self, markup: Markup, css: str) -> Iterator[Node]:
+        # lexbor always builds the whole tree (fast enough that streaming would
+        # not pay off); only wrap the matches the caller actually consumes
+        from selectolax.lexbor import LexborHTMLParser
+        seen = set()
+        for n in LexborHTMLParser(markup).root.css(css):
+            if n.mem_id not in seen:
+                seen.add(n.mem_id)
+                yield SelectolaxNode(n)
+
+
+BACKENDS: Dict[str, Type[HTMLBackend]] = {
+    SelectolaxBackend.name: SelectolaxBackend,
+    LxmlBackend.name: LxmlBackend,
+    BeautifulSoupBackend.name: BeautifulSoupBackend,
+}
+
+
+def get_backend(name: Optional[str] = None) -> HTMLBackend:
+    """Return the requested backend, or the fastest one installed"""
+    name = name or os.getenv("HTML_PARSER_BACKEND")
+    if name:
+        backend_cls = BACKENDS.get(name)
+        if backend_cls is None:
+            raise ValueError(f"Unknown HTML parser backend: {name}")
+        if backend_cls.available():
+            return backend_cls()
+        logger.warning(f"HTML parser backend '{name}' is not installed, falling back")
+
+    for backend_cls in BACKENDS.values():
+        if backend_cls.available():
+            return backend_cls()
+    return BeautifulSoupBackend()
@@ -0,0 +1,155 @@
+"""
+Persistent HTTP response cache used for conditional GETs (ETag / Last-Modified)
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+HTTP_CACHE_PATH = os.getenv("HTTP_CACHE_PATH", "./data/http_cache.sqlite")
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content_type: Optional[str]
+
+
+class HTTPCache:
+    """Stores response bodies and validators per URL in a SQLite file, evicting least recently used entries"""
+
+    def __init__(self, path: str = HTTP_CACHE_PATH, max_bytes: int = HTTP_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.counters = {"lookups": 0, "validated": 0, "revalidated": 0, "stored": 0, "evicted": 0}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                content_type TEXT,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_responses_accessed_at ON responses (accessed_at)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, content_type FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return CachedResponse(url=url, body=row[0], etag=row[1], last_modified=row[2], content_type=row[3])
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Validators to send with the next request for this URL"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            self.counters["lookups"] += 1
+            self.counters["validated"] += row is not None
+        headers = {}
+        if row is not None:
+            if row[0]:
+                headers["If-None-Match"] = row[0]
+            if row[1]:
+                headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def revalidated(self, url: str) -> Optional[CachedResponse]:
+        """Handle a 304: mark the entry as recently used and return it"""
+        with self._lock:
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+            self.counters["revalidated"] += 1
+        return self.get(url)
+
+    def store(self, url: str, body: bytes, headers: Mapping[str, str]):
+        """Cache a 200 response if the server sent validators for it"""
+        etag = headers.get("etag") or headers.get("ETag")
+        last_modified = headers.get("last-modified") or headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        size = len(body)
+        if size > self.max_bytes:
+            return
+        content_type = headers.get("content-type") or headers.get("Content-Type")
+
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (url, body, etag, last_modified, content_type, size, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, content_type, size, time.time()),
+            )
+            self._total_bytes += size - (previous[0] if previous else 0)
+            self.counters["stored"] += 1
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache is back under 90% of its budget"""
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute("SELECT url, size FROM responses ORDER BY accessed_at").fetchall()
+        evicted = 0
+        for url, size in rows:
+            if self._total_bytes <= target:
+                break
+            self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            self._total_bytes -= size
+            evicted += 1
+        self.counters["evicted"] += evicted
+        logger.info(f"HTTP cache evicted {evicted} entries")
+
+    def stats(self) -> Dict[str, float]:
+        """Counters since startup; hit_ratio is the share of lookups the server answered with 304 Not Modified"""
+        with self._lock:
+            lookups = self.counters["lookups"]
+            return {
+                **self.counters,
+                "hit_ratio": round(self.counters["revalidated"] / lookups, 4) if lookups else 0.0,
+                "bytes": self._total_bytes,
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache: Optional[HTTPCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> HTTPCache:
+    """Return the process-wide HTTP cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HTTPCache()
+        return _cache
@@ -0,0 +1,48 @@
+"""
+Scrapy downloader middlewares
+"""
+
+from scrapy.responsetypes import responsetypes
+
+from startup_opps_api.scraper.http_cache import get_http_cache
+
+
+class ConditionalGetMiddleware:
+    """Revalidates listing pages against the shared HTTP cache.
+
+    Sends If-None-Match / If-Modified-Since for cached URLs and turns a 304
+    into the cached 200 response. Placed below HttpCompressionMiddleware so
+    bodies are cached decompressed and can be shared with the async fetcher.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(get_http_cache())
+
+    def process_request(self, request, spider=None):
+        for name, value in self.cache.conditional_headers(request.url).items():
+            request.headers.setdefault(name, value)
+        return None
+
+    def process_response(self, request, response, spider=None):
+        if response.status == 304:
+            cached = self.cache.revalidated(request.url)
+            if cached is None:
+                return response
+            headers = {"Content-Type": cached.content_type} if cached.content_type else {}
+            respcls = responsetypes.from_args(headers=headers, url=request.url, body=cached.body)
+            return respcls(
+                url=request.url,
+                status=200,
+                headers=headers,
+                body=cached.body,
+                request=request,
+                flags=response.flags + ["cached"],
+            )
+
+        if response.status == 200 and "cached" not in response.flags:
+            self.cache.store(request.url, response.body, response.headers.to_unicode_dict())
+        return response
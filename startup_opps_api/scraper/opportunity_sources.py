@@ -1,7 +1,20 @@
 """
 Trusted opportunity sources for scholarships, fellowships, and accelerators
+
+Each source's ``search_url`` is fetched unfiltered and filtered locally. A source
+whose site really supports server-side search can declare the query parameter
+with ``"search_param": "q"`` to get one fetch per keyword instead.
+
+``selectors`` drive extraction for both crawl paths (see extraction.py). A
+value starting with a capital letter or digit is a fixed value rather than a
+CSS selector, e.g. ``"organization": "Fulbright"``.
+Items are located with the ``container`` selector only; a source whose markup
+varies can set ``"heuristic_containers": True`` to also try the generic
+container patterns when its own container matches nothing.
 """
 
+from urllib.parse import urlencode
+
 OPPORTUNITY_SOURCES = {
     "scholarships": [
         {
@@ -520,3 +533,51 @@ ADDITIONAL_SOURCES = [
         }
     }
 ]
+
+# Singular labels used by the API and stored on Opportunity.type
+SOURCE_TYPE_LABELS = {
+    "scholarships": "scholarship",
+    "fellowships": "fellowship",
+    "accelerators": "accelerator",
+}
+
+
+def normalize_type(type):
+    """Map user-facing type strings ("scholarships", "accel", ...) to a stored type label"""
+    if not type:
+        return None
+    type = type.strip().lower()
+    if type in SOURCE_TYPE_LABELS:
+        return SOURCE_TYPE_LABELS[type]
+    if type in ("accel", "acceleration"):
+        return "accelerator"
+    return type
+
+
+def source_type(source):
+    """Type label for a source ("scholarship", "fellowship", "accelerator")"""
+    return normalize_type(source.get("type")) or "opportunity"
+
+
+def iter_sources():
+    """Yield (source, type label) for every configured source"""
+    for sources in OPPORTUNITY_SOURCES.values():
+        for source in sources:
+            yield source, source_type(source)
+    for source in ADDITIONAL_SOURCES:
+        yield source, source_type(source)
+
+
+def listing_url(source, keyword=""):
+    """URL to fetch for a source; only sources with server-side search get the keyword"""
+    search_param = source.get("search_param")
+    if not keyword or not search_param:
+        return source["search_url"]
+    separator = "&" if "?" in source["search_url"] else "?"
+    return source["search_url"] + separator + urlencode({search_param: keyword})
+
+
+# Tag grouped sources with their group so every source carries a type
+for _group, _sources in OPPORTUNITY_SOURCES.items():
+    for _source in _sources:
+        _source.setdefault("type", _group)
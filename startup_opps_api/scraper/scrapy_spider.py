@@ -1,7 +1,13 @@
+import time
+
 import scrapy
-import logging
-from urllib.parse import urljoin, urlparse
-from startup_opps_api.scraper.opportunity_sources import OPPORTUNITY_SOURCES, ADDITIONAL_SOURCES
+from scrapy.exceptions import IgnoreRequest
+from scrapy.spidermiddlewares.httperror import HttpError
+from startup_opps_api.scraper.html_backends import get_backend
+from startup_opps_api.scraper.opportunity_sources import listing_url
+from startup_opps_api.scraper.source_registry import source_registry
+from startup_opps_api.services.circuit_breaker import circuit_breakers
+from startup_opps_api.services.telemetry import telemetry
 
 class StartupOpportunitiesSpider(scrapy.Spider):
     name = "opps_spider"
@@ -15,118 +21,99 @@ class StartupOpportunitiesSpider(scrapy.Spider):
         'CONCURRENT_REQUESTS_PER_DOMAIN': 8,
         'RETRY_TIMES': 3,
         'RETRY_HTTP_CODES': [500, 502, 503, 504, 408, 429],
+        # Upper bound; hosts with known latency get a shorter per-request timeout
+        'DOWNLOAD_TIMEOUT': 15,
+        # Revalidate listing pages against the shared on-disk cache (below HttpCompression at 590)
+        'DOWNLOADER_MIDDLEWARES': {
+            'startup_opps_api.scraper.middlewares.ConditionalGetMiddleware': 580,
+        },
     }
 
-    def __init__(self, keyword="", region="", type="", **kwargs):
+    def __init__(self, keyword="", region="", type="", sources=None, **kwargs):
         super().__init__(**kwargs)
         self.keyword = keyword
         self.region = region
         self.type = type
+        self.sources = sources
+        self.backend = get_backend()
+        self._sources_by_url = {}
         self.start_urls = self._build_start_urls()
         self.logger.info(f"Starting spider with keyword: {keyword}, type: {type}, region: {region}")
 
     def _build_start_urls(self):
-        """Build start URLs based on opportunity type and keyword"""
-        urls = []
-        
-        # Get sources based on type
-        if self.type and self.type.lower() in OPPORTUNITY_SOURCES:
-            sources = OPPORTUNITY_SOURCES[self.type.lower()]
+        """Build start URLs based on opportunity type.
+
+        Listings are fetched unfiltered; only sources that declare server-side
+        search get the keyword in their URL.
+        """
+        if self.sources is not None:
+            sources = self.sources
         else:
-            # If no specific type, use all sources
-            sources = []
-            for type_sources in OPPORTUNITY_SOURCES.values():
-                sources.extend(type_sources)
-        
-        # Add additional sources
-        sources.extend(ADDITIONAL_SOURCES)
-        
-        for source in sources:
-            if self.keyword:
-                # Add keyword to search URL
-                search_url = source['search_url']
-                if '?' in search_url:
-                    search_url += f"&q={self.keyword}"
-                else:
-                    search_url += f"?q={self.keyword}"
-                urls.append(search_url)
-            else:
-                urls.append(source['search_url'])
+            # Sources of the requested type, or every source if no type was given
+            sources = source_registry.for_type(self.type)
         
-        return urls
+        self._sources_by_url = {listing_url(source, self.keyword): source for source in sources}
+        return list(self._sources_by_url)
+
+    async def start(self):
+        for request in self.start_requests():
+            yield request
+
+    def start_requests(self):
+        # Explicit requests so download failures reach on_error and get recorded
+        default_timeout = self.settings.getfloat('DOWNLOAD_TIMEOUT')
+        for url in self.start_urls:
+            if not circuit_breakers.allow(url):
+                self.logger.info(f"Skipping {url}: circuit open")
+                continue
+            yield scrapy.Request(
+                url, callback=self.parse, errback=self.on_error, dont_filter=True,
+                meta={'download_timeout': circuit_breakers.timeout_for(url, default_timeout)},
+            )
 
     def parse(self, response):
         """Parse response and extract opportunity data"""
         self.logger.info(f"Parsing: {response.url}")
+        started = time.perf_counter()
         
-        # Determine which source this is based on URL
-        source_config = self._get_source_config(response.url)
-        if not source_config:
+        # Determine which source this is: the one we requested (before redirects), else by URL
+        requested_url = response.meta.get("redirect_urls", [response.url])[0]
+        source = self._sources_by_url.get(requested_url)
+        if source is not None:
+            plan = source_registry.plan(source)
+        else:
+            plan = source_registry.plan_for_url(response.url, generic=False)
+        if not plan:
             self.logger.warning(f"No source config found for: {response.url}")
             return
         
-        # Extract opportunities using source-specific selectors
-        opportunities = response.css(source_config['selectors']['container'])
-        
-        for opp in opportunities:
-            try:
-                opportunity_data = self._extract_opportunity_data(opp, source_config, response)
-                if opportunity_data and self._is_valid_opportunity(opportunity_data):
-                    yield opportunity_data
-            except Exception as e:
-                self.logger.error(f"Error extracting opportunity: {e}")
-                continue
-
-    def _get_source_config(self, url):
-        """Get source configuration based on URL"""
-        all_sources = []
-        for type_sources in OPPORTUNITY_SOURCES.values():
-            all_sources.extend(type_sources)
-        all_sources.extend(ADDITIONAL_SOURCES)
-        
-        for source in all_sources:
-            if source['base_url'] in url:
-                return source
-        return None
+        # Extract every opportunity on the page with the source's compiled extraction plan
+        opportunities = [
+            opportunity_data
+            for opportunity_data in plan.extract_markup(self.backend, response.text, response.url, limit=None)
+            if self._is_valid_opportunity(opportunity_data)
+        ]
+        circuit_breakers.record_response(requested_url, response.status, response.meta.get("download_latency", 0))
+        self._record(requested_url, response.meta.get("download_latency", 0) + time.perf_counter() - started,
+                     response.status, len(response.body), len(opportunities))
+        yield from opportunities
 
-    def _extract_opportunity_data(self, opp, source_config, response):
-        """Extract opportunity data using source-specific selectors"""
-        selectors = source_config['selectors']
-        
-        title = self._safe_extract(opp, selectors.get('title', ''))
-        organization = self._safe_extract(opp, selectors.get('organization', ''))
-        deadline = self._safe_extract(opp, selectors.get('deadline', ''))
-        url = self._safe_extract(opp, selectors.get('url', ''), is_url=True)
-        
-        if url and not url.startswith('http'):
-            url = urljoin(response.url, url)
-        
-        return {
-            "title": title,
-            "organization": organization,
-            "type": self.type or source_config.get('type', 'opportunity'),
-            "deadline": deadline,
-            "url": url,
-            "source": source_config['name'],
-            "region": self.region,
-            "keyword": self.keyword
-        }
+    def on_error(self, failure):
+        """Record a listing that failed to download or came back with an error status"""
+        request = failure.request
+        response = failure.value.response if failure.check(HttpError) else None
+        if response is not None:
+            circuit_breakers.record_response(request.url, response.status, request.meta.get("download_latency", 0))
+        elif not failure.check(IgnoreRequest):  # Not a robots.txt denial: timed out or could not connect
+            circuit_breakers.record_failure(request.url, type(failure.value).__name__)
+        self._record(request.url, request.meta.get("download_latency", 0),
+                     response.status if response is not None else None,
+                     len(response.body) if response is not None else None, 0, failure.value)
 
-    def _safe_extract(self, element, selector, is_url=False):
-        """Safely extract text from element using CSS selector"""
-        if not selector:
-            return None
-        
-        try:
-            if is_url:
-                result = element.css(f"{selector}::attr(href)").get()
-            else:
-                result = element.css(f"{selector}::text").get()
-            
-            return result.strip() if result else None
-        except Exception as e:
-            self.logger.error(f"Error extracting with selector '{selector}': {e}")
-            return None
+    def _record(self, url, latency_seconds, http_status, response_bytes, items, error=None):
+        source = self._sources_by_url.get(url) or source_registry.for_url(url)
+        telemetry.record(source["name"] if source else None, url, "scrapy", latency_seconds,
+                         http_status, response_bytes, items, error)
 
     def _is_valid_opportunity(self, opportunity):
         """Validate that opportunity has required fields"""
@@ -0,0 +1,286 @@
+"""
+Indexed, validated registry of opportunity sources
+
+Built once at import from opportunity_sources.py, or from the JSON/YAML file
+named by SOURCES_FILE. The file is re-read when its modification time changes,
+so sources can be added or fixed without a restart. Every lookup goes through
+dict indexes (host, type label, name) built when the sources are loaded.
+
+The file holds either a list of source entries or an object of groups shaped
+like OPPORTUNITY_SOURCES ({"scholarships": [...], ...}); entries in a group
+default to that group's type, except in the "additional" group.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from startup_opps_api.scraper.extraction import FALLBACK_FIELDS, GENERIC_PLAN, ExtractionPlan, is_literal
+from startup_opps_api.scraper.opportunity_sources import iter_sources, normalize_type, source_type
+
+logger = logging.getLogger(__name__)
+
+SOURCES_FILE = os.getenv("SOURCES_FILE")
+# Minimum time between modification-time checks of SOURCES_FILE
+SOURCES_RELOAD_INTERVAL_SECONDS = float(os.getenv("SOURCES_RELOAD_INTERVAL_SECONDS", "5"))
+
+SOURCE_FIELDS = {"name", "base_url", "search_url", "type", "js", "search_param", "selectors", "heuristic_containers"}
+SELECTOR_FIELDS = {"container", *FALLBACK_FIELDS}
+
+
+def _host(url: str) -> str:
+    """Lookup key for a URL's host; www. is ignored so redirects between the two still match"""
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _check_url(source_name: str, field: str, value: Any):
+    parsed = urlparse(value) if isinstance(value, str) else None
+    if parsed is None or parsed.scheme not in ("http", "https") or not parsed.netloc:
+        raise ValueError(f"Source '{source_name}': {field} must be an absolute http(s) URL, got {value!r}")
+
+
+def validate_source(source: Any) -> None:
+    """Raise ValueError describing the first problem with a source entry"""
+    if not isinstance(source, dict):
+        raise ValueError(f"Source entries must be objects, got {type(source).__name__}")
+    name = source.get("name")
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError(f"Source without a name: {source!r}")
+
+    unknown = set(source) - SOURCE_FIELDS
+    if unknown:
+        raise ValueError(f"Source '{name}': unknown fields {sorted(unknown)}")
+    _check_url(name, "base_url", source.get("base_url"))
+    _check_url(name, "search_url", source.get("search_url"))
+    for flag in ("js", "heuristic_containers"):
+        if flag in source and not isinstance(source[flag], bool):
+            raise ValueError(f"Source '{name}': {flag} must be true or false")
+    if "search_param" in source and not isinstance(source["search_param"], str):
+        raise ValueError(f"Source '{name}': search_param must be a string")
+
+    selectors = source.get("selectors", {})
+    if not isinstance(selectors, dict):
+        raise ValueError(f"Source '{name}': selectors must be an object")
+    unknown = set(selectors) - SELECTOR_FIELDS
+    if unknown:
+        raise ValueError(f"Source '{name}': unknown selectors {sorted(unknown)}")
+    for field, value in selectors.items():
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError(f"Source '{name}': selector '{field}' must be a non-empty string")
+        if field == "container" or not is_literal(value):
+            _check_css(name, field, value)
+
+
+def _check_css(source_name: str, field: str, css: str):
+    try:
+        from cssselect import SelectorError, parse
+    except ImportError:
+        return  # Selectors are still checked when the parser first compiles them
+    try:
+        parse(css)
+    except SelectorError as e:
+        raise ValueError(f"Source '{source_name}': invalid {field} selector {css!r}: {e}") from e
+
+
+class _Snapshot:
+    """Immutable indexes over one version of the source list"""
+
+    def __init__(self, sources: List[Dict[str, Any]]):
+        self.sources = tuple(sources)
+        self.by_name: Dict[str, Dict[str, Any]] = {}
+        self.types: Dict[str, str] = {}
+        self.plans: Dict[str, ExtractionPlan] = {}
+        self.by_type: Dict[str, Tuple[Dict[str, Any], ...]] = {}
+        self.js: Tuple[Dict[str, Any], ...] = tuple(source for source in sources if source.get("js"))
+        # host -> [(search path, source)], longest path first so shared hosts pick the closest match
+        self.by_host: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+        # host -> first configured source, for pages outside every search_url
+        self.host_default: Dict[str, Dict[str, Any]] = {}
+
+        by_type: Dict[str, List[Dict[str, Any]]] = {}
+        for source in sources:
+            name = source["name"]
+            if name in self.by_name:
+                raise ValueError(f"Duplicate source name '{name}'")
+            label = source_type(source)
+            self.by_name[name] = source
+            self.types[name] = label
+            self.plans[name] = ExtractionPlan.compile(source, label)
+            by_type.setdefault(label, []).append(source)
+
+            search_path = urlparse(source["search_url"]).path
+            for host in {_host(source["base_url"]), _host(source["search_url"])}:
+                self.host_default.setdefault(host, source)
+                self.by_host.setdefault(host, []).append((search_path, source))
+
+        for candidates in self.by_host.values():
+            candidates.sort(key=lambda candidate: len(candidate[0]), reverse=True)
+        self.by_type = {label: tuple(group) for label, group in by_type.items()}
+
+
+def _flatten(data: Any) -> List[Dict[str, Any]]:
+    """Accept either a list of sources or a {group: [sources]} mapping like OPPORTUNITY_SOURCES"""
+    if isinstance(data, list):
+        return [dict(source) if isinstance(source, dict) else source for source in data]
+    if isinstance(data, dict):
+        sources = []
+        for group, group_sources in data.items():
+            if not isinstance(group_sources, list):
+                raise ValueError(f"Source group '{group}' must be a list")
+            for source in group_sources:
+                if isinstance(source, dict):
+                    source = dict(source)
+                    if group != "additional":
+                        source.setdefault("type", group)
+                sources.append(source)
+        return sources
+    raise ValueError("Sources file must contain a list of sources or an object of source groups")
+
+
+def load_sources_file(path: str) -> List[Dict[str, Any]]:
+    """Read sources from a .json, .yaml or .yml file"""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError as e:
+                raise ValueError("PyYAML is required to load YAML source files") from e
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    return _flatten(data)
+
+
+def builtin_sources() -> List[Dict[str, Any]]:
+    """Sources defined in opportunity_sources.py"""
+    return [source for source, _ in iter_sources()]
+
+
+class SourceRegistry:
+    """Source lookups by name, host, type and JS flag, with optional hot reload from a file"""
+
+    def __init__(self, sources: Optional[Iterable[Dict[str, Any]]] = None, path: Optional[str] = None,
+                 reload_interval: float = SOURCES_RELOAD_INTERVAL_SECONDS):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._next_check = 0.0
+        if path:
+            self._snapshot = self._build(load_sources_file(path))
+            self._mtime = os.path.getmtime(path)
+        else:
+            self._snapshot = self._build(list(sources) if sources is not None else builtin_sources())
+
+    @staticmethod
+    def _build(sources: List[Dict[str, Any]]) -> _Snapshot:
+        for source in sources:
+            validate_source(source)
+        return _Snapshot(sources)
+
+    # --- hot reload ----------------------------------------------------------
+
+    def reload(self) -> bool:
+        """Re-read the sources file; keeps the current sources if the file is invalid"""
+        if not self.path:
+            return False
+        with self._lock:
+            try:
+                mtime = os.path.getmtime(self.path)
+                snapshot = self._build(load_sources_file(self.path))
+            except (OSError, ValueError) as e:
+                logger.error(f"Keeping previous sources, could not load {self.path}: {e}")
+                return False
+            self._snapshot = snapshot
+            self._mtime = mtime
+        logger.info(f"Loaded {len(snapshot.sources)} sources from {self.path}")
+        return True
+
+    def _current(self) -> _Snapshot:
+        """Snapshot for a lookup, reloading first if the file changed (checked at most every reload_interval)"""
+        if self.path:
+            now = time.monotonic()
+            if now >= self._next_check:
+                self._next_check = now + self.reload_interval
+                try:
+                    changed = os.path.getmtime(self.path) != self._mtime
+                except OSError:
+                    changed = False
+                if changed:
+                    self.reload()
+        return self._snapshot
+
+    # --- lookups -------------------------------------------------------------
+
+    def all(self) -> List[Dict[str, Any]]:
+        return list(self._current().sources)
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        return self._current().by_name.get(name)
+
+    def type_of(self, name: str) -> Optional[str]:
+        """Type label ("scholarship", ...) of the named source"""
+        return self._current().types.get(name)
+
+    def for_type(self, type: Optional[str]) -> List[Dict[str, Any]]:
+        """Sources for a search type; accepts aliases like "scholarships". Unknown or empty types get every source"""
+        snapshot = self._current()
+        label = normalize_type(type)
+        if label and label in snapshot.by_type:
+            return list(snapshot.by_type[label])
+        return list(snapshot.sources)
+
+    def js_sources(self, type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Sources that need a browser to render, optionally limited to one type"""
+        label = normalize_type(type)
+        snapshot = self._current()
+        if label and label in snapshot.by_type:
+            return [source for source in snapshot.js if snapshot.types[source["name"]] == label]
+        return list(snapshot.js)
+
+    def for_url(self, url: str) -> Optional[Dict[str, Any]]:
+        """Source a page belongs to: the longest search_url path it is under, else the first source on its host"""
+        return self._source_for(self._current(), url)
+
+    @staticmethod
+    def _source_for(snapshot: _Snapshot, url: str) -> Optional[Dict[str, Any]]:
+        host = _host(url)
+        candidates = snapshot.by_host.get(host)
+        if not candidates:
+            return None
+        path = urlparse(url).path
+        for search_path, source in candidates:
+            if path.startswith(search_path):
+                return source
+        return snapshot.host_default[host]
+
+    def uses_js(self, url: str) -> bool:
+        source = self.for_url(url)
+        return bool(source and source.get("js"))
+
+    def plan(self, source: Dict[str, Any]) -> ExtractionPlan:
+        """Compiled extraction plan for a registered source (compiled on the fly for ad-hoc ones)"""
+        plan = self._current().plans.get(source.get("name"))
+        return plan if plan is not None else ExtractionPlan.compile(source, source_type(source))
+
+    def plan_for_url(self, url: str, generic: bool = True) -> Optional[ExtractionPlan]:
+        """Extraction plan for a page URL, or the generic plan for unknown sites"""
+        snapshot = self._current()
+        source = self._source_for(snapshot, url)
+        if source is not None:
+            return snapshot.plans[source["name"]]
+        return GENERIC_PLAN if generic else None
+
+
+def _create_registry() -> SourceRegistry:
+    if SOURCES_FILE:
+        return SourceRegistry(path=SOURCES_FILE)
+    return SourceRegistry()
+
+
+source_registry = _create_registry()
@@ -6,6 +6,11 @@ import openai
 import json
 from typing import List, Dict, Any
 from startup_opps_api.models.opportunity import Opportunity
+from startup_opps_api.services.vector_scoring import profile_order
+
+def rank_for_profile(user_profile: Dict[str, Any], opportunities: List[Opportunity]) -> List[Opportunity]:
+    """Order opportunities by how well they match the profile answers (background, interests, field, ...)"""
+    return [opportunities[row] for row in profile_order(user_profile, [opp.model_dump() for opp in opportunities])]
 
 class AIChatService:
     def __init__(self, api_key: str):
@@ -96,6 +101,10 @@ class AIChatService:
             # Fallback: simple keyword extraction
             return {"keyword": message, "type": None, "region": None}
     
+    def rank_for_profile(self, user_profile: Dict[str, Any], opportunities: List[Opportunity]) -> List[Opportunity]:
+        """Order opportunities by how well they match the profile answers, scored together as one batch"""
+        return rank_for_profile(user_profile, opportunities)
+    
     def generate_personalized_recommendations(self, user_profile: Dict[str, Any], opportunities: List[Opportunity]) -> str:
         """Generate personalized recommendations based on user profile and opportunities"""
         try:
@@ -110,7 +119,7 @@ class AIChatService:
             
             opps_text = "\n".join([
                 f"- {opp.title} at {opp.organization} (Deadline: {opp.deadline or 'TBD'})"
-                for opp in opportunities[:10]
+                for opp in self.rank_for_profile(user_profile, opportunities)[:10]
             ])
             
             prompt = f"""
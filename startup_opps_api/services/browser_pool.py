@@ -0,0 +1,225 @@
+"""
+Warm Playwright browser shared by every request that needs JS rendering
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+from startup_opps_api.scraper.fetcher import USER_AGENT
+
+logger = logging.getLogger(__name__)
+
+# Launch Chromium at application startup instead of on the first JS fallback
+BROWSER_PREWARM = os.getenv("BROWSER_PREWARM", "false").lower() == "true"
+BROWSER_MAX_CONTEXTS = int(os.getenv("BROWSER_MAX_CONTEXTS", "4"))
+BROWSER_NAVIGATION_TIMEOUT_SECONDS = float(os.getenv("BROWSER_NAVIGATION_TIMEOUT_SECONDS", "15"))
+# How long a page may keep loading after DOMContentLoaded before we take its HTML
+BROWSER_SETTLE_TIMEOUT_SECONDS = float(os.getenv("BROWSER_SETTLE_TIMEOUT_SECONDS", "5"))
+
+# Nothing we extract depends on these, and they dominate page weight
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
+BLOCKED_HOST_SUFFIXES = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "facebook.net",
+    "hotjar.com",
+    "segment.io",
+    "segment.com",
+    "hs-analytics.net",
+    "intercom.io",
+    "clarity.ms",
+)
+
+
+@dataclass
+class RenderedPage:
+    """HTML of a page after its scripts ran"""
+    url: str
+    html: str = ""
+    error: Optional[str] = None
+
+
+def is_blocked_request(resource_type: str, url: str) -> bool:
+    """Whether the pool aborts a subresource request instead of loading it"""
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    host = urlparse(url).hostname or ""
+    return any(host == suffix or host.endswith(f".{suffix}") for suffix in BLOCKED_HOST_SUFFIXES)
+
+
+class BrowserPool:
+    """Keeps one headless Chromium running on a dedicated event loop thread.
+
+    Each render gets a fresh browser context (isolated cookies and storage),
+    and at most ``max_contexts`` pages render at once. Like the crawler
+    runtime, jobs can be submitted from any thread and return a
+    concurrent.futures.Future.
+    """
+
+    def __init__(
+        self,
+        max_contexts: int = BROWSER_MAX_CONTEXTS,
+        navigation_timeout: float = BROWSER_NAVIGATION_TIMEOUT_SECONDS,
+        settle_timeout: float = BROWSER_SETTLE_TIMEOUT_SECONDS,
+    ):
+        self.max_contexts = max_contexts
+        self.navigation_timeout = navigation_timeout
+        self.settle_timeout = settle_timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._lock = threading.Lock()
+        self._playwright = None
+        self._browser = None
+        self._browser_lock: Optional[asyncio.Lock] = None
+        self._contexts: Optional[asyncio.Semaphore] = None
+
+    @staticmethod
+    def available() -> bool:
+        try:
+            import playwright.async_api  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    @property
+    def running(self) -> bool:
+        return self._started.is_set() and self._loop is not None and self._loop.is_running()
+
+    def start(self, warm: bool = False, timeout: float = 60):
+        """Start the event loop thread, and launch the browser now if ``warm``"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run_loop, name="browser-pool", daemon=True)
+                self._thread.start()
+        if not self._started.wait(timeout=timeout):
+            raise RuntimeError("Browser pool did not start in time")
+        if warm:
+            asyncio.run_coroutine_threadsafe(self._ensure_browser(), self._loop).result(timeout=timeout)
+
+    def _run_loop(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._browser_lock = asyncio.Lock()
+        self._contexts = asyncio.Semaphore(self.max_contexts)
+        loop.call_soon(self._started.set)
+        logger.info("Browser pool started")
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+            logger.info("Browser pool stopped")
+
+    async def _ensure_browser(self):
+        """Launch Chromium on first use, or again if it crashed"""
+        async with self._browser_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return self._browser
+            from playwright.async_api import async_playwright
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=True)
+            logger.info("Launched headless Chromium")
+            return self._browser
+
+    def submit(self, pages: Iterable[Tuple[str, Optional[str]]]) -> "Future[List[RenderedPage]]":
+        """Render ``(url, wait_for_selector)`` pairs in parallel; results keep the input order"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(self._render_all(list(pages)), self._loop)
+
+    def render(self, urls: Sequence[str], wait_for: Optional[str] = None, timeout: Optional[float] = None) -> List[RenderedPage]:
+        """Blocking helper: render URLs with one optional selector to wait for"""
+        return self.submit((url, wait_for) for url in urls).result(timeout=timeout)
+
+    async def _render_all(self, pages: List[Tuple[str, Optional[str]]]) -> List[RenderedPage]:
+        browser = await self._ensure_browser()
+        return list(await asyncio.gather(*(self._render_page(browser, url, wait_for) for url, wait_for in pages)))
+
+    async def _render_page(self, browser, url: str, wait_for: Optional[str]) -> RenderedPage:
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+        async with self._contexts:
+            context = None
+            try:
+                context = await browser.new_context(user_agent=USER_AGENT)
+                await context.route("**/*", self._route)
+                page = await context.new_page()
+                await page.goto(url, wait_until="domcontentloaded", timeout=self.navigation_timeout * 1000)
+
+                # Give client-side rendering a bounded amount of time to produce the listing
+                try:
+                    if wait_for:
+                        await page.wait_for_selector(wait_for, state="attached", timeout=self.settle_timeout * 1000)
+                    else:
+                        await page.wait_for_load_state("networkidle", timeout=self.settle_timeout * 1000)
+                except PlaywrightTimeoutError:
+                    logger.info(f"{url} did not settle within {self.settle_timeout}s, using current DOM")
+
+                return RenderedPage(url=page.url, html=await page.content())
+            except Exception as e:
+                logger.warning(f"Rendering {url} failed: {e}")
+                return RenderedPage(url=url, error=str(e))
+            finally:
+                if context is not None:
+                    await context.close()
+
+    @staticmethod
+    async def _route(route):
+        request = route.request
+        if is_blocked_request(request.resource_type, request.url):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _close_browser(self):
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def stop(self, timeout: float = 30):
+        """Close the browser and stop the event loop thread"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            if loop is None or thread is None:
+                return
+            self._thread = None
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_browser(), loop).result(timeout=timeout)
+        except Exception as e:
+            logger.warning(f"Error closing browser: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=timeout)
+        self._loop = None
+        self._started.clear()
+
+
+_pool: Optional[BrowserPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Return the process-wide browser pool, creating it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+        return _pool
+
+
+def shutdown_browser_pool():
+    """Close the process-wide browser if it was started"""
+    with _pool_lock:
+        pool = _pool
+    if pool is not None:
+        pool.stop()
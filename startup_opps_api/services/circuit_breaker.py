@@ -0,0 +1,309 @@
+"""
+Per-host circuit breakers and adaptive fetch timeouts for source listings
+
+A host's circuit opens after CIRCUIT_FAILURE_THRESHOLD consecutive failures
+(timeouts, connection errors, 401/403/429 or 5xx responses); while it is open,
+fetches from that host are skipped instead of waiting out the timeout again.
+Once the backoff has passed, a single probe request is let through
+(half-open): success closes the circuit, failure reopens it for twice as
+long, up to CIRCUIT_MAX_BACKOFF_SECONDS. State is saved to CIRCUIT_STATE_PATH
+by a background thread, right after every transition and otherwise every
+SAVE_INTERVAL_SECONDS, so recording never waits on disk and a restart doesn't
+retry hosts that have been failing for days.
+
+Each host also keeps its last LATENCY_WINDOW successful fetch latencies;
+``timeout_for`` turns their p95 into the host's timeout, capped by the
+caller's fixed timeout.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+from urllib.parse import urlparse
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_STATE_PATH = os.getenv("CIRCUIT_STATE_PATH", "./data/circuit_breakers.json")
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3"))
+CIRCUIT_BACKOFF_SECONDS = float(os.getenv("CIRCUIT_BACKOFF_SECONDS", "300"))
+CIRCUIT_MAX_BACKOFF_SECONDS = float(os.getenv("CIRCUIT_MAX_BACKOFF_SECONDS", "21600"))
+ADAPTIVE_TIMEOUT_FACTOR = float(os.getenv("ADAPTIVE_TIMEOUT_FACTOR", "3"))
+ADAPTIVE_TIMEOUT_MIN_SECONDS = float(os.getenv("ADAPTIVE_TIMEOUT_MIN_SECONDS", "3"))
+
+LATENCY_WINDOW = 50
+LATENCY_MIN_SAMPLES = 5  # Fewer successful fetches keep the caller's fixed timeout
+SAVE_INTERVAL_SECONDS = 60  # Latency samples alone are saved this often
+PROBE_TIMEOUT_SECONDS = 120  # A probe that never reported back (cancelled) stops blocking the next one
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+def host_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+def is_failure_status(status: int) -> bool:
+    """Statuses meaning the host refuses or can't serve us; other responses show it is up"""
+    return status in (401, 403, 429) or status >= 500
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of fetching from a host whose circuit is open"""
+
+    def __init__(self, host: str, retry_at: float):
+        super().__init__(f"Circuit open for {host} until {datetime.fromtimestamp(retry_at).isoformat(timespec='seconds')}")
+        self.host = host
+        self.retry_at = retry_at
+
+
+class _Circuit:
+    __slots__ = ("state", "failures", "trips", "open_until", "probe_started_at", "last_error", "latencies")
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.trips = 0  # Consecutive openings, doubling the backoff
+        self.open_until = 0.0  # Wall clock, so it survives restarts
+        self.probe_started_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "trips": self.trips,
+            "open_until": self.open_until,
+            "last_error": self.last_error,
+            "latencies": list(self.latencies),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "_Circuit":
+        circuit = cls()
+        circuit.state = data.get("state", CLOSED)
+        circuit.failures = data.get("failures", 0)
+        circuit.trips = data.get("trips", 0)
+        circuit.open_until = data.get("open_until", 0.0)
+        circuit.last_error = data.get("last_error")
+        circuit.latencies.extend(data.get("latencies", []))
+        return circuit
+
+
+class CircuitBreakers:
+    """Circuit state and recent latencies per source host, shared by every crawl path and thread"""
+
+    def __init__(self, path: Optional[str] = CIRCUIT_STATE_PATH, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 backoff_seconds: float = CIRCUIT_BACKOFF_SECONDS, max_backoff_seconds: float = CIRCUIT_MAX_BACKOFF_SECONDS):
+        self.path = path
+        self.failure_threshold = failure_threshold
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self._circuits: Dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.counters = {"rejected": 0, "trips": 0}
+        self._load()
+
+    def allow(self, url: str) -> bool:
+        """Whether to fetch from this URL's host now; in half-open state only one caller gets to probe"""
+        host = host_of(url)
+        now = time.time()
+        with self._lock:
+            circuit = self._circuits.get(host)
+            if circuit is None or circuit.state == CLOSED:
+                return True
+            if circuit.state == OPEN and now >= circuit.open_until:
+                circuit.state = HALF_OPEN
+                circuit.probe_started_at = None
+            if circuit.state == HALF_OPEN and (
+                circuit.probe_started_at is None or now - circuit.probe_started_at > PROBE_TIMEOUT_SECONDS
+            ):
+                circuit.probe_started_at = now
+                logger.info(f"Circuit for {host} is half-open, probing")
+                return True
+            self.counters["rejected"] += 1
+            return False
+
+    def check(self, url: str):
+        """Raise CircuitOpenError unless ``allow(url)``"""
+        if not self.allow(url):
+            with self._lock:
+                retry_at = self._circuits[host_of(url)].open_until
+            raise CircuitOpenError(host_of(url), retry_at)
+
+    def state(self, url: str) -> str:
+        with self._lock:
+            circuit = self._circuits.get(host_of(url))
+            return circuit.state if circuit is not None else CLOSED
+
+    def record_success(self, url: str, latency_seconds: float):
+        host = host_of(url)
+        with self._lock:
+            circuit = self._circuits.setdefault(host, _Circuit())
+            circuit.latencies.append(round(latency_seconds, 3))
+            circuit.failures = 0
+            transition = circuit.state != CLOSED
+            if transition:
+                logger.info(f"Circuit for {host} closed")
+                circuit.state = CLOSED
+                circuit.trips = 0
+                circuit.probe_started_at = None
+            self._dirty = True
+        self._schedule_save(now=transition)
+
+    def record_failure(self, url: str, error: str):
+        host = host_of(url)
+        now = time.time()
+        with self._lock:
+            circuit = self._circuits.setdefault(host, _Circuit())
+            circuit.failures += 1
+            circuit.last_error = error[:200]
+            transition = circuit.state == HALF_OPEN or (
+                circuit.state == CLOSED and circuit.failures >= self.failure_threshold
+            )
+            if transition:
+                backoff = min(self.backoff_seconds * 2 ** circuit.trips, self.max_backoff_seconds)
+                circuit.state = OPEN
+                circuit.trips += 1
+                circuit.open_until = now + backoff
+                circuit.probe_started_at = None
+                self.counters["trips"] += 1
+                logger.warning(f"Circuit for {host} opened for {backoff:.0f}s after {circuit.failures} failures ({error})")
+            self._dirty = True
+        self._schedule_save(now=transition)
+
+    def record_response(self, url: str, status: int, latency_seconds: float):
+        """Record a response by its status: refusals and server errors are failures"""
+        if is_failure_status(status):
+            self.record_failure(url, f"HTTP {status}")
+        else:
+            self.record_success(url, latency_seconds)
+
+    def timeout_for(self, url: str, default: float) -> float:
+        """Timeout for a fetch from this host: ADAPTIVE_TIMEOUT_FACTOR x its p95 latency, at most ``default``"""
+        with self._lock:
+            circuit = self._circuits.get(host_of(url))
+            samples = list(circuit.latencies) if circuit is not None else []
+        if len(samples) < LATENCY_MIN_SAMPLES:
+            return default
+        p95 = float(np.percentile(samples, 95))
+        return min(default, max(ADAPTIVE_TIMEOUT_MIN_SECONDS, p95 * ADAPTIVE_TIMEOUT_FACTOR))
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Per-host state for the admin API, open circuits first"""
+        with self._lock:
+            circuits = [(host, circuit.to_dict()) for host, circuit in self._circuits.items()]
+        hosts = []
+        for host, data in circuits:
+            latencies = data["latencies"]
+            p95 = float(np.percentile(latencies, 95)) if len(latencies) >= LATENCY_MIN_SAMPLES else None
+            hosts.append({
+                "host": host,
+                "state": data["state"],
+                "failures": data["failures"],
+                "trips": data["trips"],
+                "open_until": datetime.fromtimestamp(data["open_until"]).isoformat(timespec="seconds")
+                if data["state"] != CLOSED else None,
+                "last_error": data["last_error"],
+                "p95_latency_ms": round(p95 * 1000, 1) if p95 is not None else None,
+                "adaptive_timeout_seconds": round(max(ADAPTIVE_TIMEOUT_MIN_SECONDS, p95 * ADAPTIVE_TIMEOUT_FACTOR), 2)
+                if p95 is not None else None,
+            })
+        hosts.sort(key=lambda entry: (entry["state"] == CLOSED, entry["host"]))
+        return hosts
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            states = [circuit.state for circuit in self._circuits.values()]
+            return {
+                **self.counters,
+                "closed": states.count(CLOSED),
+                "open": states.count(OPEN),
+                "half_open": states.count(HALF_OPEN),
+            }
+
+    def reset(self, url: Optional[str] = None):
+        """Forget one host's circuit (or all of them)"""
+        with self._lock:
+            if url is None:
+                self._circuits.clear()
+            else:
+                self._circuits.pop(host_of(url), None)
+            self._dirty = True
+        self._schedule_save(now=True)
+
+    def _schedule_save(self, now: bool = False):
+        """Have the writer thread save soon (transitions) or on its next interval (latency samples)"""
+        if not self.path or self._stopped.is_set():
+            return
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="circuit-breaker-writer", daemon=True)
+                    self._thread.start()
+        if now:
+            self._wake.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(SAVE_INTERVAL_SECONDS)
+            self._wake.clear()
+            if self._dirty:
+                self.save()
+
+    def stop(self, timeout: float = 10):
+        """Stop the writer thread and save what changed since its last write"""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        if self._dirty:
+            self.save()
+
+    def save(self):
+        """Write every circuit to CIRCUIT_STATE_PATH (atomically, via a temporary file)"""
+        if not self.path:
+            return
+        with self._save_lock:
+            with self._lock:
+                data = {host: circuit.to_dict() for host, circuit in self._circuits.items()}
+                self._dirty = False
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.warning(f"Could not save circuit breaker state to {self.path}: {e}")
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self._circuits = {host: _Circuit.from_dict(circuit) for host, circuit in data.items()}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable circuit breaker state in {self.path}: {e}")
+            return
+        opened = [host for host, circuit in self._circuits.items() if circuit.state != CLOSED]
+        if opened:
+            logger.info(f"Loaded {len(opened)} open circuits: {', '.join(sorted(opened))}")
+
+
+circuit_breakers = CircuitBreakers()
@@ -0,0 +1,164 @@
+"""
+Long-lived Scrapy runtime that keeps a single Twisted reactor running for the whole process
+"""
+
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import urlparse
+
+from scrapy import signals
+from scrapy.crawler import CrawlerRunner
+from scrapy.utils.project import get_project_settings
+from scrapy.utils.reactor import install_reactor
+
+from startup_opps_api.services.metrics import crawls_in_flight
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses that mean a source refused to serve us
+BLOCKED_STATUSES = {401, 403, 429}
+
+
+class CrawlResult:
+    """Items and response metadata collected for a single crawl job"""
+
+    def __init__(self):
+        self.items: List[Dict[str, Any]] = []
+        self.blocked_urls: Set[str] = set()
+        self.visited_bases: Set[str] = set()
+
+    def on_item_scraped(self, item, response, spider):
+        self.items.append(dict(item))
+
+    def on_response_received(self, response, request, spider):
+        try:
+            status = getattr(response, "status", None)
+            url = getattr(response, "url", None)
+            if not url:
+                return
+            if status in BLOCKED_STATUSES:
+                self.blocked_urls.add(url)
+            # robots.txt denial often shows as fetch to robots.txt or empty results; flag explicitly
+            if url.endswith("/robots.txt"):
+                self.blocked_urls.add(url)
+            # Track visited base domains to provide fallback links when no items extracted
+            parsed = urlparse(url)
+            if parsed.scheme and parsed.netloc:
+                self.visited_bases.add(f"{parsed.scheme}://{parsed.netloc}")
+        except Exception:
+            pass
+
+
+class CrawlerRuntime:
+    """Runs the Twisted reactor in a dedicated thread and accepts crawl jobs from any thread.
+
+    The reactor can only be started once per process, so the runtime is meant to be
+    created once (see ``get_crawler_runtime``) and shared by every request.
+    """
+
+    def __init__(self, settings=None):
+        self.settings = settings or get_project_settings()
+        self._thread: Optional[threading.Thread] = None
+        self._reactor = None
+        self._runner: Optional[CrawlerRunner] = None
+        self._started = threading.Event()
+        self._stopped = False
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._started.is_set() and not self._stopped
+
+    def start(self, timeout: float = 30):
+        """Start the reactor thread if it is not running yet"""
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError("Crawler runtime was stopped and the reactor cannot be restarted")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run_reactor, name="crawler-runtime", daemon=True)
+                self._thread.start()
+        if not self._started.wait(timeout=timeout):
+            raise RuntimeError("Crawler runtime did not start in time")
+
+    def _run_reactor(self):
+        reactor_path = self.settings.get("TWISTED_REACTOR")
+        if reactor_path:
+            install_reactor(reactor_path, self.settings.get("ASYNCIO_EVENT_LOOP"))
+        from twisted.internet import reactor
+
+        self._reactor = reactor
+        self._runner = CrawlerRunner(self.settings)
+        reactor.callWhenRunning(self._started.set)
+        logger.info("Crawler runtime started")
+        reactor.run(installSignalHandlers=False)
+        logger.info("Crawler runtime stopped")
+
+    def submit(self, spidercls, **spider_kwargs) -> "Future[CrawlResult]":
+        """Schedule a crawl on the reactor thread and return a future for its result"""
+        self.start()
+        future: Future = Future()
+        self._reactor.callFromThread(self._schedule, future, spidercls, spider_kwargs)
+        return future
+
+    def _schedule(self, future: Future, spidercls, spider_kwargs: Dict[str, Any]):
+        """Runs on the reactor thread"""
+        if not future.set_running_or_notify_cancel():
+            return
+
+        result = CrawlResult()
+        try:
+            crawler = self._runner.create_crawler(spidercls)
+            crawler.signals.connect(result.on_item_scraped, signal=signals.item_scraped)
+            crawler.signals.connect(result.on_response_received, signal=signals.response_received)
+            deferred = self._runner.crawl(crawler, **spider_kwargs)
+        except Exception as e:
+            future.set_exception(e)
+            return
+        crawls_in_flight.inc("scrapy")
+
+        def _finished(_):
+            crawls_in_flight.dec("scrapy")
+            future.set_result(result)
+
+        def _failed(failure):
+            crawls_in_flight.dec("scrapy")
+            future.set_exception(failure.value)
+
+        deferred.addCallbacks(_finished, _failed)
+
+    def stop(self, timeout: float = 30):
+        """Stop running crawls and the reactor"""
+        with self._lock:
+            if self._stopped or self._reactor is None:
+                self._stopped = True
+                return
+            self._stopped = True
+
+        def _shutdown():
+            self._runner.stop().addBoth(lambda _: self._reactor.stop())
+
+        self._reactor.callFromThread(_shutdown)
+        self._thread.join(timeout=timeout)
+
+
+_runtime: Optional[CrawlerRuntime] = None
+_runtime_lock = threading.Lock()
+
+
+def get_crawler_runtime() -> CrawlerRuntime:
+    """Return the process-wide crawler runtime, creating it on first use"""
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            _runtime = CrawlerRuntime()
+        return _runtime
+
+
+def shutdown_crawler_runtime():
+    """Stop the process-wide crawler runtime if it was started"""
+    with _runtime_lock:
+        runtime = _runtime
+    if runtime is not None:
+        runtime.stop()
@@ -0,0 +1,237 @@
+"""
+Near-duplicate detection for opportunities scraped from several sources
+
+The same program often shows up on aggregators (OpportunityDesk, ProFellow,
+...) and on the organization's own site with slightly different titles and
+tracking-laden URLs. Two items are duplicates when their canonical URLs match,
+or when the Jaccard similarity of their normalized title and organization
+features (words, singularized, without stop words, plus title word pairs) is
+at least DEDUP_SIMILARITY. Titles that each have a distinctive word the other
+lacks ("...Accelerator: Africa" / "...Accelerator: Brazil", "2026" / "2027")
+are different editions and never duplicates. When both items have a real
+description, they must also share some of its words, which keeps "Research
+Fellowship" entries of unrelated programs apart. An organization that is
+only the listing's source name (aggregators fill it in when the item names
+none) is left out of the features.
+
+Candidates come from MinHash signatures split into LSH bands, so each lookup
+is a few dict probes plus an exact check of the candidates. Deduplicating a
+result set is linear in its size, and the index can grow incrementally with a
+stored catalog.
+"""
+
+import hashlib
+import os
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import numpy as np
+
+from startup_opps_api.services.search_index import tokenize
+
+DEDUP_SIMILARITY = float(os.getenv("DEDUP_SIMILARITY", "0.6"))
+DESCRIPTION_MIN_SIMILARITY = 0.1
+DESCRIPTION_MIN_WORDS = 8  # Shorter descriptions are placeholders and aren't compared
+DESCRIPTION_WORDS = 60
+
+# Query parameters that only track where a visitor came from
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "ref", "ref_src", "_hsenc", "_hsmi"}
+TRACKING_PREFIXES = ("utm_",)
+
+STOP_WORDS = {
+    "a", "an", "and", "at", "for", "in", "of", "on", "the", "to", "with",
+    "da", "das", "de", "do", "dos", "e", "em", "para",
+}
+
+# Title words that describe the kind of program rather than which one it is
+GENERIC_TITLE_WORDS = {
+    "program", "programme", "programa", "scholarship", "bolsa", "fellowship", "accelerator", "aceleracao",
+    "incubator", "grant", "award", "prize", "fund", "funding", "call", "edital", "application", "open",
+    "new", "international", "global", "startup", "competition", "challenge", "residency",
+}
+
+# 32 bands of 4 rows: pairs at 0.6 similarity share a band 99% of the time, pairs at 0.3 about 23%
+MINHASH_BANDS = 32
+MINHASH_ROWS = 4
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_rng = np.random.default_rng(20240501)
+_PERMUTATION_A = _rng.integers(1, 1 << 31, size=MINHASH_BANDS * MINHASH_ROWS, dtype=np.uint64)
+_PERMUTATION_B = _rng.integers(0, 1 << 31, size=MINHASH_BANDS * MINHASH_ROWS, dtype=np.uint64)
+
+
+def canonicalize_url(url: Optional[str]) -> str:
+    """URL with the scheme, www., default port, fragment, tracking parameters and trailing slash normalized away"""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    return urlunsplit(("https", host, parts.path.rstrip("/"), urlencode(query), ""))
+
+
+def _words(text: Optional[str], limit: Optional[int] = None) -> List[str]:
+    """Folded words without stop words, with a plain plural 's' removed"""
+    return [
+        word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+        for word in tokenize(text)[:limit] if word not in STOP_WORDS
+    ]
+
+
+def _organization(doc: Dict[str, Any]) -> Optional[str]:
+    """The item's organization, unless it is just the name of the source it was listed on"""
+    organization = doc.get("organization")
+    if organization and organization in (doc.get("source"), doc.get("source_name")):
+        return None
+    return organization
+
+
+def features(doc: Dict[str, Any]) -> FrozenSet[str]:
+    """Title words and word pairs plus organization words of an opportunity"""
+    title = _words(doc.get("title"))
+    return frozenset([
+        *title,
+        *(f"{first} {second}" for first, second in zip(title, title[1:])),
+        *(f"org:{word}" for word in _words(_organization(doc))),
+    ])
+
+
+def _same_word(a: str, b: str) -> bool:
+    """Equal, or forms of one word ("foreign" / "foreigner")"""
+    return a == b or (min(len(a), len(b)) >= 4 and (a.startswith(b) or b.startswith(a)))
+
+
+def distinct_editions(a: FrozenSet[str], b: FrozenSet[str]) -> bool:
+    """Whether each title has a distinctive word the other lacks, e.g. a different region or year"""
+    only_a = [word for word in a - b if word not in GENERIC_TITLE_WORDS]
+    only_b = [word for word in b - a if word not in GENERIC_TITLE_WORDS]
+    only_a = [word for word in only_a if not any(_same_word(word, other) for other in only_b)]
+    only_b = [word for word in only_b if not any(_same_word(word, other) for other in a - b)]
+    return bool(only_a) and bool(only_b)
+
+
+def _description(doc: Dict[str, Any]) -> FrozenSet[str]:
+    words = _words(doc.get("description"), DESCRIPTION_WORDS)
+    return frozenset(words) if len(words) >= DESCRIPTION_MIN_WORDS else frozenset()
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+@lru_cache(maxsize=65536)
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+def minhash(feature_set: FrozenSet[str]) -> np.ndarray:
+    """MinHash signature of a feature set (MINHASH_BANDS * MINHASH_ROWS values)"""
+    hashes = np.fromiter((_feature_hash(feature) for feature in feature_set), dtype=np.uint64, count=len(feature_set))
+    # 31-bit multipliers times 32-bit hashes stay below 2**63, so nothing wraps before the modulo
+    permuted = (hashes[:, None] * _PERMUTATION_A + _PERMUTATION_B) % _MERSENNE_PRIME
+    return permuted.min(axis=0)
+
+
+def _title(feature_set: FrozenSet[str]) -> FrozenSet[str]:
+    """Title words among the features (pairs contain a space, organization words a prefix)"""
+    return frozenset(feature for feature in feature_set if " " not in feature and not feature.startswith("org:"))
+
+
+class _Entry:
+    __slots__ = ("id", "features", "title", "description")
+
+    def __init__(self, id: Hashable, features: FrozenSet[str], description: FrozenSet[str]):
+        self.id = id
+        self.features = features
+        self.title = _title(features)
+        self.description = description
+
+
+class DuplicateIndex:
+    """Incremental index answering "is this opportunity a near-duplicate of one already added?" """
+
+    def __init__(self, similarity: float = DEDUP_SIMILARITY):
+        self.similarity = similarity
+        self._by_url: Dict[str, Hashable] = {}
+        self._by_features: Dict[FrozenSet[str], _Entry] = {}
+        # (band number, band values) -> entries
+        self._buckets: Dict[Tuple[int, bytes], List[_Entry]] = {}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @staticmethod
+    def _band_keys(feature_set: FrozenSet[str]) -> List[Tuple[int, bytes]]:
+        raw = minhash(feature_set).tobytes()
+        size = len(raw) // MINHASH_BANDS
+        return [(band, raw[band * size:(band + 1) * size]) for band in range(MINHASH_BANDS)]
+
+    def _is_duplicate(self, entry: _Entry, feature_set: FrozenSet[str], description: FrozenSet[str]) -> bool:
+        if jaccard(entry.features, feature_set) < self.similarity:
+            return False
+        if distinct_editions(entry.title, _title(feature_set)):
+            return False
+        if entry.description and description:
+            return jaccard(entry.description, description) >= DESCRIPTION_MIN_SIMILARITY
+        return True
+
+    def _lookup(self, url: str, feature_set: FrozenSet[str], description: FrozenSet[str],
+                band_keys: Optional[List[Tuple[int, bytes]]]) -> Optional[Hashable]:
+        if url and url in self._by_url:
+            return self._by_url[url]
+        if not feature_set:
+            return None  # Nothing to compare on
+        entry = self._by_features.get(feature_set)
+        if entry is not None and self._is_duplicate(entry, feature_set, description):
+            return entry.id
+        seen = set()
+        for key in band_keys:
+            for entry in self._buckets.get(key, ()):
+                if id(entry) in seen:
+                    continue
+                seen.add(id(entry))
+                if self._is_duplicate(entry, feature_set, description):
+                    return entry.id
+        return None
+
+    def find(self, doc: Dict[str, Any]) -> Optional[Hashable]:
+        """Id of an added near-duplicate of ``doc``, or None"""
+        feature_set = features(doc)
+        band_keys = self._band_keys(feature_set) if feature_set else []
+        return self._lookup(canonicalize_url(doc.get("url")), feature_set, _description(doc), band_keys)
+
+    def add(self, doc: Dict[str, Any], id: Optional[Hashable] = None) -> Optional[Hashable]:
+        """Add ``doc`` unless it duplicates an added one; returns that one's id, or None when ``doc`` was added"""
+        url = canonicalize_url(doc.get("url"))
+        feature_set = features(doc)
+        description = _description(doc)
+        band_keys = self._band_keys(feature_set) if feature_set else []
+        existing = self._lookup(url, feature_set, description, band_keys)
+        if existing is not None:
+            return existing
+
+        entry = _Entry(self._count if id is None else id, feature_set, description)
+        self._count += 1
+        if url:
+            self._by_url[url] = entry.id
+        if feature_set:
+            self._by_features.setdefault(feature_set, entry)
+            for key in band_keys:
+                self._buckets.setdefault(key, []).append(entry)
+        return None
+
+
+def remove_duplicates(opportunities: Iterable[Dict[str, Any]], similarity: float = DEDUP_SIMILARITY) -> List[Dict[str, Any]]:
+    """First occurrence of every opportunity, dropping exact and near duplicates"""
+    index = DuplicateIndex(similarity)
+    return [opp for opp in opportunities if index.add(opp) is None]
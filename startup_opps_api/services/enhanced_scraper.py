@@ -2,13 +2,20 @@
 Enhanced scraper service that extracts detailed opportunity information from database websites
 """
 
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 
-from startup_opps_api.scraper.enhanced_parser import EnhancedOpportunityParser
-from startup_opps_api.scraper.opportunity_sources import OPPORTUNITY_SOURCES, ADDITIONAL_SOURCES
+from startup_opps_api.scraper.enhanced_parser import EnhancedOpportunityParser, criteria_predicate
+from startup_opps_api.scraper.opportunity_sources import listing_url, source_type
+from startup_opps_api.scraper.source_registry import source_registry
+from startup_opps_api.services.circuit_breaker import CircuitOpenError
+from startup_opps_api.services.dedup import DuplicateIndex
+from startup_opps_api.services.listing_cache import listing_cache
+from startup_opps_api.services.metrics import crawls_in_flight, stage
+from startup_opps_api.services.search_index import SearchIndex
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +25,8 @@ class EnhancedOpportunityScraper:
     def __init__(self):
         self.parser = EnhancedOpportunityParser()
         self.max_workers = 5  # Limit concurrent requests
-        self.timeout = 15  # Timeout for each request
+        self.timeout = 15  # Upper bound per source (fetch + parse); fetches time out sooner once a host's p95 latency is known
+        self.max_results = 20
     
     def scrape_detailed_opportunities(self, keyword: str = "", type: str = "", region: str = "") -> List[Dict[str, Any]]:
         """
@@ -32,7 +40,9 @@ class EnhancedOpportunityScraper:
         Returns:
             List of detailed opportunity dictionaries
         """
-        all_opportunities = []
+        # Results are indexed as each source completes
+        index, duplicates = SearchIndex(), DuplicateIndex()
+        failed_sources = []
         
         # Get relevant sources based on type
         sources = self._get_relevant_sources(type)
@@ -50,39 +60,97 @@ class EnhancedOpportunityScraper:
                 source = future_to_source[future]
                 try:
                     opportunities = future.result(timeout=self.timeout)
-                    all_opportunities.extend(opportunities)
+                    self._index_results(index, duplicates, opportunities)
                     logger.info(f"Scraped {len(opportunities)} opportunities from {source['name']}")
                 except Exception as e:
                     logger.error(f"Error scraping {source['name']}: {e}")
-                    # Add fallback entry for failed sources
-                    all_opportunities.append(self._create_fallback_entry(source))
+                    failed_sources.append(source)
         
-        # Filter and rank results
-        filtered_opportunities = self.parser.filter_by_criteria(all_opportunities, keyword, type, region)
+        return self._finalize_results(index, failed_sources, keyword, type, region)
+    
+    async def ascrape_detailed_opportunities(self, keyword: str = "", type: str = "", region: str = "") -> List[Dict[str, Any]]:
+        """
+        Async variant that fans out to every source at once over the shared connection pool
+        """
+        async for event in self.astream_detailed_opportunities(keyword, type, region):
+            if event["event"] == "summary":
+                return event["opportunities"]
+        return []
+    
+    async def astream_detailed_opportunities(self, keyword: str = "", type: str = "", region: str = "") -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield each source's matching opportunities as soon as that source finishes, then a ranked summary
+        
+        Events are dicts with an "event" key:
+            source: {"source", "opportunities"} - new matches from one source, best first,
+                    without near-duplicates of anything sent before
+            error: {"source", "error"} - a source that failed or timed out
+            summary: {"opportunities", "sources", "failed", "elapsed_seconds"} - the final
+                     ranked, deduplicated top results, as ascrape_detailed_opportunities returns them
+        """
+        started = time.monotonic()
+        sources = self._get_relevant_sources(type)
+        
+        index, duplicates = SearchIndex(), DuplicateIndex()
+        failed_sources = []
+        tasks = [asyncio.ensure_future(self._ascrape_with_source(source, keyword, type)) for source in sources]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                source, result = await completed
+                if isinstance(result, BaseException):
+                    # An open circuit is expected, not worth an error line per search
+                    log = logger.info if isinstance(result, CircuitOpenError) else logger.error
+                    log(f"Error scraping {source['name']}: {result!r}")
+                    failed_sources.append(source)
+                    yield {"event": "error", "source": source['name'], "error": repr(result)}
+                    continue
+                
+                added = self._index_results(index, duplicates, result)
+                logger.info(f"Scraped {len(result)} opportunities from {source['name']}")
+                with stage("detailed", "filter"):
+                    matches = self.parser.filter_by_criteria(added, keyword, type, region)[:self.max_results]
+                yield {"event": "source", "source": source['name'], "opportunities": matches}
+        finally:
+            # The consumer stopped early (e.g. the client disconnected): don't leave fetches running
+            for task in tasks:
+                task.cancel()
+        
+        yield {
+            "event": "summary",
+            "opportunities": self._finalize_results(index, failed_sources, keyword, type, region),
+            "sources": len(sources),
+            "failed": len(failed_sources),
+            "elapsed_seconds": round(time.monotonic() - started, 3),
+        }
+    
+    async def _ascrape_with_source(self, source: Dict[str, Any], keyword: str, type: str) -> Tuple[Dict[str, Any], Any]:
+        """Scrape one source with the timeout, returning (source, items or the exception raised)"""
+        try:
+            return source, await asyncio.wait_for(self._ascrape_single_source(source, keyword, type), self.timeout)
+        except Exception as e:
+            return source, e
+    
+    def _finalize_results(self, index: SearchIndex, failed_sources: List[Dict[str, Any]], keyword: str, type: str, region: str) -> List[Dict[str, Any]]:
+        """Return the best matches from the indexed results of all sources"""
+        predicate = criteria_predicate(type, region)
+        with stage("detailed", "rank"):
+            ranked_opportunities = index.search(keyword, k=self.max_results, predicate=predicate)
         
-        # Remove duplicates and rank by relevance
-        unique_opportunities = self._remove_duplicates(filtered_opportunities)
-        ranked_opportunities = self._rank_by_relevance(unique_opportunities, keyword)
+        # Entries pointing at sources that failed go after every real result
+        if len(ranked_opportunities) < self.max_results and failed_sources:
+            fallback_entries = [self._create_fallback_entry(source) for source in failed_sources]
+            fallback_entries = self.parser.filter_by_criteria(fallback_entries, keyword, type, region)
+            ranked_opportunities += fallback_entries[:self.max_results - len(ranked_opportunities)]
         
         # If no results found, provide fallback opportunities
         if not ranked_opportunities:
             ranked_opportunities = self._get_fallback_opportunities(keyword, type)
         
-        return ranked_opportunities[:20]  # Return top 20 results
+        return ranked_opportunities
     
     def _get_relevant_sources(self, type: str) -> List[Dict[str, Any]]:
         """Get relevant sources based on opportunity type"""
-        sources = []
-        
-        if type and type.lower() in OPPORTUNITY_SOURCES:
-            sources.extend(OPPORTUNITY_SOURCES[type.lower()])
-        else:
-            # If no specific type, use all sources
-            for type_sources in OPPORTUNITY_SOURCES.values():
-                sources.extend(type_sources)
-        
-        # Add additional sources
-        sources.extend(ADDITIONAL_SOURCES)
+        sources = source_registry.for_type(type)
         
         # Filter out sources that are likely to block scraping
         reliable_sources = []
@@ -95,39 +163,44 @@ class EnhancedOpportunityScraper:
         return reliable_sources[:10]  # Limit to top 10 most reliable sources
     
     def _scrape_single_source(self, source: Dict[str, Any], keyword: str, type: str) -> List[Dict[str, Any]]:
-        """Scrape a single source website"""
+        """Scrape a single source listing, reusing the cached copy when it is fresh"""
         try:
-            url = source['search_url']
-            
-            # Add keyword to search URL if provided
-            if keyword:
-                if '?' in url:
-                    url += f"&q={keyword}"
-                else:
-                    url += f"?q={keyword}"
+            url = listing_url(source, keyword)
+            opportunities = listing_cache.get(url)
+            if opportunities is None:
+                # Parse every item unfiltered; keyword, type and region are applied (and results capped) afterwards
+                with crawls_in_flight.track("detailed"):
+                    opportunities = self.parser.parse_database_website(url, "", source_type(source), limit=None)
+                if opportunities:
+                    listing_cache.put(url, opportunities)
             
-            # Parse the website
-            opportunities = self.parser.parse_database_website(url, keyword, type)
-            
-            # Add source information to each opportunity
-            for opp in opportunities:
-                opp['source_url'] = source['search_url']
-                opp['source_name'] = source['name']
-            
-            # If no opportunities found, try without keyword filtering
-            if not opportunities and keyword:
-                logger.info(f"No opportunities found with keyword '{keyword}', trying without keyword filter")
-                opportunities = self.parser.parse_database_website(source['search_url'], "", type)
-                for opp in opportunities:
-                    opp['source_url'] = source['search_url']
-                    opp['source_name'] = source['name']
-            
-            return opportunities
+            return self._tag_with_source(opportunities, source)
             
+        except CircuitOpenError:
+            raise  # Reported as a failed source, with a fallback entry
         except Exception as e:
             logger.error(f"Error scraping {source['name']}: {e}")
             return []
     
+    async def _ascrape_single_source(self, source: Dict[str, Any], keyword: str, type: str) -> List[Dict[str, Any]]:
+        """Scrape a single source listing through the async fetcher, reusing the cached copy when it is fresh"""
+        url = listing_url(source, keyword)
+        opportunities = listing_cache.get(url)
+        if opportunities is None:
+            with crawls_in_flight.track("detailed"):
+                opportunities = await self.parser.aparse_database_website(url, "", source_type(source), limit=None)
+            if opportunities:
+                listing_cache.put(url, opportunities)
+        
+        return self._tag_with_source(opportunities, source)
+    
+    def _tag_with_source(self, opportunities: List[Dict[str, Any]], source: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Add source information to each opportunity"""
+        for opp in opportunities:
+            opp['source_url'] = source['search_url']
+            opp['source_name'] = source['name']
+        return opportunities
+    
     def _create_fallback_entry(self, source: Dict[str, Any]) -> Dict[str, Any]:
         """Create a fallback entry for sources that couldn't be scraped"""
         return {
@@ -140,67 +213,18 @@ class EnhancedOpportunityScraper:
             'is_fallback': True
         }
     
-    def _remove_duplicates(self, opportunities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Remove duplicate opportunities based on title and URL"""
-        seen = set()
-        unique_opportunities = []
-        
-        for opp in opportunities:
-            # Create a key based on title and URL
-            key = (opp.get('title', '').lower().strip(), opp.get('url', '').lower().strip())
-            
-            if key not in seen and key[0] and key[1]:  # Ensure both title and URL exist
-                seen.add(key)
-                unique_opportunities.append(opp)
-        
-        return unique_opportunities
-    
-    def _rank_by_relevance(self, opportunities: List[Dict[str, Any]], keyword: str) -> List[Dict[str, Any]]:
-        """Rank opportunities by relevance to the keyword"""
-        if not keyword:
-            return opportunities
+    def _index_results(self, index: SearchIndex, duplicates: DuplicateIndex, opportunities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Index a source's opportunities, skipping entries without a title or URL and near-duplicates of earlier ones.
         
-        keyword_lower = keyword.lower()
-        
-        def calculate_relevance(opp):
-            score = 0
-            title = opp.get('title', '').lower()
-            description = opp.get('description', '').lower()
-            organization = opp.get('organization', '').lower()
-            
-            # Title matches get highest score
-            if keyword_lower in title:
-                score += 10
-                # Exact title match gets bonus
-                if title == keyword_lower:
-                    score += 5
-            
-            # Description matches
-            if keyword_lower in description:
-                score += 5
-            
-            # Organization matches
-            if keyword_lower in organization:
-                score += 3
-            
-            # Bonus for having detailed information
-            if opp.get('amount'):
-                score += 2
-            if opp.get('deadline'):
-                score += 2
-            if opp.get('eligibility'):
-                score += 2
-            if opp.get('location'):
-                score += 1
-            
-            # Penalty for fallback entries
-            if opp.get('is_fallback'):
-                score -= 10
-            
-            return score
-        
-        # Sort by relevance score (highest first)
-        return sorted(opportunities, key=calculate_relevance, reverse=True)
+        Returns the opportunities that were added.
+        """
+        added = []
+        with stage("detailed", "index"):
+            for opp in opportunities:
+                if opp.get('title') and opp.get('url') and duplicates.add(opp) is None:
+                    index.add(opp)
+                    added.append(opp)
+        return added
     
     def _get_fallback_opportunities(self, keyword: str, type: str) -> List[Dict[str, Any]]:
         """Provide fallback opportunities when scraping fails"""
@@ -283,15 +307,18 @@ class EnhancedOpportunityScraper:
                 }
             ]
         
+        for opp in fallback_opportunities:
+            opp['is_fallback'] = True
+        
         # Filter by keyword if provided
         if keyword:
-            keyword_lower = keyword.lower()
-            fallback_opportunities = [opp for opp in fallback_opportunities 
-                                    if keyword_lower in opp['title'].lower() or 
-                                       keyword_lower in (opp.get('description') or '').lower()]
+            fallback_opportunities = self.parser.filter_by_criteria(fallback_opportunities, keyword)
         
         return fallback_opportunities
 
+# Shared across requests so the parser's HTTP session keeps its connections
+_scraper = EnhancedOpportunityScraper()
+
 def scrape_detailed_opportunities(keyword: str = "", type: str = "", region: str = "") -> List[Dict[str, Any]]:
     """
     Main function to scrape detailed opportunities from database websites
@@ -304,5 +331,16 @@ def scrape_detailed_opportunities(keyword: str = "", type: str = "", region: str
     Returns:
         List of detailed opportunity dictionaries
     """
-    scraper = EnhancedOpportunityScraper()
-    return scraper.scrape_detailed_opportunities(keyword, type, region)
+    return _scraper.scrape_detailed_opportunities(keyword, type, region)
+
+async def ascrape_detailed_opportunities(keyword: str = "", type: str = "", region: str = "") -> List[Dict[str, Any]]:
+    """
+    Async variant of scrape_detailed_opportunities for use inside the event loop
+    """
+    return await _scraper.ascrape_detailed_opportunities(keyword, type, region)
+
+def astream_detailed_opportunities(keyword: str = "", type: str = "", region: str = "") -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming variant of ascrape_detailed_opportunities: per-source events, then a ranked summary
+    """
+    return _scraper.astream_detailed_opportunities(keyword, type, region)
@@ -0,0 +1,170 @@
+"""
+Scheduled ingestion that crawls every configured source and stores the results
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from startup_opps_api.database.database import SessionLocal
+from startup_opps_api.database.models import Opportunity
+from startup_opps_api.database.persistence import persist_opportunities, url_hash
+from startup_opps_api.scraper.deadlines import parse_deadline
+from startup_opps_api.scraper.source_registry import source_registry
+from startup_opps_api.scraper.scrapy_spider import StartupOpportunitiesSpider
+from startup_opps_api.services.crawler_runtime import get_crawler_runtime
+from startup_opps_api.services.dedup import DuplicateIndex
+
+logger = logging.getLogger(__name__)
+
+INGESTION_ENABLED = os.getenv("INGESTION_ENABLED", "true").lower() == "true"
+INGESTION_INTERVAL_SECONDS = int(os.getenv("INGESTION_INTERVAL_SECONDS", str(6 * 60 * 60)))
+INGESTION_TIMEOUT_SECONDS = float(os.getenv("INGESTION_TIMEOUT_SECONDS", "900"))
+
+
+def crawl_all_sources() -> List[Dict[str, Any]]:
+    """Crawl every source without keyword or type filters"""
+    crawl = get_crawler_runtime().submit(StartupOpportunitiesSpider, keyword="", region="", type="")
+    result = crawl.result(timeout=INGESTION_TIMEOUT_SECONDS)
+    return result.items
+
+
+# Near-duplicate index over the stored catalog, keyed by url_hash; loaded on the first upsert, then kept up to date
+_catalog_duplicates: Optional[DuplicateIndex] = None
+
+
+def _catalog_index(db: Session) -> DuplicateIndex:
+    global _catalog_duplicates
+    if _catalog_duplicates is None:
+        index = DuplicateIndex()
+        rows = db.query(Opportunity.url, Opportunity.url_hash, Opportunity.title, Opportunity.organization, Opportunity.description)
+        for row in rows:
+            index.add(row._asdict(), id=row.url_hash or url_hash(row.url))
+        _catalog_duplicates = index
+        logger.info(f"Loaded {len(index)} stored opportunities into the duplicate index")
+    return _catalog_duplicates
+
+
+def _row_for(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Opportunity column values for a scraped item"""
+    source = item.get("source") or ""
+    deadline = (item.get("deadline") or "").strip()
+    return {
+        "url": item["url"][:1000],
+        "title": item["title"][:500],
+        "organization": (item.get("organization") or source)[:200],
+        "type": source_registry.type_of(source) or item.get("type") or "opportunity",
+        "description": item.get("description"),
+        "eligibility": item.get("eligibility"),
+        "source": source[:100],
+        "region": item.get("location") or item.get("region") or None,
+        "amount": item.get("amount"),
+        "deadline": parse_deadline(deadline),
+        "deadline_text": deadline[:200] or None,
+    }
+
+
+def upsert_opportunities(db: Session, items: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Insert new opportunities and refresh changed ones in bulk, keyed by canonical URL.
+
+    Items that duplicate a stored opportunity listed under another URL (an
+    aggregator copy of the same program, ...) are skipped.
+    """
+    catalog = _catalog_index(db)
+    rows = []
+    duplicates = 0
+    for item in items:
+        if not (item.get("title") and item.get("url")):
+            continue
+        row = _row_for(item)
+        key = url_hash(row["url"])
+        duplicate_of = catalog.add(row, id=key)
+        if duplicate_of is not None and duplicate_of != key:
+            logger.debug(f"Skipping {row['url']}, a duplicate of {duplicate_of}")
+            duplicates += 1
+            continue
+        rows.append(row)
+
+    try:
+        stats = persist_opportunities(db, rows)
+    except Exception:
+        db.rollback()
+        # The index already holds this run's rows, and only some batches may have committed:
+        # rebuild it from the database next time rather than skip unsaved items as duplicates
+        global _catalog_duplicates
+        _catalog_duplicates = None
+        raise
+    stats["duplicates"] = duplicates
+    return stats
+
+
+def run_ingestion() -> Dict[str, Any]:
+    """Crawl all sources once and upsert the results into the database"""
+    started = time.monotonic()
+    items = crawl_all_sources()
+
+    db = SessionLocal()
+    try:
+        stats = upsert_opportunities(db, items)
+    finally:
+        db.close()
+
+    stats["crawled"] = len(items)
+    stats["duration_seconds"] = round(time.monotonic() - started, 2)
+    logger.info(f"Ingestion finished: {stats}")
+    return stats
+
+
+class IngestionScheduler:
+    """Runs ingestion in the background on a fixed interval"""
+
+    def __init__(self, interval_seconds: int = INGESTION_INTERVAL_SECONDS):
+        self.interval_seconds = interval_seconds
+        self.last_run: Optional[datetime] = None
+        self.last_stats: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        """Whether an ingestion cycle is in progress"""
+        return self._lock.locked()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run_once(self) -> Optional[Dict[str, Any]]:
+        """Run one ingestion cycle unless one is already in progress"""
+        if self._lock.locked():
+            logger.info("Ingestion already running, skipping")
+            return None
+        async with self._lock:
+            try:
+                self.last_stats = await asyncio.to_thread(run_ingestion)
+                self.last_run = datetime.utcnow()
+            except Exception as e:
+                logger.error(f"Ingestion failed: {e}")
+            return self.last_stats
+
+    async def _loop(self):
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval_seconds)
+
+
+ingestion_scheduler = IngestionScheduler()
@@ -0,0 +1,57 @@
+"""
+In-memory cache of parsed, unfiltered source listings
+"""
+
+import copy
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+LISTING_CACHE_TTL_SECONDS = int(os.getenv("LISTING_CACHE_TTL_SECONDS", "1800"))
+
+
+class ListingCache:
+    """Keeps each source's parsed listing for a crawl cycle so searches filter locally"""
+
+    def __init__(self, ttl_seconds: int = LISTING_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "expired": 0}
+
+    def get(self, url: str) -> Optional[List[Dict[str, Any]]]:
+        """Return a copy of the cached items for a listing URL, or None when missing or expired"""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            stored_at, items = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[url]
+                self.counters["expired"] += 1
+                return None
+            self.counters["hits"] += 1
+        # Callers annotate items, so never hand out the cached dicts themselves
+        return copy.deepcopy(items)
+
+    def put(self, url: str, items: List[Dict[str, Any]]):
+        with self._lock:
+            self._entries[url] = (time.monotonic(), copy.deepcopy(items))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = sum(self.counters.values())
+            return {
+                **self.counters,
+                "hit_ratio": round(self.counters["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+listing_cache = ListingCache()
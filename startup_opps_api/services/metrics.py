@@ -0,0 +1,311 @@
+"""
+In-process metrics rendered in the Prometheus text format (/metrics)
+
+Counters and histograms are plain dicts of floats behind a lock, keyed by
+label values; recording an observation is a bisect and two additions.
+Values owned by other components (cache counters, thread pool queue depth,
+in-flight crawls, ...) are read by collector callbacks only when /metrics is
+scraped, so they cost nothing in between.
+
+``stage(pipeline, name)`` times one step of a search pipeline into
+aipply_stage_duration_seconds; ``run_in_thread`` is asyncio.to_thread that
+also records how long the call waited for a free worker thread.
+"""
+
+import asyncio
+import bisect
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+# Seconds; covers cache hits (sub-millisecond) up to full crawls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# (sample name, labels, value)
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _labels(self, values: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, values))
+
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield self.name, self._labels(labels), value
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str):
+        with self._lock:
+            self._values[labels] = value
+
+    @contextmanager
+    def track(self, *labels: str) -> Iterator[None]:
+        """Count the enclosed block as in progress"""
+        self.inc(*labels)
+        try:
+            yield
+        finally:
+            self.dec(*labels)
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield self.name, self._labels(labels), value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [count per bucket (non-cumulative, last one is +Inf), sum]
+        self._values: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, *labels: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = [(labels, list(counts), total) for labels, (counts, total) in self._values.items()]
+        for labels, counts, total in values:
+            base = self._labels(labels)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**base, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", base, total
+            yield f"{self.name}_count", base, cumulative
+
+
+class Registry:
+    """Metrics plus collector callbacks returning (name, type, help, samples) computed at scrape time"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, Iterable[Tuple[Dict[str, str], float]]]]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[Tuple[str, str, str, Iterable[Tuple[Dict[str, str], float]]]]]):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for name, labels, value in metric.samples())
+        for collector in self._collectors:
+            for name, type, help, samples in collector():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {type}")
+                lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.counter(
+    "aipply_http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+http_request_duration = registry.histogram(
+    "aipply_http_request_duration_seconds", "HTTP request latency until the last body byte was sent", ("method", "route"))
+http_in_flight = registry.gauge("aipply_http_requests_in_flight", "HTTP requests being served")
+stage_duration = registry.histogram(
+    "aipply_stage_duration_seconds", "Time spent in each stage of a search pipeline", ("pipeline", "stage"))
+crawls_in_flight = registry.gauge(
+    "aipply_crawls_in_flight", "Crawl jobs (scrapy) and source fetches (detailed) currently running", ("kind",))
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request count, latency and in-flight requests per route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500  # Unless the app gets to send a response
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_in_flight.dec()
+            # The matched route's template keeps label cardinality bounded (/img/{filename}, not every file)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope["method"]
+            http_request_duration.observe(time.perf_counter() - started, method, route)
+            http_requests.inc(method, route, str(status))
+
+
+@contextmanager
+def stage(pipeline: str, name: str) -> Iterator[None]:
+    """Time a block as one stage of a pipeline"""
+    with stage_duration.time(pipeline, name):
+        yield
+
+
+async def run_in_thread(pipeline: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """asyncio.to_thread, recording the wait for a worker thread as the pipeline's "thread_queue" stage"""
+    submitted = time.perf_counter()
+
+    def call():
+        stage_duration.observe(time.perf_counter() - submitted, pipeline, "thread_queue")
+        return fn(*args, **kwargs)
+
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(None, functools.partial(context.run, call))
+
+
+def _thread_pool_samples():
+    """Queue depth and size of the event loop's default executor (used by asyncio.to_thread)"""
+    try:
+        executor = asyncio.get_running_loop()._default_executor
+    except RuntimeError:
+        executor = None
+    if executor is None:
+        return []
+    return [
+        ("aipply_thread_pool_queue_depth", "gauge", "Calls waiting for a worker thread in the default executor",
+         [({}, executor._work_queue.qsize())]),
+        ("aipply_thread_pool_threads", "gauge", "Worker threads started by the default executor",
+         [({}, len(executor._threads))]),
+        ("aipply_thread_pool_max_threads", "gauge", "Worker thread limit of the default executor",
+         [({}, executor._max_workers)]),
+    ]
+
+
+registry.add_collector(_thread_pool_samples)
+
+
+def _numeric(stats: Dict[str, Any]) -> Iterator[Tuple[str, float]]:
+    for key, value in stats.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield key, value
+
+
+def stats_collector(name: str, help: str, label: str, components: Dict[str, Callable[[], Dict[str, Any]]]):
+    """Collector exposing the numeric stats() values of components as ``name{label=component, stat=key}``"""
+
+    def collect():
+        samples = [
+            ({label: component, "stat": key}, value)
+            for component, stats_fn in components.items()
+            for key, value in _numeric(stats_fn())
+        ]
+        return [(name, "gauge", help, samples)]
+
+    return collect
+
+
+def cache_collector(caches: Dict[str, Callable[[], Dict[str, Any]]]):
+    """Collector for caches whose stats() include a hit_ratio, plus their other counters"""
+
+    def collect():
+        stats = {cache: stats_fn() for cache, stats_fn in caches.items()}
+        return [
+            ("aipply_cache_hit_ratio", "gauge", "Share of cache lookups answered from the cache",
+             [({"cache": cache}, values.get("hit_ratio", 0.0)) for cache, values in stats.items()]),
+            ("aipply_cache_stat", "gauge", "Cache counters (hits, misses, entries, ...) since startup",
+             [({"cache": cache, "stat": key}, value) for cache, values in stats.items()
+              for key, value in _numeric(values) if key != "hit_ratio"]),
+        ]
+
+    return collect
@@ -0,0 +1,257 @@
+"""
+Search result cache: an in-process LRU tier in front of an optional shared Redis tier
+"""
+
+import asyncio
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from startup_opps_api.scraper.opportunity_sources import normalize_type
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_TTL_SECONDS = float(os.getenv("RESULT_CACHE_TTL_SECONDS", "300"))
+# How long after expiry an entry is still served while a background refresh runs
+RESULT_CACHE_STALE_SECONDS = float(os.getenv("RESULT_CACHE_STALE_SECONDS", "900"))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "1000"))
+REDIS_URL = os.getenv("REDIS_URL")
+
+REDIS_KEY_PREFIX = "aipply:results:"
+REDIS_RETRY_SECONDS = 30  # Back-off after a Redis error before trying it again
+
+
+def make_key(endpoint: str, keyword: Optional[str] = "", type: Optional[str] = "", region: Optional[str] = "") -> str:
+    """Cache key for a search; case, extra whitespace and type aliases don't create separate entries"""
+    return "|".join([
+        endpoint,
+        " ".join((keyword or "").lower().split()),
+        normalize_type(type) or "",
+        " ".join((region or "").lower().split()),
+    ])
+
+
+def cacheable(value: Any) -> bool:
+    """Whether a computed result is worth caching: not empty, and not only fallback entries of a failed crawl"""
+    if not value:
+        return False
+    if isinstance(value, list) and all(isinstance(item, dict) and item.get("is_fallback") for item in value):
+        return False
+    return True
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    stored_at: float  # Wall-clock time so entries can be shared between workers
+    ttl: float
+    stale_ttl: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+    @property
+    def fresh(self) -> bool:
+        return self.age < self.ttl
+
+    @property
+    def usable(self) -> bool:
+        return self.age < self.ttl + self.stale_ttl
+
+
+class ResultCache:
+    """Caches JSON-serializable search results with a TTL and stale-while-revalidate.
+
+    Lookups check the in-process LRU first and then Redis (when REDIS_URL is
+    set), so a result computed by one worker is reused by the others. Redis
+    errors are logged and the cache keeps working from memory.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+        ttl: float = RESULT_CACHE_TTL_SECONDS,
+        stale_ttl: float = RESULT_CACHE_STALE_SECONDS,
+        redis_url: Optional[str] = REDIS_URL,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.redis_url = redis_url
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        self._redis_retry_at = 0.0
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self.counters = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "redis_hits": 0,
+            "redis_errors": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+        }
+
+    # --- memory tier ---------------------------------------------------------
+
+    def _memory_get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if not entry.usable:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _memory_put(self, key: str, entry: CacheEntry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # --- redis tier ----------------------------------------------------------
+
+    def _redis_client(self):
+        if not self.redis_url or time.monotonic() < self._redis_retry_at:
+            return None
+        if self._redis is None:
+            try:
+                import redis.asyncio as aioredis
+            except ImportError:
+                logger.warning("REDIS_URL is set but the redis package is not installed; using the memory cache only")
+                self.redis_url = None
+                return None
+            self._redis = aioredis.from_url(self.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        return self._redis
+
+    def _redis_failed(self, e: Exception):
+        self.counters["redis_errors"] += 1
+        self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+        logger.warning(f"Result cache Redis tier unavailable for {REDIS_RETRY_SECONDS}s: {e}")
+
+    async def _redis_get(self, key: str) -> Optional[CacheEntry]:
+        client = self._redis_client()
+        if client is None:
+            return None
+        try:
+            raw = await client.get(REDIS_KEY_PREFIX + key)
+        except Exception as e:
+            self._redis_failed(e)
+            return None
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        entry = CacheEntry(value=data["value"], stored_at=data["stored_at"], ttl=data["ttl"], stale_ttl=data["stale_ttl"])
+        return entry if entry.usable else None
+
+    async def _redis_put(self, key: str, entry: CacheEntry):
+        client = self._redis_client()
+        if client is None:
+            return
+        payload = json.dumps({
+            "value": entry.value,
+            "stored_at": entry.stored_at,
+            "ttl": entry.ttl,
+            "stale_ttl": entry.stale_ttl,
+        })
+        try:
+            await client.set(REDIS_KEY_PREFIX + key, payload, ex=max(1, math.ceil(entry.ttl + entry.stale_ttl)))
+        except Exception as e:
+            self._redis_failed(e)
+
+    # --- public API ----------------------------------------------------------
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        """Fresh or stale entry for a key, or None"""
+        entry = self._memory_get(key)
+        if entry is not None:
+            return entry
+        entry = await self._redis_get(key)
+        if entry is not None:
+            self.counters["redis_hits"] += 1
+            self._memory_put(key, entry)
+        return entry
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        entry = CacheEntry(value=value, stored_at=time.time(), ttl=ttl or self.ttl, stale_ttl=self.stale_ttl)
+        self._memory_put(key, entry)
+        await self._redis_put(key, entry)
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]], ttl: Optional[float] = None) -> Any:
+        """Cached value for ``key``, computing it on a miss.
+
+        A stale entry is returned immediately and refreshed in the background.
+        Results that aren't ``cacheable`` (empty, or only fallback entries) are
+        not stored, so a failed crawl is retried next time.
+        """
+        entry = await self.get(key)
+        if entry is not None and entry.fresh:
+            self.counters["hits"] += 1
+            return entry.value
+        if entry is not None:
+            self.counters["stale_hits"] += 1
+            self._schedule_refresh(key, compute, ttl)
+            return entry.value
+
+        self.counters["misses"] += 1
+        value = await compute()
+        if cacheable(value):
+            await self.set(key, value, ttl)
+        return value
+
+    def _schedule_refresh(self, key: str, compute: Callable[[], Awaitable[Any]], ttl: Optional[float]):
+        if key in self._refreshing:
+            return
+        task = asyncio.create_task(self._refresh(key, compute, ttl))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _refresh(self, key: str, compute: Callable[[], Awaitable[Any]], ttl: Optional[float]):
+        self.counters["refreshes"] += 1
+        try:
+            value = await compute()
+            if cacheable(value):
+                await self.set(key, value, ttl)
+        except Exception as e:
+            self.counters["refresh_errors"] += 1
+            logger.warning(f"Background refresh of '{key}' failed: {e}")
+
+    def invalidate(self, key: Optional[str] = None):
+        """Drop one key (or everything) from the memory tier"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.counters["hits"] + self.counters["stale_hits"] + self.counters["misses"]
+        with self._lock:
+            entries = len(self._entries)
+        return {
+            **self.counters,
+            "hit_ratio": round((lookups - self.counters["misses"]) / lookups, 4) if lookups else 0.0,
+            "memory_entries": entries,
+            "redis_enabled": bool(self.redis_url),
+        }
+
+    async def close(self):
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+result_cache = ResultCache()
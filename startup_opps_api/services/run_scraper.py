@@ -1,141 +1,183 @@
-from scrapy.crawler import CrawlerProcess
-from scrapy.utils.project import get_project_settings
-from scrapy import signals
-from pydispatch import dispatcher
+import logging
+import os
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from urllib.parse import urlparse
 
+from startup_opps_api.scraper.enhanced_parser import filter_by_criteria
+from startup_opps_api.scraper.html_backends import get_backend
 from startup_opps_api.scraper.scrapy_spider import StartupOpportunitiesSpider
-from startup_opps_api.scraper.opportunity_sources import OPPORTUNITY_SOURCES, ADDITIONAL_SOURCES
+from startup_opps_api.services.browser_pool import get_browser_pool
+from startup_opps_api.services.circuit_breaker import OPEN, circuit_breakers
+from startup_opps_api.services.crawler_runtime import get_crawler_runtime
+from startup_opps_api.services.dedup import remove_duplicates
+from startup_opps_api.services.listing_cache import listing_cache
+from startup_opps_api.services.metrics import stage
+from startup_opps_api.scraper.opportunity_sources import listing_url
+from startup_opps_api.scraper.source_registry import source_registry
 
-def _should_use_js(url: str, type: str | None) -> bool:
-    try:
-        sources = []
-        if type and type.lower() in OPPORTUNITY_SOURCES:
-            for s in OPPORTUNITY_SOURCES[type.lower()]:
-                if s.get("js"):
-                    sources.append(s["base_url"]) 
-        for s in ADDITIONAL_SOURCES:
-            if s.get("js"):
-                sources.append(s["base_url"]) 
-        return any(base in url for base in sources)
-    except Exception:
-        return False
-
-def _render_with_playwright(urls: list[str], selectors: dict[str, str], type: str | None):
-    # Lazy import to avoid heavy dependency if not used
-    from playwright.sync_api import sync_playwright
+logger = logging.getLogger(__name__)
+
+# Upper bound on how long a request waits for its crawl job
+CRAWL_TIMEOUT_SECONDS = float(os.getenv("CRAWL_TIMEOUT_SECONDS", "120"))
+# Upper bound on how long a request waits for JS-rendered fallback pages
+RENDER_TIMEOUT_SECONDS = float(os.getenv("RENDER_TIMEOUT_SECONDS", "45"))
+
+# Listing URL -> crawl job currently fetching it, so concurrent searches share crawls
+_inflight_crawls = {}
+_inflight_lock = threading.RLock()
+
+
+def _submit_crawl(runtime, sources, keyword):
+    """Start one crawl for the given sources on a running runtime and register it as in flight for their listings"""
+    urls = [listing_url(source, keyword) for source in sources]
+    crawl = runtime.submit(StartupOpportunitiesSpider, keyword=keyword, sources=sources)
+    for url in urls:
+        _inflight_crawls[url] = crawl
+
+    def _release(done: Future):
+        with _inflight_lock:
+            for url in urls:
+                if _inflight_crawls.get(url) is done:
+                    del _inflight_crawls[url]
+
+    crawl.add_done_callback(_release)
+    return crawl
+
+
+def _crawl_listings(sources, keyword):
+    """Collect items for the given sources, crawling only listings that are not cached.
+
+    Listings another search is already crawling are awaited instead of fetched
+    again. Returns (items, blocked urls, visited bases).
+    """
     items = []
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context()
-        page = context.new_page()
-        for url in urls:
-            try:
-                page.goto(url, wait_until="domcontentloaded", timeout=20000)
-                # Wait for container if provided
-                container_sel = selectors.get("container")
-                if container_sel:
-                    try:
-                        page.wait_for_selector(container_sel, timeout=8000)
-                    except Exception:
-                        pass
-                # Extract nodes
-                nodes = page.query_selector_all(container_sel) if container_sel else []
-                for n in nodes:
-                    try:
-                        title_sel = selectors.get("title")
-                        url_sel = selectors.get("url")
-                        title = n.inner_text().strip() if title_sel is None else (n.query_selector(title_sel).inner_text().strip() if n.query_selector(title_sel) else None)
-                        link = None
-                        if url_sel and n.query_selector(url_sel):
-                            link = n.query_selector(url_sel).get_attribute("href")
-                        if link and not link.startswith("http"):
-                            parsed = urlparse(url)
-                            base = f"{parsed.scheme}://{parsed.netloc}"
-                            link = base + link
-                        if title and link:
-                            items.append({
-                                "title": title,
-                                "organization": selectors.get("organization") or urlparse(url).netloc,
-                                "type": type or "opportunity",
-                                "eligibility": None,
-                                "deadline": None,
-                                "url": link,
-                            })
-                    except Exception:
-                        continue
-            except Exception:
-                continue
-        context.close()
-        browser.close()
+    missing = []
+    for source in sources:
+        cached = listing_cache.get(listing_url(source, keyword))
+        if cached is None:
+            missing.append(source)
+        else:
+            items.extend(cached)
+
+    if not missing:
+        return items, set(), set()
+
+    # Starting the reactor can take a while; do it before other searches have to wait on the lock
+    runtime = get_crawler_runtime()
+    runtime.start()
+
+    joined = {}  # in-flight crawl -> our sources it covers
+    own = []
+    with _inflight_lock:
+        for source in missing:
+            crawl = _inflight_crawls.get(listing_url(source, keyword))
+            if crawl is None:
+                own.append(source)
+            else:
+                joined.setdefault(crawl, []).append(source)
+        own_crawl = _submit_crawl(runtime, own, keyword) if own else None
+
+    blocked_urls, visited_bases = set(), set()
+    if own_crawl is not None:
+        result = own_crawl.result(timeout=CRAWL_TIMEOUT_SECONDS)
+        by_source = {}
+        for item in result.items:
+            by_source.setdefault(item.get("source"), []).append(item)
+        for source in own:
+            url = listing_url(source, keyword)
+            crawled = by_source.get(source["name"])
+            if crawled:
+                listing_cache.put(url, crawled)
+            elif circuit_breakers.state(url) == OPEN:
+                # Skipped (or just given up on) by its circuit breaker: point the user at it instead
+                blocked_urls.add(url)
+        items.extend(result.items)
+        blocked_urls |= result.blocked_urls
+        visited_bases |= result.visited_bases
+
+    for crawl, shared_sources in joined.items():
+        result = crawl.result(timeout=CRAWL_TIMEOUT_SECONDS)
+        # The shared crawl also covers other searches' sources; keep only ours (its owner caches them)
+        names = {source["name"] for source in shared_sources}
+        hosts = {urlparse(source["search_url"]).netloc for source in shared_sources}
+        items.extend(item for item in result.items if item.get("source") in names)
+        blocked_urls |= {url for url in result.blocked_urls if urlparse(url).netloc in hosts}
+        visited_bases |= {base for base in result.visited_bases if urlparse(base).netloc in hosts}
+
+    return items, blocked_urls, visited_bases
+
+
+def _render_js_listings(sources, keyword):
+    """Render JS-only listings in parallel in the shared browser and extract them with each source's plan.
+
+    Rendered items are cached like crawled ones, so later searches filter them
+    locally instead of rendering again.
+    """
+    pool = get_browser_pool()
+    if not pool.available():
+        logger.info("Playwright is not installed; skipping JS rendering fallback")
+        return []
+
+    pages = pool.submit(
+        (listing_url(source, keyword), source.get("selectors", {}).get("container")) for source in sources
+    ).result(timeout=RENDER_TIMEOUT_SECONDS)
+
+    backend = get_backend()
+    items = []
+    for source, page in zip(sources, pages):
+        if page.error:
+            continue
+        rendered = source_registry.plan(source).extract_markup(backend, page.html, page.url, limit=None)
+        if rendered:
+            listing_cache.put(listing_url(source, keyword), rendered)
+            items.extend(rendered)
     return items
 
 
+def _matches_region(opp, region):
+    # Most listings carry no location, so only exclude items that state a different one
+    location = (opp.get("location") or "").lower()
+    return not location or region.lower() in location
+
+
 def scrape_opportunities(keyword, region=None, type=None):
-    """Run the Scrapy spider synchronously and return collected items.
+    """Return opportunities for a search, filtering cached source listings locally.
 
-    This avoids Twisted/asyncio interop issues by using CrawlerProcess,
-    which manages the reactor lifecycle internally.
+    Listings missing from the cache are crawled unfiltered on the shared crawler
+    runtime, so this call only blocks the calling worker thread until its own
+    job finishes.
     """
-    results = []
-    blocked_sources = set()
-    visited_bases = set()
-
-    def _item_scraped(item, response, spider):
-        results.append(dict(item))
-
-    def _response_received(response, request, spider):
-        try:
-            status = getattr(response, "status", None)
-            url = getattr(response, "url", None)
-            if url and status in {401, 403, 429}:  # unauthorized/forbidden/rate-limited
-                blocked_sources.add(url)
-            # robots.txt denial often shows as fetch to robots.txt or empty results; flag explicitly
-            if url and url.endswith("/robots.txt"):
-                blocked_sources.add(url)
-            # Track visited base domains to provide fallback links when no items extracted
-            if url:
-                parsed = urlparse(url)
-                if parsed.scheme and parsed.netloc:
-                    visited_bases.add(f"{parsed.scheme}://{parsed.netloc}")
-        except Exception:
-            pass
-
-    # Connect signals to collect items and detect blocked sources
-    dispatcher.connect(_item_scraped, signal=signals.item_scraped)
-    dispatcher.connect(_response_received, signal=signals.response_received)
-
     try:
-        process = CrawlerProcess(get_project_settings())
-        process.crawl(StartupOpportunitiesSpider, keyword=keyword, region=region, type=type)
-        process.start()  # Blocks until crawling is finished
-    finally:
-        # Ensure we disconnect signal handlers
-        dispatcher.disconnect(_item_scraped, signal=signals.item_scraped)
-        dispatcher.disconnect(_response_received, signal=signals.response_received)
-
-    # If Scrapy returned nothing for JS-heavy sources, use Playwright as fallback
+        with stage("search", "crawl"):
+            items, blocked_sources, visited_bases = _crawl_listings(source_registry.for_type(type), keyword)
+    except FutureTimeoutError:
+        logger.warning("Crawl for '%s' did not finish within %ss", keyword, CRAWL_TIMEOUT_SECONDS)
+        return []
+
+    with stage("search", "filter"):
+        results = filter_by_criteria(items, keyword, type)
+        if region:
+            results = [opp for opp in results if _matches_region(opp, region)]
+
+    # If Scrapy returned nothing, render the JS-heavy sources in the browser pool
     if not results:
-        # Build the list of URLs we attempted for this type
-        urls = set()
-        if type and type.lower() in OPPORTUNITY_SOURCES:
-            for s in OPPORTUNITY_SOURCES[type.lower()]:
-                urls.add(s["search_url"])
-        for s in ADDITIONAL_SOURCES:
-            if s.get("type") == (type or s.get("type")):
-                urls.add(s["search_url"])
-        # Pick JS-enabled sources for fallback
-        js_urls = []
-        js_selectors = None
-        for s in OPPORTUNITY_SOURCES.get(type.lower() if type else "accelerators", []):
-            if s.get("js"):
-                js_urls.append(s["search_url"])
-                js_selectors = s["selectors"]  # use first matching selector set
-        if js_urls and js_selectors:
+        js_sources = source_registry.js_sources(type)
+        if js_sources:
             try:
-                results = _render_with_playwright(js_urls[:3], js_selectors, type)
-            except Exception:
-                pass
+                with stage("search", "render_js"):
+                    rendered = filter_by_criteria(_render_js_listings(js_sources, keyword), keyword, type)
+                if region:
+                    rendered = [opp for opp in rendered if _matches_region(opp, region)]
+                results = rendered
+            except FutureTimeoutError:
+                logger.warning("Rendering JS sources for '%s' did not finish within %ss", keyword, RENDER_TIMEOUT_SECONDS)
+            except Exception as e:
+                logger.warning(f"JS rendering fallback failed: {e}")
+
+    # The same program is often listed by several sources
+    with stage("search", "dedup"):
+        results = remove_duplicates(results)
 
     # Append helpful messages for blocked sources
     for src_url in sorted(blocked_sources):
@@ -148,6 +190,7 @@ def scrape_opportunities(keyword, region=None, type=None):
             "eligibility": None,
             "deadline": None,
             "url": base,
+            "is_fallback": True,
         })
 
     # If nothing was scraped at all, provide fallback entries for visited bases
@@ -160,6 +203,7 @@ def scrape_opportunities(keyword, region=None, type=None):
                 "eligibility": None,
                 "deadline": None,
                 "url": base,
+                "is_fallback": True,
             })
 
     return results
@@ -0,0 +1,171 @@
+"""
+In-memory inverted index over opportunity dicts with BM25 ranking
+
+Fields are tokenized into lowercase, accent-folded words ("Educação" and
+"educacao" are the same term) and each field's term counts are weighted, so a
+title hit outweighs a description hit. Documents can be added at any time;
+queries only touch the postings of their own terms and select the top k with
+a heap, so a catalog of tens of thousands of items answers in well under a
+millisecond for typical keywords.
+
+Every query word must match (as a whole word, or as a prefix of one), so
+"climate tech" finds "Tech for Climate" and "clim" finds "climate".
+"""
+
+import bisect
+import heapq
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set
+
+# Field -> weight of one occurrence of a term in that field
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "organization": 1.5,
+    "description": 1.0,
+    "eligibility": 1.0,
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+PREFIX_WEIGHT = 0.5  # Score share of a prefix match relative to the exact word
+MAX_PREFIX_EXPANSIONS = 50
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def fold(text: str) -> str:
+    """Lowercase a text and strip its accents"""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Folded words of a text"""
+    return _WORD_RE.findall(fold(text)) if text else []
+
+
+class SearchIndex:
+    """Incremental inverted index returning the best matching documents for a keyword query"""
+
+    def __init__(self, field_weights: Optional[Dict[str, float]] = None):
+        self.field_weights = field_weights or FIELD_WEIGHTS
+        self.docs: List[Dict[str, Any]] = []
+        self._lengths: List[float] = []
+        self._total_length = 0.0
+        # term -> {doc id: weighted term frequency}
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._vocabulary: List[str] = []  # Sorted, for prefix expansion
+        self._keys: Set[Hashable] = set()
+        # term or query word -> {doc id: BM25 score}; depends on corpus statistics, so reset on every add
+        self._score_cache: Dict[str, Dict[int, float]] = {}
+        self._word_cache: Dict[str, Dict[int, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def add(self, doc: Dict[str, Any], key: Optional[Hashable] = None) -> bool:
+        """Index a document; returns False (and skips it) if another document was added with the same key"""
+        if key is not None:
+            if key in self._keys:
+                return False
+            self._keys.add(key)
+
+        doc_id = len(self.docs)
+        self.docs.append(doc)
+        weighted: Dict[str, float] = {}
+        length = 0.0
+        for field, weight in self.field_weights.items():
+            value = doc.get(field)
+            if not value:
+                continue
+            terms = Counter(tokenize(value))
+            for term, count in terms.items():
+                weighted[term] = weighted.get(term, 0.0) + weight * count
+            length += weight * sum(terms.values())
+        for term, tf in weighted.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._vocabulary, term)
+            postings[doc_id] = tf
+        self._lengths.append(length)
+        self._total_length += length
+        if self._score_cache:
+            self._score_cache.clear()
+            self._word_cache.clear()
+        return True
+
+    def extend(self, docs: Iterable[Dict[str, Any]], key: Optional[Callable[[Dict[str, Any]], Optional[Hashable]]] = None) -> int:
+        """Index several documents, returning how many were added"""
+        return sum(self.add(doc, key(doc) if key else None) for doc in docs)
+
+    def _term_scores(self, term: str) -> Dict[int, float]:
+        scores = self._score_cache.get(term)
+        if scores is None:
+            postings = self._postings.get(term, {})
+            count = len(self.docs)
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            average_length = self._total_length / count if count else 1.0
+            lengths = self._lengths
+            scores = {
+                doc_id: idf * tf * (BM25_K1 + 1)
+                / (tf + BM25_K1 * (1 - BM25_B + BM25_B * lengths[doc_id] / (average_length or 1.0)))
+                for doc_id, tf in postings.items()
+            }
+            self._score_cache[term] = scores
+        return scores
+
+    def _word_scores(self, word: str) -> Dict[int, float]:
+        """Scores of the documents matching one query word, exactly or as a prefix"""
+        scores = self._word_cache.get(word)
+        if scores is not None:
+            return scores
+        scores = dict(self._term_scores(word)) if word in self._postings else {}
+        start = bisect.bisect_right(self._vocabulary, word)
+        for term in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(word):
+                break
+            for doc_id, score in self._term_scores(term).items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + score * PREFIX_WEIGHT
+        self._word_cache[word] = scores
+        return scores
+
+    def search(self, query: str = "", k: Optional[int] = 20,
+               predicate: Optional[Callable[[Dict[str, Any]], bool]] = None) -> List[Dict[str, Any]]:
+        """Best ``k`` documents (all of them when k is None) matching every query word and the predicate.
+
+        Without query words, documents are returned in the order they were added.
+        """
+        words = list(dict.fromkeys(tokenize(query)))
+        if not words:
+            matching = (doc for doc in self.docs if predicate is None or predicate(doc))
+            return list(matching) if k is None else [doc for _, doc in zip(range(k), matching)]
+
+        per_word = sorted((self._word_scores(word) for word in words), key=len)
+        if not per_word[0]:
+            return []
+
+        rarest, rest = per_word[0], per_word[1:]
+        if not rest and predicate is None:
+            totals = rarest  # Read-only from here on, no need to copy the cached scores
+        else:
+            totals = {}
+            for doc_id, score in rarest.items():
+                for scores in rest:
+                    other = scores.get(doc_id)
+                    if other is None:
+                        break
+                    score += other
+                else:
+                    if predicate is None or predicate(self.docs[doc_id]):
+                        totals[doc_id] = score
+
+        # Ties keep insertion order
+        ranked = ((score, -doc_id) for doc_id, score in totals.items())
+        best = sorted(ranked, reverse=True) if k is None else heapq.nlargest(k, ranked)
+        return [self.docs[-negated_id] for _, negated_id in best]
@@ -0,0 +1,102 @@
+"""
+Request coalescing: concurrent callers with the same key share one in-flight call (or event stream)
+"""
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _Stream:
+    """Events an in-flight stream produced so far, replayed to every listener"""
+
+    def __init__(self):
+        self.events: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.updated = asyncio.Event()
+
+    def notify(self):
+        updated, self.updated = self.updated, asyncio.Event()
+        updated.set()
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; callers arriving meanwhile await the same result.
+
+    The call runs as its own task, so a caller that disconnects (and is
+    cancelled) doesn't cancel the work for everyone else. Results are shared,
+    so callers must treat them as read-only.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._streams: Dict[str, _Stream] = {}
+        self.counters = {"calls": 0, "coalesced": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is not None:
+            self.counters["coalesced"] += 1
+            return await asyncio.shield(task)
+
+        self.counters["calls"] += 1
+        task = asyncio.ensure_future(fn())
+        self._calls[key] = task
+        task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled() and task.exception() is not None:
+            # Retrieved here so a failure nobody awaited anymore isn't reported as unhandled
+            logger.debug(f"In-flight call '{key}' failed: {task.exception()}")
+
+    async def stream(self, key: str, fn: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        """Like ``do`` for async iterators: listeners share one run of ``fn()`` and each gets every event.
+
+        A listener joining late first gets the events produced so far. The run
+        is its own task and finishes even if every listener goes away.
+        """
+        stream = self._streams.get(key)
+        if stream is None:
+            self.counters["calls"] += 1
+            stream = self._streams[key] = _Stream()
+            asyncio.ensure_future(self._pump(key, stream, fn))
+        else:
+            self.counters["coalesced"] += 1
+
+        sent = 0
+        while True:
+            updated = stream.updated
+            while sent < len(stream.events):
+                yield stream.events[sent]
+                sent += 1
+            if stream.done:
+                if stream.error is not None:
+                    raise stream.error
+                return
+            await updated.wait()
+
+    async def _pump(self, key: str, stream: _Stream, fn: Callable[[], AsyncIterator[Any]]):
+        try:
+            async for event in fn():
+                stream.events.append(event)
+                stream.notify()
+        except Exception as e:
+            logger.debug(f"In-flight stream '{key}' failed: {e!r}")
+            stream.error = e
+        finally:
+            stream.done = True
+            if self._streams.get(key) is stream:
+                del self._streams[key]
+            stream.notify()
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.counters, "in_flight": len(self._calls) + len(self._streams)}
+
+
+search_flights = SingleFlight()
@@ -0,0 +1,180 @@
+"""
+Per-source crawl telemetry, stored in scraping_logs
+
+Every listing fetch + parse, from the async fetcher, the requests fallback
+or the Scrapy spider, is recorded with its latency, response size, HTTP
+status, item count and error class. Records are appended to an in-memory
+buffer and written by a background thread in multi-row INSERTs, every
+TELEMETRY_FLUSH_INTERVAL_SECONDS or once TELEMETRY_BATCH_SIZE records are
+waiting, so recording never waits on the database. When the database falls
+behind, the buffer keeps the newest TELEMETRY_MAX_BUFFER records.
+"""
+
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, List, Optional
+from urllib.parse import urlparse
+
+import numpy as np
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from startup_opps_api.database.database import SessionLocal
+from startup_opps_api.database.models import ScrapingLog
+
+logger = logging.getLogger(__name__)
+
+TELEMETRY_ENABLED = os.getenv("TELEMETRY_ENABLED", "true").lower() == "true"
+TELEMETRY_FLUSH_INTERVAL_SECONDS = float(os.getenv("TELEMETRY_FLUSH_INTERVAL_SECONDS", "5"))
+TELEMETRY_BATCH_SIZE = int(os.getenv("TELEMETRY_BATCH_SIZE", "200"))
+TELEMETRY_MAX_BUFFER = int(os.getenv("TELEMETRY_MAX_BUFFER", "10000"))
+
+
+def _status_of(http_status: Optional[int], items: int, error: Optional[BaseException]) -> str:
+    if error is not None or (http_status is not None and http_status >= 400):
+        return "error"
+    return "success" if items else "partial"  # A listing without items usually means extraction broke
+
+
+class TelemetryWriter:
+    """Buffers crawl records from any thread and writes them to scraping_logs in batches"""
+
+    def __init__(self, batch_size: int = TELEMETRY_BATCH_SIZE, interval_seconds: float = TELEMETRY_FLUSH_INTERVAL_SECONDS,
+                 max_buffer: int = TELEMETRY_MAX_BUFFER, enabled: bool = TELEMETRY_ENABLED):
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+        self.enabled = enabled
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=max_buffer)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.counters = {"recorded": 0, "written": 0, "dropped": 0, "flush_errors": 0}
+
+    def record(
+        self,
+        source: Optional[str],
+        url: str,
+        crawl_path: str,
+        latency_seconds: float,
+        http_status: Optional[int] = None,
+        response_bytes: Optional[int] = None,
+        items: int = 0,
+        error: Optional[BaseException] = None,
+    ):
+        """Queue one fetch + parse record; never blocks on the database"""
+        if not self.enabled:
+            return
+        row = {
+            "source": (source or urlparse(url).netloc or "unknown")[:100],
+            "url": url[:1000],
+            "crawl_path": crawl_path,
+            "status": _status_of(http_status, items, error),
+            "http_status": http_status,
+            "response_bytes": response_bytes,
+            "opportunities_found": items,
+            "latency_ms": round(latency_seconds * 1000, 1),
+            "duration_seconds": int(round(latency_seconds)),
+            "error_class": type(error).__name__ if error is not None else None,
+            "error_message": str(error)[:1000] if error is not None else None,
+            "scraped_at": datetime.utcnow(),
+        }
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.counters["dropped"] += 1
+            self._buffer.append(row)
+            self.counters["recorded"] += 1
+            pending = len(self._buffer)
+        self._ensure_started()
+        if pending >= self.batch_size:
+            self._wake.set()
+
+    def _ensure_started(self):
+        if self._thread is None and not self._stopped.is_set():
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="telemetry-writer", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval_seconds)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """Write everything buffered so far; returns the number of records written"""
+        written = 0
+        while True:
+            with self._lock:
+                batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            if not batch:
+                return written
+            db = SessionLocal()
+            try:
+                db.execute(insert(ScrapingLog), batch)
+                db.commit()
+                written += len(batch)
+                self.counters["written"] += len(batch)
+            except Exception as e:
+                db.rollback()
+                self.counters["flush_errors"] += 1
+                logger.warning(f"Could not write {len(batch)} crawl records: {e!r}")
+                return written  # Records of a failed batch are dropped rather than retried forever
+            finally:
+                db.close()
+
+    def stop(self, timeout: float = 10):
+        """Stop the writer thread and write what is still buffered"""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self.counters, "buffered": len(self._buffer)}
+
+
+telemetry = TelemetryWriter()
+
+
+def source_stats(db: Session, hours: float = 24) -> List[Dict[str, Any]]:
+    """Per-source rollup of the last ``hours`` of crawl records, worst success rate first"""
+    since = datetime.utcnow() - timedelta(hours=hours)
+    rows = db.execute(
+        select(ScrapingLog.source, ScrapingLog.status, ScrapingLog.latency_ms, ScrapingLog.response_bytes,
+               ScrapingLog.opportunities_found, ScrapingLog.error_class, ScrapingLog.scraped_at)
+        .where(ScrapingLog.scraped_at >= since)
+        .order_by(ScrapingLog.scraped_at)
+    ).all()
+
+    by_source: Dict[str, List[Any]] = {}
+    for row in rows:
+        by_source.setdefault(row.source, []).append(row)
+
+    stats = []
+    for source, records in by_source.items():
+        latencies = np.array([r.latency_ms for r in records if r.latency_ms is not None], dtype=np.float64)
+        errors = [r for r in records if r.status == "error"]
+        p50, p95 = np.percentile(latencies, [50, 95]) if len(latencies) else (None, None)
+        stats.append({
+            "source": source,
+            "requests": len(records),
+            "success_rate": round(1 - len(errors) / len(records), 4),
+            "empty_rate": round(sum(r.status == "partial" for r in records) / len(records), 4),
+            "p50_latency_ms": round(float(p50), 1) if p50 is not None else None,
+            "p95_latency_ms": round(float(p95), 1) if p95 is not None else None,
+            "avg_items": round(sum(r.opportunities_found or 0 for r in records) / len(records), 1),
+            "avg_bytes": round(sum(r.response_bytes or 0 for r in records) / len(records)),
+            "last_error": errors[-1].error_class if errors else None,
+            "last_error_at": errors[-1].scraped_at.isoformat() if errors else None,
+            "last_crawled_at": records[-1].scraped_at.isoformat(),
+        })
+    stats.sort(key=lambda entry: (entry["success_rate"], -entry["requests"]))
+    return stats
+
@@ -0,0 +1,169 @@
+"""
+Vectorized relevance scoring of an opportunity catalog with NumPy
+
+The catalog is held as a sparse TF-IDF matrix over hashed word features,
+stored column-major (one slice of rows per feature) so a query only reads the
+columns of its own words, next to dense columns flagging whether amount,
+deadline and eligibility are filled in. A query, or a batch of queries, is
+scored for every item with a handful of array operations and the top k come
+from argpartition instead of a full sort.
+
+Words are tokenized and accent-folded exactly like the search index, and
+hashed with CRC32 so the same word maps to the same column in every process.
+"""
+
+import zlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from startup_opps_api.services.search_index import FIELD_WEIGHTS, tokenize
+
+HASH_FEATURES = 2 ** 18
+
+# Weight of each filled-in detail field in the score, next to the cosine similarity (0-1) of the text
+DETAIL_FIELDS = ("amount", "deadline", "eligibility")
+DETAIL_WEIGHTS = np.array([0.04, 0.04, 0.04], dtype=np.float32)
+
+# Profile answers matched against the opportunities' text when ranking for a user
+PROFILE_FIELDS = ("background", "interests", "field", "education_level", "region")
+
+
+def feature_of(word: str, features: int = HASH_FEATURES) -> int:
+    return zlib.crc32(word.encode("utf-8")) % features
+
+
+class ScoringMatrix:
+    """Immutable TF-IDF + detail-feature matrix of a catalog of opportunity dicts"""
+
+    def __init__(self, docs: Sequence[Dict[str, Any]], features: int = HASH_FEATURES,
+                 field_weights: Optional[Dict[str, float]] = None):
+        self.docs = list(docs)
+        self.features = features
+        field_weights = field_weights or FIELD_WEIGHTS
+
+        rows: List[int] = []
+        columns: List[int] = []
+        weights: List[float] = []
+        for row, doc in enumerate(self.docs):
+            counts: Dict[int, float] = {}
+            for field, weight in field_weights.items():
+                for word in tokenize(doc.get(field)):
+                    column = feature_of(word, features)
+                    counts[column] = counts.get(column, 0.0) + weight
+            rows.extend([row] * len(counts))
+            columns.extend(counts)
+            weights.extend(counts.values())
+
+        rows = np.array(rows, dtype=np.int32)
+        columns = np.array(columns, dtype=np.int32)
+        tf = np.log1p(np.array(weights, dtype=np.float32))  # Sublinear term frequency
+
+        count = len(self.docs)
+        df = np.bincount(columns, minlength=features)
+        self.idf = (np.log((1 + count) / (1 + df)) + 1).astype(np.float32)
+        values = tf * self.idf[columns]
+        norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=count)).astype(np.float32)
+        values /= np.maximum(norms, 1e-12)[rows]
+
+        # Column-major layout: the rows and values of column c are [column_start[c]:column_start[c + 1]]
+        order = np.argsort(columns, kind="stable")
+        self._rows = rows[order]
+        self._values = values[order]
+        self._column_start = np.concatenate(([0], np.cumsum(df))).astype(np.int64)
+
+        self.details = np.array(
+            [[1.0 if doc.get(field) else 0.0 for field in DETAIL_FIELDS] for doc in self.docs],
+            dtype=np.float32,
+        ).reshape(count, len(DETAIL_FIELDS))
+        self._detail_scores = self.details @ DETAIL_WEIGHTS
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def _query_columns(self, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Hashed columns of a query and their normalized TF-IDF weights"""
+        counts: Dict[int, float] = {}
+        for word in tokenize(query):
+            column = feature_of(word, self.features)
+            counts[column] = counts.get(column, 0.0) + 1.0
+        columns = np.fromiter(counts, dtype=np.int64, count=len(counts))
+        weights = np.log1p(np.fromiter(counts.values(), dtype=np.float32, count=len(counts))) * self.idf[columns]
+        norm = np.linalg.norm(weights)
+        return columns, weights / norm if norm else weights
+
+    def score_batch(self, queries: Sequence[str], require_all: bool = False) -> np.ndarray:
+        """Scores of every item for every query, shape (len(queries), len(self)).
+
+        Each score is the cosine similarity of the query to the item's text plus
+        the detail bonus; items sharing no word with a query (or, with
+        require_all, missing one of its words) score 0.
+        """
+        count = len(self.docs)
+        query_rows, doc_rows, products = [], [], []
+        needed = np.zeros(len(queries), dtype=np.int64)  # Distinct words of each query
+        for q, query in enumerate(queries):
+            columns, weights = self._query_columns(query)
+            needed[q] = len(columns)
+            starts = self._column_start[columns]
+            lengths = self._column_start[columns + 1] - starts
+            if not lengths.sum():
+                continue
+            # Positions of every stored value in the query's columns, without a Python loop per column
+            positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+            query_rows.append(np.full(len(positions), q, dtype=np.int64))
+            doc_rows.append(self._rows[positions])
+            products.append(self._values[positions] * np.repeat(weights, lengths))
+
+        scores = np.zeros((len(queries), count), dtype=np.float32)
+        if not products:
+            return scores
+        flat = np.concatenate(query_rows) * count + np.concatenate(doc_rows)
+        similarity = np.bincount(flat, weights=np.concatenate(products), minlength=len(queries) * count)
+        similarity = similarity.reshape(len(queries), count).astype(np.float32)
+
+        matched = np.bincount(flat, minlength=len(queries) * count).reshape(len(queries), count)
+        keep = matched >= (np.maximum(needed, 1)[:, None] if require_all else 1)
+        np.add(similarity, self._detail_scores, out=scores, where=keep)
+        return scores
+
+    def score(self, query: str, require_all: bool = False) -> np.ndarray:
+        return self.score_batch([query], require_all)[0]
+
+    def top_k(self, scores: np.ndarray, k: int = 20) -> List[Tuple[int, float]]:
+        """(row, score) of the k best items with a positive score, best first"""
+        if k <= 0 or not len(scores):
+            return []
+        if k < len(scores):
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(len(scores))
+        candidates = candidates[scores[candidates] > 0]
+        best = candidates[np.lexsort((candidates, -scores[candidates]))]
+        return [(int(row), float(scores[row])) for row in best]
+
+    def search(self, query: str, k: int = 20, require_all: bool = False) -> List[Dict[str, Any]]:
+        """Best k items for one query"""
+        return [self.docs[row] for row, _ in self.top_k(self.score(query, require_all), k)]
+
+    def search_batch(self, queries: Sequence[str], k: int = 20, require_all: bool = False) -> List[List[Dict[str, Any]]]:
+        """Best k items for each of several queries"""
+        return [
+            [self.docs[row] for row, _ in self.top_k(scores, k)]
+            for scores in self.score_batch(queries, require_all)
+        ]
+
+
+def profile_order(profile: Dict[str, Any], docs: Sequence[Dict[str, Any]]) -> List[int]:
+    """Rows of ``docs`` ordered by their summed score against every profile answer, scored as one batch.
+
+    Opportunities matching no answer keep their original order at the end.
+    """
+    queries = [str(profile[field]) for field in PROFILE_FIELDS if profile.get(field)]
+    if not queries or len(docs) < 2:
+        return list(range(len(docs)))
+    matrix = ScoringMatrix(docs)
+    totals = matrix.score_batch(queries).sum(axis=0)
+    ranked = [row for row, _ in matrix.top_k(totals, len(docs))]
+    ranked_rows = set(ranked)
+    return ranked + [row for row in range(len(docs)) if row not in ranked_rows]
@@ -0,0 +1,39 @@
+"""
+Test settings: a throwaway database and caches, no background ingestion or telemetry writes
+"""
+
+import functools
+import os
+import sys
+import tempfile
+import threading
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+
+import pytest
+
+_tmp = tempfile.mkdtemp(prefix="aipply-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp, 'test.db')}")
+os.environ.setdefault("HTTP_CACHE_PATH", os.path.join(_tmp, "http_cache.sqlite"))
+os.environ.setdefault("CIRCUIT_STATE_PATH", os.path.join(_tmp, "circuit_breakers.json"))
+os.environ.setdefault("INGESTION_ENABLED", "false")
+os.environ.setdefault("TELEMETRY_ENABLED", "false")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def fixture_server():
+    """Base URL of a local HTTP server for the pages in tests/fixtures"""
+    server = HTTPServer(("127.0.0.1", 0), functools.partial(_QuietHandler, directory=FIXTURES))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main_enhanced
+from startup_opps_api.services.ingestion import ingestion_scheduler
+
+TOKEN = "test-admin-token"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main_enhanced, "ADMIN_TOKEN", TOKEN)
+    monkeypatch.setattr(ingestion_scheduler, "run_once", lambda: asyncio.sleep(0))
+    # No context manager: startup would boot the crawler runtime
+    return TestClient(main_enhanced.app)
+
+
+def _auth(token=TOKEN):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_ingestion_trigger_requires_the_admin_token(client):
+    assert client.post("/api/ingestion/run").status_code == 401
+    assert client.post("/api/ingestion/run", headers=_auth("wrong")).status_code == 401
+    response = client.post("/api/ingestion/run", headers=_auth())
+    assert response.status_code == 200
+    assert response.json()["status"] == "scheduled"
+
+
+def test_admin_endpoints_are_disabled_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(main_enhanced, "ADMIN_TOKEN", None)
+    assert client.post("/api/ingestion/run", headers=_auth()).status_code == 404
+
+
+def test_ingestion_trigger_conflicts_with_a_running_cycle(client, monkeypatch):
+    monkeypatch.setattr(type(ingestion_scheduler), "running", property(lambda self: True))
+    assert client.post("/api/ingestion/run", headers=_auth()).status_code == 409
+
+
+def test_source_health_requires_the_admin_token(client, monkeypatch):
+    assert client.get("/api/admin/sources").status_code == 401
+    monkeypatch.setattr(main_enhanced, "ADMIN_TOKEN", None)
+    assert client.get("/api/admin/sources", headers=_auth()).status_code == 404
+    monkeypatch.setattr(main_enhanced, "ADMIN_TOKEN", TOKEN)
+    main_enhanced.create_tables()
+    response = client.get("/api/admin/sources", headers=_auth())
+    assert response.status_code == 200
+    assert set(response.json()) == {"window_hours", "sources", "writer", "circuits"}
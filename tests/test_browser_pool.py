@@ -0,0 +1,32 @@
+import pytest
+
+from startup_opps_api.services.browser_pool import BrowserPool
+
+
+@pytest.fixture
+def pool():
+    if not BrowserPool.available():
+        pytest.skip("playwright is not installed")
+    pool = BrowserPool(max_contexts=2, navigation_timeout=10, settle_timeout=5)
+    try:
+        pool.start(warm=True)
+    except Exception as e:
+        pool.stop()
+        pytest.skip(f"Chromium could not be launched: {str(e).splitlines()[0]}")
+    yield pool
+    pool.stop()
+
+
+def test_renders_script_generated_listing(pool, fixture_server):
+    url = f"{fixture_server}/js_listing.html"
+    [page] = pool.render([url], wait_for="article.opportunity", timeout=30)
+    assert page.error is None
+    assert page.url == url
+    assert "Climate Fellowship" in page.html
+    assert "Founder Grant" in page.html
+
+
+def test_unreachable_page_is_reported_not_raised(pool):
+    [page] = pool.render(["http://127.0.0.1:9/listing"], timeout=30)
+    assert page.html == ""
+    assert page.error
@@ -0,0 +1,36 @@
+import json
+import time
+
+from startup_opps_api.services.circuit_breaker import OPEN, CircuitBreakers
+
+
+def _wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_transition_is_saved_by_the_writer_thread(tmp_path):
+    path = tmp_path / "circuits.json"
+    breakers = CircuitBreakers(path=str(path), failure_threshold=1)
+    try:
+        breakers.record_failure("https://down.example/listing", "ConnectTimeout")
+        assert breakers._thread is not None and breakers._thread.is_alive()
+        assert _wait_for(path.exists)
+        assert json.loads(path.read_text())["down.example"]["state"] == OPEN
+    finally:
+        breakers.stop()
+
+
+def test_stop_saves_latency_samples_left_for_the_interval(tmp_path):
+    path = tmp_path / "circuits.json"
+    breakers = CircuitBreakers(path=str(path))
+    breakers.record_success("https://up.example/listing", 0.25)
+    assert not path.exists()
+    breakers.stop()
+    assert not breakers._thread.is_alive()
+    assert json.loads(path.read_text())["up.example"]["latencies"] == [0.25]
+    assert CircuitBreakers(path=str(path)).state("https://up.example/") == "closed"
@@ -0,0 +1,41 @@
+from datetime import date, datetime
+
+import pytest
+
+from startup_opps_api.scraper.deadlines import parse_deadline
+
+REFERENCE = date(2026, 10, 17)
+
+
+@pytest.mark.parametrize("text, expected", [
+    # Ranges where only the closing date carries the year
+    ("Inscrições de 1 de julho a 31 de agosto de 2026", date(2026, 8, 31)),
+    ("March 1 - April 30, 2026", date(2026, 4, 30)),
+    ("Dec 1 - Jan 31, 2027", date(2027, 1, 31)),
+    # The closing date is picked by position, not as the latest date
+    ("Applications open Sep 1st, close Nov 15th", date(2026, 11, 15)),
+    ("Deadline: Nov 15, 2026. Program starts Jan 10, 2027", date(2026, 11, 15)),
+    ("2026-03-01 to 2026-04-15", date(2026, 4, 15)),
+    # Single dates
+    ("10 de outubro de 2026", date(2026, 10, 10)),
+    ("March 2026", date(2026, 3, 31)),
+    ("31/10/2025", date(2025, 10, 31)),
+    ("Apply by 30 June", date(2027, 6, 30)),
+    # Ambiguous abbreviations need a deadline context
+    ("Deadline: 10 out", date(2026, 10, 10)),
+    ("Inscrições até 15 set", date(2027, 9, 15)),
+    ("Mar. 15", date(2027, 3, 15)),
+])
+def test_parse_deadline(text, expected):
+    assert parse_deadline(text, REFERENCE) == datetime(expected.year, expected.month, expected.day)
+
+
+@pytest.mark.parametrize("text", [
+    "10 out of 12 spots left",
+    "You may set 3 goals",
+    "Rolling basis",
+    "Feb 30, 2026",
+    "",
+])
+def test_no_deadline(text):
+    assert parse_deadline(text, REFERENCE) is None
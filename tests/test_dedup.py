@@ -0,0 +1,36 @@
+from startup_opps_api.services.dedup import DuplicateIndex, features, remove_duplicates
+
+
+def test_true_duplicates_across_sources_are_merged():
+    opportunities = [
+        {"title": "Google for Startups Accelerator: Brazil", "organization": "Google",
+         "url": "https://startup.google.com/programs/accelerator/brazil/?utm_source=newsletter"},
+        {"title": "Google for Startups Accelerator - Brazil", "organization": "Google",
+         "url": "https://example-aggregator.com/google-accelerator-brazil"},
+        {"title": "Google for Startups Accelerator Brazil", "organization": "Google",
+         "url": "https://www.startup.google.com/programs/accelerator/brazil"},
+    ]
+    assert remove_duplicates(opportunities) == opportunities[:1]
+
+
+def test_regional_editions_are_kept():
+    opportunities = [
+        {"title": "Google for Startups Accelerator: Africa", "organization": "Google",
+         "url": "https://startup.google.com/programs/accelerator/africa/"},
+        {"title": "Google for Startups Accelerator: Brazil", "organization": "Google",
+         "url": "https://startup.google.com/programs/accelerator/brazil/"},
+    ]
+    assert remove_duplicates(opportunities) == opportunities
+
+
+def test_yearly_editions_are_kept():
+    index = DuplicateIndex()
+    assert index.add({"title": "Climate Fellowship 2026", "organization": "Acme Foundation"}) is None
+    assert index.add({"title": "Climate Fellowship 2027", "organization": "Acme Foundation"}) is None
+
+
+def test_source_name_fallback_organization_is_not_a_feature():
+    doc = {"title": "Ocean Research Grant", "organization": "OpportunityDesk", "source": "OpportunityDesk"}
+    assert not any(feature.startswith("org:") for feature in features(doc))
+    named = {**doc, "organization": "Blue Ocean Trust"}
+    assert "org:trust" in features(named)
@@ -0,0 +1,22 @@
+from startup_opps_api.scraper import enhanced_parser
+from startup_opps_api.scraper.enhanced_parser import EnhancedOpportunityParser
+from startup_opps_api.services.circuit_breaker import OPEN, CircuitBreakers
+
+# Nothing listens on the discard port, so the connection is refused
+UNREACHABLE_URL = "http://127.0.0.1:9/listing"
+
+
+def test_failing_url_opens_circuit_and_is_recorded(monkeypatch):
+    breakers = CircuitBreakers(path=None, failure_threshold=2)
+    monkeypatch.setattr(enhanced_parser, "circuit_breakers", breakers)
+    records = []
+    monkeypatch.setattr(enhanced_parser.telemetry, "record", lambda *args: records.append(args))
+
+    parser = EnhancedOpportunityParser()
+    assert parser.parse_database_website(UNREACHABLE_URL, "", "accelerator") == []
+    assert parser.parse_database_website(UNREACHABLE_URL, "", "accelerator") == []
+
+    assert breakers.state(UNREACHABLE_URL) == OPEN
+    assert len(records) == 2
+    assert records[0][2] == "requests"
+    assert isinstance(records[0][-1], Exception)
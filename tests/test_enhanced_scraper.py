@@ -0,0 +1,50 @@
+import asyncio
+
+from startup_opps_api.scraper.extraction import MAX_ITEMS
+from startup_opps_api.services.enhanced_scraper import EnhancedOpportunityScraper
+from startup_opps_api.services.listing_cache import listing_cache
+
+# tests/fixtures/many_cards.html lists 15 programs; only the 13th matches
+KEYWORD = "ocean"
+MATCH = "Ocean Climate Fellowship"
+
+
+def _scraper(monkeypatch, fixture_server, path):
+    source = {"name": "Fixture Programs", "search_url": f"{fixture_server}/{path}", "type": "fellowship"}
+    scraper = EnhancedOpportunityScraper()
+    monkeypatch.setattr(scraper, "_get_relevant_sources", lambda type: [source])
+    return scraper, source
+
+
+def test_match_past_the_page_cap_is_found(monkeypatch, fixture_server):
+    scraper, source = _scraper(monkeypatch, fixture_server, "many_cards.html")
+
+    results = scraper.scrape_detailed_opportunities(KEYWORD)
+
+    assert [opp["title"] for opp in results] == [MATCH]
+    assert results[0]["url"] == f"{fixture_server}/programs/13"
+    # The whole listing is cached, not just its first MAX_ITEMS cards
+    assert len(listing_cache.get(source["search_url"])) == 15 > MAX_ITEMS
+
+
+def test_async_match_past_the_page_cap_is_found(monkeypatch, fixture_server):
+    # Query string keeps this listing's cache entry apart from the sync test's
+    scraper, _ = _scraper(monkeypatch, fixture_server, "many_cards.html?async=1")
+
+    async def run():
+        events = [event async for event in scraper.astream_detailed_opportunities(KEYWORD)]
+        return events[0], events[-1]
+
+    source_event, summary = asyncio.run(run())
+    assert [opp["title"] for opp in source_event["opportunities"]] == [MATCH]
+    assert [opp["title"] for opp in summary["opportunities"]] == [MATCH]
+
+
+def test_results_are_capped_after_filtering(monkeypatch, fixture_server):
+    scraper, _ = _scraper(monkeypatch, fixture_server, "many_cards.html?capped=1")
+    scraper.max_results = 5
+
+    results = scraper.scrape_detailed_opportunities("program")
+
+    assert len(results) == 5
+    assert all("Program" in opp["title"] for opp in results)
@@ -0,0 +1,53 @@
+import pytest
+
+from startup_opps_api.scraper.extraction import GENERIC_PLAN, ExtractionPlan
+from startup_opps_api.scraper.html_backends import BACKENDS
+from startup_opps_api.scraper.source_registry import source_registry
+
+MENU_PAGE = b"""
+<html><body>
+  <ul class="menu">
+    <li class="menu-item"><a href="/about">About us</a></li>
+    <li class="menu-item"><a href="/contact">Contact</a></li>
+  </ul>
+</body></html>
+"""
+
+CARD_PAGE = b"""
+<html><body>
+  <div class="program-card"><h3><a href="/accelerators/sao-paulo">Techstars Sao Paulo</a></h3></div>
+  <li class="menu-item"><a href="/about">About us</a></li>
+</body></html>
+"""
+
+BACKEND_NAMES = [name for name, backend_cls in BACKENDS.items() if backend_cls.available()]
+
+
+@pytest.fixture
+def techstars():
+    return source_registry.get("Techstars")
+
+
+@pytest.mark.parametrize("backend_name", BACKEND_NAMES)
+def test_configured_source_ignores_navigation_when_its_container_misses(techstars, backend_name):
+    backend = BACKENDS[backend_name]()
+    plan = source_registry.plan(techstars)
+    assert plan.extract_markup(backend, MENU_PAGE, techstars["search_url"], limit=None) == []
+    assert plan.extract(backend.parse(MENU_PAGE), techstars["search_url"], limit=None) == []
+
+
+@pytest.mark.parametrize("backend_name", BACKEND_NAMES)
+def test_configured_source_extracts_with_its_own_container(techstars, backend_name):
+    backend = BACKENDS[backend_name]()
+    items = source_registry.plan(techstars).extract_markup(backend, CARD_PAGE, techstars["search_url"], limit=None)
+    assert [item["title"] for item in items] == ["Techstars Sao Paulo"]
+
+
+@pytest.mark.parametrize("backend_name", BACKEND_NAMES)
+def test_heuristic_containers_for_unknown_sites_and_opted_in_sources(techstars, backend_name):
+    backend = BACKENDS[backend_name]()
+    url = "https://example.org/programs"
+    assert [item["title"] for item in GENERIC_PLAN.extract_markup(backend, MENU_PAGE, url)] == ["About us", "Contact"]
+
+    opted_in = ExtractionPlan.compile({**techstars, "heuristic_containers": True}, "accelerator")
+    assert len(opted_in.extract_markup(backend, MENU_PAGE, techstars["search_url"])) == 2
@@ -0,0 +1,48 @@
+import asyncio
+import os
+
+from startup_opps_api.scraper.fetcher import AsyncFetcher
+from startup_opps_api.scraper.http_cache import HTTPCache
+
+from conftest import FIXTURES
+
+PAGE = "many_cards.html"
+
+
+def _fetch_twice(fetcher, url):
+    async def run():
+        try:
+            return await fetcher.fetch(url), await fetcher.fetch(url)
+        finally:
+            await fetcher.aclose()
+
+    return asyncio.run(run())
+
+
+def test_not_modified_page_is_served_from_cache(tmp_path, fixture_server):
+    cache = HTTPCache(path=str(tmp_path / "http_cache.sqlite"))
+    url = f"{fixture_server}/{PAGE}"
+
+    first, second = _fetch_twice(AsyncFetcher(cache=cache), url)
+
+    assert second.status == 200 and second.content == first.content
+    assert cache.counters["revalidated"] == 1
+
+
+def test_entry_evicted_before_the_304_is_fetched_again(tmp_path, fixture_server):
+    size = os.path.getsize(os.path.join(FIXTURES, PAGE))
+    cache = HTTPCache(path=str(tmp_path / "http_cache.sqlite"), max_bytes=size * 3 // 2)
+    url = f"{fixture_server}/{PAGE}"
+    conditional_headers = cache.conditional_headers
+
+    def evict_after_reading(page_url):
+        headers = conditional_headers(page_url)
+        # Another writer fills the cache between reading validators and handling the 304
+        cache.store(f"{fixture_server}/other", b"x" * size, {"etag": '"other"'})
+        return headers
+
+    cache.conditional_headers = evict_after_reading
+    first, second = _fetch_twice(AsyncFetcher(cache=cache), url)
+
+    assert cache.counters["revalidated"] == 1 and cache.counters["evicted"] >= 1
+    assert second.status == 200 and second.content == first.content
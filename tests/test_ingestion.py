@@ -0,0 +1,34 @@
+import pytest
+
+from startup_opps_api.database.database import SessionLocal, create_tables
+from startup_opps_api.services import ingestion
+
+PROGRAM = {"title": "Ocean Innovation Fellowship", "organization": "Blue Trust",
+           "url": "https://bluetrust.example/fellowship", "source": "Blue Trust"}
+# The same program listed on an aggregator
+AGGREGATOR_COPY = {**PROGRAM, "url": "https://aggregator.example/ocean-innovation-fellowship", "source": "Aggregator"}
+
+
+@pytest.fixture
+def db():
+    create_tables()
+    session = SessionLocal()
+    ingestion._catalog_duplicates = None
+    yield session
+    session.close()
+    ingestion._catalog_duplicates = None
+
+
+def test_failed_persist_does_not_leave_items_in_the_catalog_index(db, monkeypatch):
+    def fail(db, rows):
+        raise RuntimeError("database went away")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(ingestion, "persist_opportunities", fail)
+        with pytest.raises(RuntimeError):
+            ingestion.upsert_opportunities(db, [PROGRAM])
+
+    # The unsaved program must not make its aggregator copy look like a duplicate
+    stats = ingestion.upsert_opportunities(db, [AGGREGATOR_COPY])
+    assert stats["duplicates"] == 0
+    assert stats["inserted"] == 1
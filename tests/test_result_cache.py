@@ -0,0 +1,30 @@
+import asyncio
+
+from startup_opps_api.services.result_cache import ResultCache, cacheable
+
+REAL = [{"title": "Climate Fellowship", "url": "https://example.org/climate"}]
+FALLBACK = [{"title": "Search OpportunityDesk for opportunities", "url": "https://opportunitydesk.org/", "is_fallback": True}]
+
+
+def test_cacheable():
+    assert cacheable(REAL)
+    assert cacheable(REAL + FALLBACK)
+    assert not cacheable([])
+    assert not cacheable(FALLBACK)
+
+
+def test_failed_crawls_are_not_cached():
+    cache = ResultCache(redis_url=None)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return FALLBACK if len(calls) == 1 else REAL
+
+    async def run():
+        assert await cache.get_or_compute("search|climate||", compute) == FALLBACK
+        assert await cache.get_or_compute("search|climate||", compute) == REAL
+        assert await cache.get_or_compute("search|climate||", compute) == REAL
+
+    asyncio.run(run())
+    assert len(calls) == 2
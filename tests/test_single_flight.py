@@ -0,0 +1,79 @@
+import asyncio
+
+import httpx
+
+import main_enhanced
+from startup_opps_api.services.single_flight import SingleFlight
+
+
+def test_concurrent_listeners_share_one_stream():
+    flights = SingleFlight()
+    runs = []
+
+    async def produce():
+        runs.append(1)
+        for n in range(3):
+            await asyncio.sleep(0.01)
+            yield n
+
+    async def listen(delay):
+        await asyncio.sleep(delay)
+        return [event async for event in flights.stream("key", produce)]
+
+    async def run():
+        # The second listener joins after the first event and still gets it
+        return await asyncio.gather(listen(0), listen(0.015))
+
+    assert asyncio.run(run()) == [[0, 1, 2], [0, 1, 2]]
+    assert runs == [1]
+    assert flights.stats() == {"calls": 1, "coalesced": 1, "in_flight": 0}
+
+
+def test_stream_failure_reaches_every_listener():
+    flights = SingleFlight()
+
+    async def produce():
+        yield "partial"
+        raise RuntimeError("crawl failed")
+
+    async def listen(events):
+        async for event in flights.stream("key", produce):
+            events.append(event)
+
+    async def run():
+        events = [[], []]
+        results = await asyncio.gather(listen(events[0]), listen(events[1]), return_exceptions=True)
+        return events, results
+
+    events, results = asyncio.run(run())
+    assert events == [["partial"], ["partial"]]
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_identical_detailed_streams_share_one_crawl(monkeypatch):
+    crawls = []
+    opportunity = {"title": "Coalesced Fellowship", "url": "https://example.org/coalesced", "organization": "Example"}
+
+    async def fake_stream(keyword, type, region):
+        crawls.append((keyword, type, region))
+        await asyncio.sleep(0.05)
+        yield {"event": "source", "source": "Example", "opportunities": [opportunity]}
+        yield {"event": "summary", "opportunities": [opportunity], "sources": 1, "failed": 0, "elapsed_seconds": 0.05}
+
+    monkeypatch.setattr(main_enhanced, "astream_detailed_opportunities", fake_stream)
+
+    async def run():
+        transport = httpx.ASGITransport(app=main_enhanced.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            params = {"keyword": "coalesced streams"}
+            return await asyncio.gather(
+                client.get("/api/search-detailed/stream", params=params),
+                client.get("/api/search-detailed/stream", params={"keyword": "Coalesced  Streams"}),
+                client.get("/api/search-detailed", params=params),
+            )
+
+    first, second, plain = asyncio.run(run())
+    assert len(crawls) == 1
+    assert first.text == second.text
+    assert len(first.text.splitlines()) == 2  # source + summary lines
+    assert [opp["title"] for opp in plain.json()] == ["Coalesced Fellowship"]
@@ -0,0 +1,90 @@
+import json
+import os
+import re
+import time
+
+import pytest
+
+from startup_opps_api.scraper.source_registry import SourceRegistry, validate_source
+
+
+def _source(name="Example Grants", **fields):
+    return {
+        "name": name,
+        "base_url": "https://grants.example.org",
+        "search_url": "https://grants.example.org/search",
+        "type": "scholarship",
+        **fields,
+    }
+
+
+def _write(path, sources, mtime=None):
+    path.write_text(json.dumps(sources), encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def test_valid_source_passes():
+    validate_source(_source(selectors={"container": "div.card", "title": "h3", "organization": "Example Trust"}))
+
+
+@pytest.mark.parametrize("source, message", [
+    (_source(crawl_delay=5), "unknown fields ['crawl_delay']"),
+    (_source(selectors={"summary": "p"}), "unknown selectors ['summary']"),
+    (_source(search_url="/search"), "search_url must be an absolute http(s) URL"),
+    (_source(base_url="ftp://grants.example.org"), "base_url must be an absolute http(s) URL"),
+    (_source(js="yes"), "js must be true or false"),
+    (_source(selectors={"container": "div[class="}), "invalid container selector"),
+    (_source(selectors={"title": "h3 >> a"}), "invalid title selector"),
+    ({"base_url": "https://grants.example.org"}, "Source without a name"),
+])
+def test_invalid_sources_are_rejected(source, message):
+    with pytest.raises(ValueError, match=re.escape(message)):
+        validate_source(source)
+
+
+def test_duplicate_names_are_rejected():
+    with pytest.raises(ValueError, match="Duplicate source name 'Example Grants'"):
+        SourceRegistry([_source(), _source(search_url="https://grants.example.org/other")])
+
+
+def test_invalid_file_keeps_the_previous_sources(tmp_path):
+    path = tmp_path / "sources.json"
+    _write(path, [_source()], mtime=1_000_000)
+    registry = SourceRegistry(path=str(path), reload_interval=0)
+
+    _write(path, [_source(), _source()], mtime=1_000_100)
+    assert registry.reload() is False
+    path.write_text("[{not json", encoding="utf-8")
+    assert registry.reload() is False
+    assert [source["name"] for source in registry.all()] == ["Example Grants"]
+
+
+def test_file_change_is_picked_up_after_the_reload_interval(tmp_path):
+    path = tmp_path / "sources.json"
+    _write(path, [_source()], mtime=1_000_000)
+    registry = SourceRegistry(path=str(path), reload_interval=0.3)
+    assert registry.get("Example Grants") is not None
+
+    _write(path, [_source("Renamed Grants")], mtime=1_000_100)
+    # Checked at most once per interval
+    assert registry.get("Renamed Grants") is None
+
+    time.sleep(0.35)
+    assert registry.get("Renamed Grants") is not None
+    assert registry.get("Example Grants") is None
+
+
+def test_for_url_prefers_the_longest_search_path_on_a_shared_host():
+    registry = SourceRegistry([
+        _source("Example All", search_url="https://grants.example.org/programs"),
+        _source("Example Fellowships", search_url="https://grants.example.org/programs/fellowships", type="fellowship"),
+        _source("Example News", search_url="https://www.grants.example.org/news"),
+    ])
+
+    assert registry.for_url("https://grants.example.org/programs/fellowships/ocean")["name"] == "Example Fellowships"
+    assert registry.for_url("https://grants.example.org/programs/grants?page=2")["name"] == "Example All"
+    assert registry.for_url("https://www.grants.example.org/news/2026")["name"] == "Example News"
+    # Outside every search path: the first source configured on the host
+    assert registry.for_url("https://grants.example.org/about")["name"] == "Example All"
+    assert registry.for_url("https://elsewhere.example.com/programs") is None
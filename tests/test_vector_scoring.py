@@ -0,0 +1,61 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main_enhanced
+from benchmarks.vector_scoring import per_dict_relevance
+from startup_opps_api.models.opportunity import Opportunity
+from startup_opps_api.services.vector_scoring import profile_order
+
+CATALOG = [
+    {"title": "Arts Scholarship", "description": "For painters and sculptors", "organization": "Arts Council"},
+    {"title": "Ocean Grant", "description": "Climate and ocean science funding", "organization": "Sea Trust"},
+    {"title": "Startup Accelerator", "description": "Seed funding for founders", "organization": "Launch"},
+    {"title": "Climate Fellowship", "description": "Fellowship for climate researchers", "organization": "Green Fund"},
+]
+
+
+def _old_scores(profile):
+    """The per-item scorer summed over the profile answers"""
+    return [sum(per_dict_relevance(opp, str(answer).lower()) for answer in profile.values()) for opp in CATALOG]
+
+
+@pytest.mark.parametrize("profile", [
+    {"interests": "climate"},
+    {"interests": "climate", "field": "ocean"},
+    {"interests": "climate", "field": "founders"},
+    {"background": "painter", "interests": "sculptors"},
+])
+def test_profile_order_agrees_with_the_per_item_scorer(profile):
+    scores = _old_scores(profile)
+    position = {row: rank for rank, row in enumerate(profile_order(profile, CATALOG))}
+    assert sorted(position) == list(range(len(CATALOG)))
+    # Wherever the old scorer preferred one item, the batch ranking does too (ties may go either way)
+    for a in range(len(CATALOG)):
+        for b in range(len(CATALOG)):
+            if scores[a] > scores[b]:
+                assert position[a] < position[b], (CATALOG[a]["title"], CATALOG[b]["title"])
+
+
+def test_empty_profile_keeps_the_search_order():
+    assert profile_order({}, CATALOG) == [0, 1, 2, 3]
+    assert profile_order({"interests": "astronomy"}, CATALOG) == [0, 1, 2, 3]
+
+
+def test_recommendations_endpoint_ranks_search_results_for_the_profile(monkeypatch):
+    searched = []
+
+    async def find(keyword, region, type, refresh=False):
+        searched.append((keyword, region, type))
+        return [Opportunity(**opp, type="fellowship", eligibility=None, deadline=None, url=f"https://example.org/{row}")
+                for row, opp in enumerate(CATALOG)]
+
+    monkeypatch.setattr(main_enhanced, "_find_opportunities", find)
+    client = TestClient(main_enhanced.app)
+
+    response = client.post("/api/recommendations", json={
+        "keyword": "funding", "type": "fellowship", "profile": {"interests": "climate", "field": "ocean"},
+    })
+    assert response.status_code == 200
+    assert [opp["title"] for opp in response.json()][:2] == ["Ocean Grant", "Climate Fellowship"]
+    assert searched == [("funding", None, "fellowship")]
+    assert client.post("/api/recommendations", json={"profile": {"interests": "climate"}}).status_code == 400